@@ -0,0 +1,33 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 5d2c8e1f4a7b
+Revises: 0dbdcc65474b
+Create Date: 2026-10-17 10:12:44.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2c8e1f4a7b'
+down_revision = '0dbdcc65474b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (order, id) keys used by cursor pagination on the catalog list endpoints
+    op.create_index('ix_courses_order_id', 'courses', ['order', 'id'], unique=False)
+    op.create_index('ix_courses_category_order_id', 'courses', ['category_id', 'order', 'id'], unique=False)
+    op.create_index('ix_units_order_id', 'units', ['order', 'id'], unique=False)
+    op.create_index('ix_videos_order_id', 'videos', ['order', 'id'], unique=False)
+    op.create_index('ix_videos_unit_order_id', 'videos', ['unit_id', 'order', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_videos_unit_order_id', table_name='videos')
+    op.drop_index('ix_videos_order_id', table_name='videos')
+    op.drop_index('ix_units_order_id', table_name='units')
+    op.drop_index('ix_courses_category_order_id', table_name='courses')
+    op.drop_index('ix_courses_order_id', table_name='courses')
@@ -0,0 +1,40 @@
+"""add_video_watch_intervals
+
+Revision ID: b71f3a9c5e02
+Revises: 5d2c8e1f4a7b
+Create Date: 2026-10-17 15:21:40.118532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71f3a9c5e02'
+down_revision = '5d2c8e1f4a7b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('video_watch_intervals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.Column('intervals', sa.LargeBinary(), nullable=False),
+    sa.Column('watched_seconds', sa.Float(), nullable=False),
+    sa.Column('last_position', sa.Float(), nullable=True),
+    sa.Column('last_heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_video_watch_intervals_user_id_users'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], name=op.f('fk_video_watch_intervals_video_id_videos'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_video_watch_intervals')),
+    sa.UniqueConstraint('user_id', 'video_id', name=op.f('uq_video_watch_intervals_user_id'))
+    )
+    op.create_index(op.f('ix_video_watch_intervals_id'), 'video_watch_intervals', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_video_watch_intervals_id'), table_name='video_watch_intervals')
+    op.drop_table('video_watch_intervals')
@@ -0,0 +1,31 @@
+"""add_user_token_versions
+
+Revision ID: b9d27e5f1a43
+Revises: a6e1d4b83c57
+Create Date: 2026-10-17 23:41:52.118306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d27e5f1a43'
+down_revision = 'a6e1d4b83c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_token_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token_version', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', name=op.f('pk_user_token_versions'))
+    )
+    op.create_index(op.f('ix_user_token_versions_changed_at'), 'user_token_versions', ['changed_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_user_token_versions_changed_at'), table_name='user_token_versions')
+    op.drop_table('user_token_versions')
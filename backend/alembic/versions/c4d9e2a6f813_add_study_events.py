@@ -0,0 +1,39 @@
+"""add_study_events
+
+Revision ID: c4d9e2a6f813
+Revises: b71f3a9c5e02
+Create Date: 2026-10-17 17:02:11.504281
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9e2a6f813'
+down_revision = 'b71f3a9c5e02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('study_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=32), nullable=False),
+    sa.Column('content_type', sa.String(length=32), nullable=False),
+    sa.Column('content_id', sa.Integer(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_study_events_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_study_events'))
+    )
+    op.create_index('ix_study_events_user_occurred', 'study_events', ['user_id', 'occurred_at'], unique=False)
+    # Sessionization looks up the open session of each (user, content) touched by a flush
+    op.create_index('ix_learning_sessions_user_content_status', 'learning_sessions',
+                    ['user_id', 'content_type', 'content_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_learning_sessions_user_content_status', table_name='learning_sessions')
+    op.drop_index('ix_study_events_user_occurred', table_name='study_events')
+    op.drop_table('study_events')
@@ -0,0 +1,29 @@
+"""add_progress_summary_totals
+
+Revision ID: c6f2a8d41e97
+Revises: b9d27e5f1a43
+Create Date: 2026-10-18 09:14:27.503618
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f2a8d41e97'
+down_revision = 'b9d27e5f1a43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Summaries are now moved by deltas; the sum of progress keeps avg_progress exact
+    op.add_column('user_progress_summary', sa.Column('progress_total', sa.Float(), server_default=sa.text('0'), nullable=False))
+    op.add_column('course_progress_summary', sa.Column('progress_total', sa.Float(), server_default=sa.text('0'), nullable=False))
+    op.execute('UPDATE user_progress_summary SET progress_total = avg_progress * courses_started')
+    op.execute('UPDATE course_progress_summary SET progress_total = avg_progress * learners')
+
+
+def downgrade():
+    op.drop_column('course_progress_summary', 'progress_total')
+    op.drop_column('user_progress_summary', 'progress_total')
@@ -0,0 +1,35 @@
+"""add_daily_user_activity
+
+Revision ID: d2a7f1c38b64
+Revises: c4d9e2a6f813
+Create Date: 2026-10-17 18:40:27.913306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7f1c38b64'
+down_revision = 'c4d9e2a6f813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fill it afterwards with scripts/rebuild_daily_activity.py
+    op.create_table('daily_user_activity',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('seconds', sa.Integer(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_daily_user_activity_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_daily_user_activity')),
+    sa.UniqueConstraint('user_id', 'day', 'category_id', name=op.f('uq_daily_user_activity_user_id'))
+    )
+
+
+def downgrade():
+    op.drop_table('daily_user_activity')
@@ -0,0 +1,27 @@
+"""add_active_learning_sessions_index
+
+Revision ID: d8a4f6c2b913
+Revises: c6f2a8d41e97
+Create Date: 2026-10-18 11:42:05.318264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a4f6c2b913'
+down_revision = 'c6f2a8d41e97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Every study event flush closes the active sessions idle since a cutoff;
+    # only active rows are indexed, so the index stays as small as that set
+    op.create_index('ix_learning_sessions_active_end_time', 'learning_sessions', ['end_time'], unique=False,
+                    postgresql_where=sa.text("status = 'active'"), sqlite_where=sa.text("status = 'active'"))
+
+
+def downgrade():
+    op.drop_index('ix_learning_sessions_active_end_time', table_name='learning_sessions')
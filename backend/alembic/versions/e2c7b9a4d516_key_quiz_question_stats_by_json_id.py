@@ -0,0 +1,44 @@
+"""key_quiz_question_stats_by_json_id
+
+Revision ID: e2c7b9a4d516
+Revises: d8a4f6c2b913
+Create Date: 2026-10-18 14:26:51.870342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2c7b9a4d516'
+down_revision = 'd8a4f6c2b913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Counters are keyed by (quiz, question id in the quiz JSON), with no
+    # foreign key to quiz_questions, which those ids need not exist in
+    op.drop_constraint('fk_quiz_question_stats_question_id_quiz_questions', 'quiz_question_stats', type_='foreignkey')
+    op.drop_constraint('pk_quiz_question_stats', 'quiz_question_stats', type_='primary')
+    op.alter_column('quiz_question_stats', 'question_id', type_=sa.String(length=64),
+                    postgresql_using='question_id::varchar(64)')
+    op.create_primary_key('pk_quiz_question_stats', 'quiz_question_stats', ['quiz_id', 'question_id'])
+    # The primary key leads with quiz_id
+    op.drop_index(op.f('ix_quiz_question_stats_quiz_id'), table_name='quiz_question_stats')
+
+
+def downgrade():
+    op.create_index(op.f('ix_quiz_question_stats_quiz_id'), 'quiz_question_stats', ['quiz_id'], unique=False)
+    # Only counters of questions that are quiz_questions rows can go back
+    op.execute(
+        'DELETE FROM quiz_question_stats WHERE NOT EXISTS ('
+        'SELECT 1 FROM quiz_questions WHERE quiz_questions.quiz_id = quiz_question_stats.quiz_id '
+        'AND CAST(quiz_questions.id AS VARCHAR(64)) = quiz_question_stats.question_id)'
+    )
+    op.drop_constraint('pk_quiz_question_stats', 'quiz_question_stats', type_='primary')
+    op.alter_column('quiz_question_stats', 'question_id', type_=sa.Integer(),
+                    postgresql_using='question_id::integer')
+    op.create_primary_key('pk_quiz_question_stats', 'quiz_question_stats', ['question_id'])
+    op.create_foreign_key('fk_quiz_question_stats_question_id_quiz_questions', 'quiz_question_stats',
+                          'quiz_questions', ['question_id'], ['id'], ondelete='CASCADE')
@@ -0,0 +1,47 @@
+"""add_progress_summaries
+
+Revision ID: e8b3c5d17a29
+Revises: d2a7f1c38b64
+Create Date: 2026-10-17 20:12:54.380174
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3c5d17a29'
+down_revision = 'd2a7f1c38b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fill both afterwards with scripts/rebuild_progress_summaries.py
+    op.create_table('user_progress_summary',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('courses_started', sa.Integer(), nullable=False),
+    sa.Column('courses_completed', sa.Integer(), nullable=False),
+    sa.Column('avg_progress', sa.Float(), nullable=False),
+    sa.Column('last_accessed', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_user_progress_summary_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', name=op.f('pk_user_progress_summary'))
+    )
+    op.create_index('ix_user_progress_summary_last_accessed', 'user_progress_summary', ['last_accessed', 'user_id'], unique=False)
+    op.create_index('ix_user_progress_summary_avg_progress', 'user_progress_summary', ['avg_progress', 'user_id'], unique=False)
+    op.create_table('course_progress_summary',
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('learners', sa.Integer(), nullable=False),
+    sa.Column('completed_learners', sa.Integer(), nullable=False),
+    sa.Column('avg_progress', sa.Float(), nullable=False),
+    sa.Column('last_accessed', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], name=op.f('fk_course_progress_summary_course_id_courses'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('course_id', name=op.f('pk_course_progress_summary'))
+    )
+
+
+def downgrade():
+    op.drop_table('course_progress_summary')
+    op.drop_index('ix_user_progress_summary_avg_progress', table_name='user_progress_summary')
+    op.drop_index('ix_user_progress_summary_last_accessed', table_name='user_progress_summary')
+    op.drop_table('user_progress_summary')
@@ -0,0 +1,34 @@
+"""add_quiz_question_stats
+
+Revision ID: f3c8a2d9b415
+Revises: e8b3c5d17a29
+Create Date: 2026-10-17 21:03:41.526817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8a2d9b415'
+down_revision = 'e8b3c5d17a29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('quiz_question_stats',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('correct', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'], name=op.f('fk_quiz_question_stats_question_id_quiz_questions'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], name=op.f('fk_quiz_question_stats_quiz_id_quizzes'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('question_id', name=op.f('pk_quiz_question_stats'))
+    )
+    op.create_index(op.f('ix_quiz_question_stats_quiz_id'), 'quiz_question_stats', ['quiz_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_quiz_question_stats_quiz_id'), table_name='quiz_question_stats')
+    op.drop_table('quiz_question_stats')
@@ -0,0 +1,26 @@
+"""add_users_username_lower_index
+
+Revision ID: f7b3d1e8c245
+Revises: e2c7b9a4d516
+Create Date: 2026-10-18 16:05:33.142987
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7b3d1e8c245'
+down_revision = 'e2c7b9a4d516'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The admin progress list searches lower(username) LIKE 'prefix%';
+    # text_pattern_ops lets a btree serve that under any collation
+    op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username) text_pattern_ops')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_username_lower', table_name='users')
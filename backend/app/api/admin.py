@@ -1 +1,253 @@
- 
\ No newline at end of file
+from datetime import datetime
+from typing import Any, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_active_admin
+from app.core.catalog_cache import catalog_cache
+from app.core.database import get_read_db, get_read_session_factory, monitored_pools
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import login_throttle
+from app.core.security import password_hasher
+from app.core.startup import startup_timer
+from app.models.learning import Course
+from app.models.quiz import Quiz
+from app.models.user import User
+from app.schemas.admin import (
+    CacheStats,
+    CatalogCacheStats,
+    CourseFunnel,
+    CourseProgressOverview,
+    LoginThrottleStats,
+    PasswordHasherStats,
+    PoolStatsResponse,
+    ProgressChannelStats,
+    QuizQuestionStat,
+    StartupStats,
+    UserProgressOverview,
+    WriteBehindStats,
+)
+from app.services.course_funnel import course_funnel
+from app.services.progress_channel import progress_channel
+from app.services.progress_export import MEDIA_TYPES, stream_export
+from app.services.quiz_grading import answer_keys
+from app.services.quiz_responses import question_stats
+from app.services.progress_summary import course_progress_overview, user_progress_page
+from app.services.study_events import study_events
+from app.services.video_progress import progress_buffer
+from app.services.watch_intervals import watch_tracker
+
+router = APIRouter()
+
+
+@router.get("/db-pool", response_model=PoolStatsResponse)
+def get_db_pool_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Connection pool telemetry for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW.
+    """
+    return {
+        "pools": [metrics.snapshot(pool_engine.pool) for metrics, pool_engine in monitored_pools]
+    }
+
+
+@router.get("/catalog-cache", response_model=CatalogCacheStats)
+def get_catalog_cache_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Hit/miss/eviction counters and current version of the catalog cache.
+    """
+    return catalog_cache.stats()
+
+
+@router.get("/principal-cache", response_model=CacheStats)
+def get_principal_cache_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Hit rate of the token -> user cache used by get_current_user.
+    """
+    return principal_cache.stats()
+
+
+@router.get("/quiz-answer-keys", response_model=CacheStats)
+def get_quiz_answer_key_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Hit rate of the compiled quiz answer keys used to grade attempts.
+    """
+    return answer_keys.stats()
+
+
+@router.get("/password-hasher", response_model=PasswordHasherStats)
+def get_password_hasher_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Occupancy and rejections of the bounded bcrypt pool.
+    """
+    return password_hasher.stats()
+
+
+@router.get("/login-throttle", response_model=LoginThrottleStats)
+def get_login_throttle_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Allowed and rejected login attempts of the per-IP / per-username token buckets.
+    """
+    return login_throttle.stats()
+
+
+@router.get("/progress-buffer", response_model=WriteBehindStats)
+def get_progress_buffer_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Flush sizes, flush latencies and backlog of the video progress write-behind buffer.
+    """
+    return progress_buffer.stats()
+
+
+@router.get("/watch-intervals", response_model=WriteBehindStats)
+def get_watch_intervals_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Flush sizes, flush latencies and backlog of the watched-range tracker.
+    """
+    return watch_tracker.stats()
+
+
+@router.get("/study-events", response_model=WriteBehindStats)
+def get_study_events_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Flush sizes, flush latencies and backlog of the study event queue.
+    """
+    return study_events.stats()
+
+
+@router.get("/progress-ws", response_model=ProgressChannelStats)
+def get_progress_channel_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Open connections and persisted vs skipped updates of the /ws/progress channel.
+    """
+    return progress_channel.stats()
+
+
+@router.get("/startup", response_model=StartupStats)
+def get_startup_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Per-phase startup timing of the worker serving this request.
+    """
+    return startup_timer.stats()
+
+
+@router.get("/progress", response_model=List[UserProgressOverview])
+def get_progress_overview(
+    response: Response,
+    sort: Literal["last_accessed", "progress"] = "last_accessed",
+    order: Literal["asc", "desc"] = "desc",
+    search: Optional[str] = Query(None, description="Username prefix"),
+    course_id: Optional[int] = None,
+    min_progress: Optional[float] = None,
+    max_progress: Optional[float] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Users with course progress and their courses, served from the per-user
+    summary table. Filter by username prefix, course and average progress;
+    pass the X-Next-Cursor response header back as ``cursor`` for the next page.
+    """
+    users, next_cursor = user_progress_page(
+        db, sort=sort, descending=order == "desc", search=search, course_id=course_id,
+        min_progress=min_progress, max_progress=max_progress, limit=limit, cursor=cursor,
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return users
+
+
+@router.get("/progress/courses", response_model=List[CourseProgressOverview])
+def get_course_progress_overview(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Learners, completions and average progress per course, from the per-course summary table.
+    """
+    return course_progress_overview(db)
+
+
+@router.get("/progress/courses/{course_id}/funnel", response_model=CourseFunnel)
+def get_course_funnel(
+    course_id: int,
+    refresh: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Completion funnel of a course: per-unit and per-video completions, where
+    learners drop off, and the time to complete. Cached per course for
+    FUNNEL_CACHE_TTL_SECONDS; ``refresh`` recomputes it.
+    """
+    if db.get(Course, course_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return course_funnel(db, course_id, refresh=refresh)
+
+
+@router.get("/quizzes/{quiz_id}/question-stats", response_model=List[QuizQuestionStat])
+def get_quiz_question_stats(
+    quiz_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Attempts, correct answers and correct rate per question of a quiz, from
+    the counters kept as attempts are graded.
+    """
+    if db.get(Quiz, quiz_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
+    return question_stats(db, quiz_id)
+
+
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: Literal["video_progress", "course_progress", "quiz_attempts"],
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    course_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    session_factory: Any = Depends(get_read_session_factory),
+    current_user: User = Depends(get_current_active_admin),
+) -> StreamingResponse:
+    """
+    Every row of a progress or quiz table as NDJSON or CSV, streamed from a
+    server-side cursor so a worker holds one batch at a time. ``since`` and
+    ``until`` bound the last update (video progress), last access (course
+    progress) or attempt time (quiz attempts).
+    """
+    return StreamingResponse(
+        stream_export(
+            session_factory, dataset, fmt,
+            course_id=course_id, user_id=user_id, since=since, until=until,
+        ),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'},
+    )
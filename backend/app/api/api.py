@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import users, auth, categories, courses, units, videos
+from app.api import admin
+from app.api.endpoints import users, auth, categories, courses, units, videos, progress_ws
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
@@ -8,4 +9,6 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(categories.router, prefix="/categories", tags=["categories"])
 api_router.include_router(courses.router, prefix="/courses", tags=["courses"])
 api_router.include_router(units.router, prefix="/units", tags=["units"])
-api_router.include_router(videos.router, prefix="/videos", tags=["videos"]) 
\ No newline at end of file
+api_router.include_router(videos.router, prefix="/videos", tags=["videos"])
+api_router.include_router(progress_ws.router, prefix="/ws", tags=["progress"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -1,12 +1,18 @@
-from typing import Generator, Optional
+from typing import Generator, Optional, Union
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.database import get_db
+from app.core.catalog_cache import catalog_cache
+from app.core.claims import TokenPrincipal, token_versions
+from app.core.database import get_async_db, get_db, get_read_db
+from app.core.etag import etag_matches
+from app.core.principal_cache import principal_cache
 from app.core.security import ALGORITHM
 from app.core.config import settings
 from app.models.user import User
@@ -17,14 +23,43 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token
 
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Union[User, TokenPrincipal]:
+    user = principal_cache.get(token, db)
+    if user is not None:
+        return user
+    payload = _decode_token(token)
+    if settings.AUTH_CLAIMS_MODE and "uid" in payload:
+        return _claims_principal(payload)
+    return _load_user(db, token, payload)
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> Union[User, TokenPrincipal]:
+    """
+    ``get_current_user`` for async endpoints: the user is read through the
+    endpoint's own ``get_async_db`` session, so a request holds one
+    connection instead of an extra sync one for authentication.
+    """
+    user = await db.run_sync(lambda session: principal_cache.get(token, session))
+    if user is not None:
+        return user
+    payload = _decode_token(token)
+    if settings.AUTH_CLAIMS_MODE and "uid" in payload:
+        # May load the user's token version on first sight
+        return await run_in_threadpool(_claims_principal, payload)
+    return await db.run_sync(_load_user, token, payload)
+
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[ALGORITHM]
         )
+        if settings.AUTH_CLAIMS_MODE and "uid" in payload:
+            return payload
         token_data = TokenPayload(**payload)
-        email = token_data.sub
-        if email is None:
+        if token_data.sub is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
@@ -34,7 +69,11 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
-    
+    return payload
+
+
+def _load_user(db: Session, token: str, payload: dict) -> User:
+    email = payload["sub"]
     # Extract email from the token payload
     # The sub field might be a string representation of a dict
     if email.startswith("{'sub': "):
@@ -49,9 +88,25 @@ def get_current_user(
     user = db.query(User).filter(User.email == email).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    principal_cache.set(token, user, expires_at=payload.get("exp"))
     return user
 
 
+def _claims_principal(payload: dict) -> TokenPrincipal:
+    """Authorize a claims token against the version map instead of loading the user."""
+    if not token_versions.is_current(payload["uid"], payload.get("ver", 0)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+    return TokenPrincipal(
+        id=payload["uid"],
+        email=payload.get("sub"),
+        is_active=payload.get("act", False),
+        is_admin=payload.get("adm", False),
+    )
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -79,4 +134,44 @@ def get_current_active_admin(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges",
         )
-    return current_user 
\ No newline at end of file
+    return current_user
+
+
+# The same checks on top of get_current_user_async, for async endpoints
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async),
+) -> User:
+    return get_current_active_user(current_user)
+
+
+async def get_current_admin_user_async(
+    current_user: User = Depends(get_current_user_async),
+) -> User:
+    return get_current_admin_user(current_user)
+
+
+async def get_current_active_admin_async(
+    current_user: User = Depends(get_current_active_user_async),
+) -> User:
+    return get_current_active_admin(current_user)
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    """Answer 304 when the client already holds ``etag``, otherwise tag the response."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+    response.headers["ETag"] = etag
+
+
+def catalog_etag(request: Request, response: Response, db: Session = Depends(get_read_db)) -> None:
+    """
+    Conditional GET for catalog routes, computed from the shared catalog
+    version without loading or serializing the body. The endpoint's read
+    session (the same dependency) is pinned to that version, so the body
+    is never older than its ETag.
+    """
+    version = catalog_cache.pin(db)
+    check_etag(request, response, catalog_cache.etag(request.url.path, request.url.query, version=version))
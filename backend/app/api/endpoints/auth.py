@@ -1,14 +1,18 @@
 from datetime import timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.core.claims import user_claims
+from app.core.rate_limit import login_throttle
+from app.core.security import create_access_token, password_hasher
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User
+from app.models.user_token_version import UserTokenVersion
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserResponse
 
@@ -16,19 +20,24 @@ router = APIRouter()
 
 
 @router.post("/token", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_access_token(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
+    await login_throttle.acheck(request.client.host if request.client else None, form_data.username)
+    user = (await db.execute(
+        select(User).where(User.email == form_data.username)
+    )).scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -38,24 +47,35 @@ def login_access_token(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user"
         )
 
+    claims = None
+    if settings.AUTH_CLAIMS_MODE:
+        token_version = (await db.execute(
+            select(UserTokenVersion.token_version).where(UserTokenVersion.user_id == user.id)
+        )).scalar()
+        claims = user_claims(user, token_version or 0)
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": create_access_token(
-            {"sub": user.email}, expires_delta=access_token_expires
+            {"sub": user.email},
+            expires_delta=access_token_expires,
+            claims=claims,
         ),
         "token_type": "bearer",
     }
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_in: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Register a new user.
     """
     # Check if user with this email already exists
-    user = db.query(User).filter(User.email == user_in.email).first()
+    user = (await db.execute(
+        select(User).where(User.email == user_in.email)
+    )).scalars().first()
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -66,11 +86,11 @@ def register_user(
     user = User(
         email=user_in.email,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await password_hasher.hash(user_in.password),
         is_active=True,
         is_superuser=False,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user 
\ No newline at end of file
@@ -1,54 +1,96 @@
-from typing import Any, List
+from collections import defaultdict
+from typing import Any, Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.api.deps import get_current_active_user, get_current_active_admin
-from app.core.database import get_db
+from app.api.deps import catalog_etag, check_etag, get_current_active_user, get_current_active_admin
+from app.core.catalog_cache import catalog_cache
+from app.core.database import get_db, get_async_read_db, get_read_db
+from app.models.catalog_version import CatalogVersion
 from app.models.user import User
-from app.models.learning import Category, CourseProgress, VideoProgress
+from app.models.learning import Category, Course, CourseProgress, Unit, Video, VideoProgress
 from app.schemas.learning import Category as CategorySchema, CategoryCreate, CategoryUpdate, CourseResponse, CategoryWithProgress
+from app.services.progress_summary import forget_course_progress
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[CategoryWithProgress])
+async def categories_etag(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> None:
+    """
+    ETag for the per-user category tree: the catalog version and the user's
+    course and video progress rows, read in one aggregate statement.
+    """
+    course_progress = select(CourseProgress).where(CourseProgress.user_id == current_user.id).subquery()
+    video_progress = select(VideoProgress).where(VideoProgress.user_id == current_user.id).subquery()
+    version, *row = (await db.execute(select(
+        select(CatalogVersion.version).where(CatalogVersion.id == 1).scalar_subquery(),
+        select(func.count()).select_from(course_progress).scalar_subquery(),
+        select(func.max(course_progress.c.updated_at)).scalar_subquery(),
+        select(func.count()).select_from(video_progress).scalar_subquery(),
+        select(func.max(video_progress.c.updated_at)).scalar_subquery(),
+    ))).one()
+    check_etag(request, response, catalog_cache.etag(request.url.path, current_user.id, *row, version=version or 0))
+
+
+@router.get("/", response_model=List[CategoryWithProgress], dependencies=[Depends(categories_etag)])
 async def get_categories(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all categories with course progress."""
-    categories = db.query(Category).all()
+    """
+    Get all categories with course progress.
+
+    Issues a fixed number of statements whatever the catalog size: categories,
+    their courses (selectinload), the user's course progress, and the user's
+    video progress joined to its course.
+    """
+    categories = (await db.execute(
+        select(Category).options(selectinload(Category.courses))
+    )).scalars().all()
     
     # Get all progress data for the user
     course_progress = {
-        cp.course_id: cp for cp in db.query(CourseProgress).filter(
-            CourseProgress.user_id == current_user.id
-        ).all()
-    }
-    
-    video_progress = {
-        vp.video_id: vp for vp in db.query(VideoProgress).filter(
-            VideoProgress.user_id == current_user.id
-        ).all()
+        cp.course_id: cp for cp in (await db.execute(
+            select(CourseProgress).where(CourseProgress.user_id == current_user.id)
+        )).scalars().all()
     }
     
-    result = []
-    for category in categories:
-        category_data = category.__dict__
-        category_data['courses'] = []
-        
-        for course in category.courses:
-            course_data = course.__dict__
-            course_data['progress'] = course_progress.get(course.id)
-            course_data['videos'] = [
-                video_progress.get(video.id) for video in course.videos
-            ]
-            category_data['courses'].append(course_data)
-            
-        result.append(category_data)
+    video_progress = defaultdict(list)
+    for course_id, vp in (await db.execute(
+        select(Unit.course_id, VideoProgress)
+        .join(Video, Video.id == VideoProgress.video_id)
+        .join(Unit, Unit.id == Video.unit_id)
+        .where(VideoProgress.user_id == current_user.id)
+    )).all():
+        video_progress[course_id].append(vp)
     
-    return result
+    return [
+        {
+            "id": category.id,
+            "name": category.name,
+            "courses": [
+                {
+                    **_course_fields(course),
+                    "progress": course_progress.get(course.id),
+                    "videos": video_progress.get(course.id, []),
+                }
+                for course in category.courses
+            ],
+        }
+        for category in categories
+    ]
+
+
+def _course_fields(course: Course) -> Dict[str, Any]:
+    return {field: getattr(course, field) for field in CourseResponse.model_fields}
 
 
 @router.post("/", response_model=CategorySchema, status_code=201)
@@ -70,6 +112,7 @@ def create_category(
         description=category_in.description,
     )
     db.add(category)
+    catalog_cache.bump(db)
     db.commit()
     db.refresh(category)
     return category
@@ -95,15 +138,16 @@ def update_category(
         setattr(category, field, value)
     
     db.add(category)
+    catalog_cache.bump(db)
     db.commit()
     db.refresh(category)
     return category
 
 
-@router.get("/{category_id}", response_model=CategorySchema)
+@router.get("/{category_id}", response_model=CategorySchema, dependencies=[Depends(catalog_etag)])
 def read_category(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     category_id: int,
 ) -> Any:
     """
@@ -128,21 +172,27 @@ def delete_category(
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
+    # Its courses go with it
+    forget_course_progress(db, *db.execute(select(Course.id).where(Course.category_id == category_id)).scalars())
     db.delete(category)
+    catalog_cache.bump(db)
     db.commit()
     return category
 
 
-@router.get("/{category_id}/courses", response_model=List[CourseResponse])
+@router.get("/{category_id}/courses", response_model=List[CourseResponse], dependencies=[Depends(catalog_etag)])
 def get_category_courses(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     category_id: int,
 ) -> Any:
     """
     Get courses for a specific category.
     """
-    category = db.query(Category).filter(Category.id == category_id).first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    return category.courses
+    def load():
+        category = db.query(Category).filter(Category.id == category_id).first()
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        return [CourseResponse.model_validate(course).model_dump() for course in category.courses]
+
+    return catalog_cache.get_or_load("category_courses", category_id, load, db)
@@ -1,39 +1,67 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import os
 import shutil
 from pathlib import Path
 
-from app.api.deps import get_db, get_current_user, get_current_admin_user
+from app.api.deps import (
+    catalog_etag,
+    get_db,
+    get_current_user,
+    get_current_user_async,
+    get_current_admin_user,
+    get_current_admin_user_async,
+)
 from app.models.user import User
 from app.models.learning import Course, Unit, CourseProgress
 from app.schemas.learning import (
     CourseCreate, CourseUpdate, CourseResponse, 
     UnitResponse, CourseWithUnitsResponse, CourseProgressResponse
 )
+from app.core.catalog_cache import catalog_cache
 from app.core.config import settings
+from app.core.database import get_async_db, get_read_db
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate
+from app.services.course_progress import recompute_course_progress
+from app.services.progress_summary import forget_course_progress
 
 router = APIRouter()
 
-@router.get("/", response_model=List[CourseResponse])
+@router.get("/", response_model=List[CourseResponse], dependencies=[Depends(catalog_etag)])
 def get_courses(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     category_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve all courses, optionally filtered by category.
+
+    Pass the X-Next-Cursor response header back as ``cursor`` to fetch the next page.
     """
-    query = db.query(Course)
-    if category_id:
-        query = query.filter(Course.category_id == category_id)
+    def load():
+        query = db.query(Course)
+        if category_id:
+            query = query.filter(Course.category_id == category_id)
+        courses, next_cursor = paginate(
+            query, (Course.order, Course.id), skip=skip, limit=limit, cursor=cursor
+        )
+        return [CourseResponse.model_validate(course).model_dump() for course in courses], next_cursor
     
-    return query.order_by(Course.order).offset(skip).limit(limit).all()
+    courses, next_cursor = catalog_cache.get_or_load(
+        "courses", (skip, limit, category_id, cursor), load, db
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return courses
 
-@router.get("/{course_id}", response_model=CourseResponse)
-def get_course(course_id: int, db: Session = Depends(get_db)):
+@router.get("/{course_id}", response_model=CourseResponse, dependencies=[Depends(catalog_etag)])
+def get_course(course_id: int, db: Session = Depends(get_read_db)):
     """
     Retrieve a specific course by ID.
     """
@@ -45,24 +73,27 @@ def get_course(course_id: int, db: Session = Depends(get_db)):
         )
     return course
 
-@router.get("/{course_id}/units", response_model=CourseWithUnitsResponse)
-def get_course_units(course_id: int, db: Session = Depends(get_db)):
+@router.get("/{course_id}/units", response_model=CourseWithUnitsResponse, dependencies=[Depends(catalog_etag)])
+def get_course_units(course_id: int, db: Session = Depends(get_read_db)):
     """
     Retrieve a course with all its units.
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
-        )
-    
-    units = db.query(Unit).filter(Unit.course_id == course_id).order_by(Unit.order).all()
+    def load():
+        course = db.query(Course).filter(Course.id == course_id).first()
+        if not course:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
+            )
+        
+        units = db.query(Unit).filter(Unit.course_id == course_id).order_by(Unit.order).all()
+        
+        return {
+            **CourseResponse.model_validate(course).model_dump(),
+            "units": [UnitResponse.model_validate(unit).model_dump() for unit in units]
+        }
     
-    return {
-        **course.__dict__,
-        "units": units
-    }
+    return catalog_cache.get_or_load("course_units", course_id, load, db)
 
 @router.post("/", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
 def create_course(
@@ -98,6 +129,7 @@ def create_course(
     )
     
     db.add(db_course)
+    catalog_cache.bump(db)
     db.commit()
     db.refresh(db_course)
     return db_course
@@ -137,6 +169,7 @@ def update_course(
     for key, value in course.dict(exclude_unset=True).items():
         setattr(db_course, key, value)
     
+    catalog_cache.bump(db)
     db.commit()
     db.refresh(db_course)
     return db_course
@@ -157,7 +190,9 @@ def delete_course(
             detail="Course not found"
         )
     
+    forget_course_progress(db, course_id)
     db.delete(db_course)
+    catalog_cache.bump(db)
     db.commit()
     return None
 
@@ -165,8 +200,8 @@ def delete_course(
 async def scan_directory(
     directory_path: str,
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_admin_user_async)
 ):
     """
     Scan a directory and create a course from its contents (admin only).
@@ -181,10 +216,12 @@ async def scan_directory(
     course_title = os.path.basename(directory_path)
     
     # Check if course with same title exists in the same category
-    existing_course = db.query(Course).filter(
-        Course.title == course_title,
-        Course.category_id == category_id
-    ).first()
+    existing_course = (await db.execute(
+        select(Course).where(
+            Course.title == course_title,
+            Course.category_id == category_id
+        )
+    )).scalars().first()
     
     if existing_course:
         raise HTTPException(
@@ -201,17 +238,17 @@ async def scan_directory(
     )
     
     db.add(db_course)
-    db.commit()
-    db.refresh(db_course)
+    await db.commit()
+    await db.refresh(db_course)
     
     # Get max order for the category
-    max_order = db.query(Course).filter(
-        Course.category_id == category_id
-    ).count()
+    max_order = (await db.execute(
+        select(func.count(Course.id)).where(Course.category_id == category_id)
+    )).scalar_one()
     
     # Update course order
     db_course.order = max_order
-    db.commit()
+    await db.commit()
     
     # Create units based on subdirectories
     for item in os.listdir(directory_path):
@@ -221,16 +258,18 @@ async def scan_directory(
             unit_title = os.path.basename(item_path)
             
             # Check if unit with same title exists in the same course
-            existing_unit = db.query(Unit).filter(
-                Unit.title == unit_title,
-                Unit.course_id == db_course.id
-            ).first()
+            existing_unit = (await db.execute(
+                select(Unit).where(
+                    Unit.title == unit_title,
+                    Unit.course_id == db_course.id
+                )
+            )).scalars().first()
             
             if not existing_unit:
                 # Get max order for the course
-                max_unit_order = db.query(Unit).filter(
-                    Unit.course_id == db_course.id
-                ).count()
+                max_unit_order = (await db.execute(
+                    select(func.count(Unit.id)).where(Unit.course_id == db_course.id)
+                )).scalar_one()
                 
                 db_unit = Unit(
                     title=unit_title,
@@ -240,59 +279,55 @@ async def scan_directory(
                 )
                 
                 db.add(db_unit)
-                db.commit()
+                await db.commit()
     
+    await db.run_sync(catalog_cache.bump)
+    await db.commit()
     return db_course 
 
 @router.get("/{course_id}/progress", response_model=CourseProgressResponse)
 async def get_course_progress(
     course_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get progress for a specific course."""
-    progress = db.query(CourseProgress).filter(
-        CourseProgress.course_id == course_id,
-        CourseProgress.user_id == current_user.id
-    ).first()
+    """
+    Get progress for a specific course.
+
+    The rollup is kept up to date as videos are completed and units or videos
+    are added and removed, so this is a single indexed lookup.
+    """
+    progress = (await db.execute(
+        select(CourseProgress).where(
+            CourseProgress.course_id == course_id,
+            CourseProgress.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not progress:
-        # Create new progress entry
-        course = db.query(Course).filter(Course.id == course_id).first()
-        if not course:
+        if not await db.get(Course, course_id):
             raise HTTPException(status_code=404, detail="Course not found")
-            
-        total_units = len(course.units)
-        progress = CourseProgress(
-            user_id=current_user.id,
-            course_id=course_id,
-            total_units=total_units
-        )
-        db.add(progress)
-        db.commit()
-        db.refresh(progress)
+        progress = await db.run_sync(recompute_course_progress, current_user.id, course_id)
+        await db.commit()
+        await db.refresh(progress)
     
     return progress
 
 @router.put("/{course_id}/progress", response_model=CourseProgressResponse)
 async def update_course_progress(
     course_id: int,
-    completed_units: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    completed_units: Optional[int] = Query(None, deprecated=True),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Update progress for a specific course."""
-    progress = db.query(CourseProgress).filter(
-        CourseProgress.course_id == course_id,
-        CourseProgress.user_id == current_user.id
-    ).first()
-    
-    if not progress:
-        raise HTTPException(status_code=404, detail="Progress not found")
-    
-    progress.completed_units = completed_units
-    progress.progress_percentage = (completed_units / progress.total_units) * 100
-    
-    db.commit()
-    db.refresh(progress)
-    return progress 
\ No newline at end of file
+    """
+    Recount progress for a specific course from the videos the user completed.
+
+    ``completed_units`` used to be taken from the client; it is now ignored.
+    """
+    if not await db.get(Course, course_id):
+        raise HTTPException(status_code=404, detail="Course not found")
+    progress = await db.run_sync(recompute_course_progress, current_user.id, course_id)
+    await db.commit()
+    await db.refresh(progress)
+    return progress
@@ -0,0 +1,84 @@
+import json
+from typing import Callable, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_current_user
+from app.core.database import get_read_session_factory
+from app.services.progress_channel import parse_update, progress_channel
+from app.services.study_events import study_events
+from app.services.video_progress import video_exists
+from app.services.watch_intervals import watch_tracker
+
+router = APIRouter()
+
+
+# Each lookup gets its own session, so no connection is held for the
+# lifetime of the socket
+def _authenticate(session_factory: Callable[[], Session], token: str) -> Tuple[int, bool]:
+    with session_factory() as db:
+        user = get_current_user(db, token)
+        return user.id, user.is_active
+
+
+def _video_exists(session_factory: Callable[[], Session], video_id: int) -> bool:
+    with session_factory() as db:
+        return video_exists(db, video_id)
+
+
+@router.websocket("/progress")
+async def progress_socket(
+    websocket: WebSocket,
+    token: str = Query(...),
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory),
+):
+    """
+    Player progress heartbeats over one authenticated connection.
+
+    Authenticate once with ``?token=<access token>`` (browsers cannot set
+    headers on a WebSocket), then send ``{"video_id", "progress",
+    "last_position"}`` messages. Malformed or out of range messages and
+    unknown videos get an ``{"error"}`` reply and the connection stays open.
+    Nothing here waits on the database once a video has been seen: the
+    buffers below only queue, and their flush loops do the writing.
+    """
+    try:
+        user_id, is_active = await run_in_threadpool(_authenticate, session_factory, token)
+    except HTTPException:
+        is_active = False
+    if not is_active:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    connection = progress_channel.connect(user_id)
+    known_videos = set()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                update = parse_update(json.loads(message))
+            except ValueError:
+                update = None
+            if update is None:
+                connection.reject()
+                await websocket.send_json({"error": "expected {video_id, progress, last_position}"})
+                continue
+            if update[0] not in known_videos:
+                if not await run_in_threadpool(_video_exists, session_factory, update[0]):
+                    connection.reject()
+                    await websocket.send_json({"error": "video not found"})
+                    continue
+                known_videos.add(update[0])
+            # Every message counts towards the watched ranges, even ones not persisted
+            if not watch_tracker.is_loaded(user_id, update[0]):
+                await run_in_threadpool(watch_tracker.load, user_id, update[0])
+            watch_tracker.heartbeat(user_id, update[0], update[2])
+            study_events.record(user_id, "video_progress", "video", update[0])
+            connection.update(*update)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        connection.close()
@@ -1,10 +1,14 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Body
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user, get_current_admin_user
+from app.api.deps import catalog_etag, get_db, get_current_user, get_current_admin_user
+from app.core.catalog_cache import catalog_cache
+from app.core.database import get_read_db
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate
 from app.models.user import User
 from app.models.learning import Unit, Video
+from app.services.course_progress import adjust_course_progress, track_unit_completions
 from app.schemas.learning import (
     UnitCreate, UnitUpdate, UnitResponse, 
     VideoResponse, UnitWithVideosResponse
@@ -12,24 +16,31 @@ from app.schemas.learning import (
 
 router = APIRouter()
 
-@router.get("/", response_model=List[UnitResponse])
+@router.get("/", response_model=List[UnitResponse], dependencies=[Depends(catalog_etag)])
 def get_units(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     course_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve all units, optionally filtered by course.
+
+    Pass the X-Next-Cursor response header back as ``cursor`` to fetch the next page.
     """
     query = db.query(Unit)
     if course_id:
         query = query.filter(Unit.course_id == course_id)
     
-    return query.order_by(Unit.order).offset(skip).limit(limit).all()
+    units, next_cursor = paginate(query, (Unit.order, Unit.id), skip=skip, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return units
 
-@router.get("/{unit_id}", response_model=UnitResponse)
-def get_unit(unit_id: int, db: Session = Depends(get_db)):
+@router.get("/{unit_id}", response_model=UnitResponse, dependencies=[Depends(catalog_etag)])
+def get_unit(unit_id: int, db: Session = Depends(get_read_db)):
     """
     Retrieve a specific unit by ID.
     """
@@ -41,24 +52,27 @@ def get_unit(unit_id: int, db: Session = Depends(get_db)):
         )
     return unit
 
-@router.get("/{unit_id}/videos", response_model=UnitWithVideosResponse)
-def get_unit_videos(unit_id: int, db: Session = Depends(get_db)):
+@router.get("/{unit_id}/videos", response_model=UnitWithVideosResponse, dependencies=[Depends(catalog_etag)])
+def get_unit_videos(unit_id: int, db: Session = Depends(get_read_db)):
     """
     Retrieve a unit with all its videos.
     """
-    unit = db.query(Unit).filter(Unit.id == unit_id).first()
-    if not unit:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Unit not found"
-        )
-    
-    videos = db.query(Video).filter(Video.unit_id == unit_id).order_by(Video.order).all()
+    def load():
+        unit = db.query(Unit).filter(Unit.id == unit_id).first()
+        if not unit:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Unit not found"
+            )
+        
+        videos = db.query(Video).filter(Video.unit_id == unit_id).order_by(Video.order).all()
+        
+        return {
+            **UnitResponse.model_validate(unit).model_dump(),
+            "videos": [VideoResponse.model_validate(video).model_dump() for video in videos]
+        }
     
-    return {
-        **unit.__dict__,
-        "videos": videos
-    }
+    return catalog_cache.get_or_load("unit_videos", unit_id, load, db)
 
 @router.post("/", response_model=UnitResponse, status_code=status.HTTP_201_CREATED)
 def create_unit(
@@ -94,6 +108,9 @@ def create_unit(
     )
     
     db.add(db_unit)
+    db.flush()
+    adjust_course_progress(db, unit.course_id, {}, total_delta=1)
+    catalog_cache.bump(db)
     db.commit()
     db.refresh(db_unit)
     return db_unit
@@ -129,10 +146,12 @@ def update_unit(
                 detail="Unit with this title already exists in this course"
             )
     
-    # Update fields
-    for key, value in unit.dict(exclude_unset=True).items():
-        setattr(db_unit, key, value)
+    # Update fields; moving a unit to another course moves its completions along
+    with track_unit_completions(db, [unit_id]):
+        for key, value in unit.dict(exclude_unset=True).items():
+            setattr(db_unit, key, value)
     
+    catalog_cache.bump(db)
     db.commit()
     db.refresh(db_unit)
     return db_unit
@@ -153,7 +172,9 @@ def delete_unit(
             detail="Unit not found"
         )
     
-    db.delete(db_unit)
+    with track_unit_completions(db, [unit_id]):
+        db.delete(db_unit)
+    catalog_cache.bump(db)
     db.commit()
     return None
 
@@ -188,5 +209,6 @@ def reorder_units(
         
         db_unit.order = new_order
     
+    catalog_cache.bump(db)
     db.commit()
     return {"message": "Units reordered successfully"} 
\ No newline at end of file
@@ -1,43 +1,65 @@
-from typing import Any, List
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import get_password_hash, verify_password
+from app.core.database import get_async_db, get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate
+from app.core.claims import TokenPrincipal, bump_token_version, revokes_tokens, token_versions
+from app.core.principal_cache import principal_cache
+from app.core.security import password_hasher
 from app.models.user import User
+from app.schemas.learning import DailyActivity
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
-from app.api.deps import get_current_active_user, get_current_active_admin
+from app.services.daily_activity import UNCATEGORIZED, daily_activity
+from app.services.progress_summary import forget_user_progress
+from app.api.deps import (
+    get_current_active_admin,
+    get_current_active_admin_async,
+    get_current_active_user,
+    get_current_active_user_async,
+)
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[UserSchema])
 def read_users(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_admin),
 ) -> Any:
     """
     Retrieve users. Only accessible to admin users.
+
+    Pass the X-Next-Cursor response header back as ``cursor`` to fetch the next page.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    users, next_cursor = paginate(db.query(User), (User.id,), skip=skip, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 
 @router.post("/", response_model=UserSchema, status_code=201)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate,
-    current_user: User = Depends(get_current_active_admin),
+    current_user: User = Depends(get_current_active_admin_async),
 ) -> Any:
     """
     Create new user. Only accessible to admin users.
     """
-    user = db.query(User).filter(User.username == user_in.username).first()
+    user = (await db.execute(
+        select(User).where(User.username == user_in.username)
+    )).scalars().first()
     if user:
         raise HTTPException(
             status_code=400,
@@ -46,34 +68,44 @@ def create_user(
     user_in_data = jsonable_encoder(user_in)
     user_in_data.pop("password")
     db_obj = User(**user_in_data)
-    db_obj.hashed_password = get_password_hash(user_in.password)
+    db_obj.hashed_password = await password_hasher.hash(user_in.password)
     db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
     return db_obj
 
 
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
     current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
 ) -> Any:
     """
     Get current user.
     """
+    if isinstance(current_user, TokenPrincipal):
+        user = db.get(User, current_user.id)
+        if not user:
+            # Deleted since the token was checked
+            raise HTTPException(
+                status_code=404,
+                detail="The user with this ID does not exist in the system",
+            )
+        return user
     return current_user
 
 
 @router.put("/me", response_model=UserSchema)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_async),
 ) -> Any:
     """
     Update current user.
     """
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = await db.get(User, current_user.id)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -83,16 +115,61 @@ def update_user_me(
     # Update user fields
     update_data = user_in.dict(exclude_unset=True)
     if "password" in update_data and update_data["password"]:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
     
+    revoke = revokes_tokens(user, update_data)
     for field, value in update_data.items():
         setattr(user, field, value)
+    if revoke:
+        await db.run_sync(bump_token_version, user.id)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principal_cache.invalidate_user(user.id)
+    if revoke:
+        token_versions.invalidate(user.id)
+    await db.refresh(user)
     return user
 
 
+def _activity(db: Session, user_id: int, days: int) -> List[dict]:
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    return [
+        {
+            "day": row.day,
+            "category_id": None if row.category_id == UNCATEGORIZED else row.category_id,
+            "minutes": row.seconds / 60,
+            "sessions": row.sessions,
+        }
+        for row in daily_activity(db, user_id, since)
+    ]
+
+
+@router.get("/me/activity", response_model=List[DailyActivity])
+def read_user_me_activity(
+    days: int = Query(365, ge=1, le=366),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Minutes studied per day and category over the last ``days`` days (UTC),
+    from completed learning sessions. Days without activity are omitted.
+    """
+    return _activity(db, current_user.id, days)
+
+
+@router.get("/{user_id}/activity", response_model=List[DailyActivity])
+def read_user_activity(
+    user_id: int,
+    days: int = Query(365, ge=1, le=366),
+    current_user: User = Depends(get_current_active_admin),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Minutes studied per day and category of a user. Only accessible to admin users.
+    """
+    return _activity(db, user_id, days)
+
+
 @router.get("/{user_id}", response_model=UserSchema)
 def read_user_by_id(
     user_id: int,
@@ -112,17 +189,17 @@ def read_user_by_id(
 
 
 @router.put("/{user_id}", response_model=UserSchema)
-def update_user(
+async def update_user(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int,
     user_in: UserUpdate,
-    current_user: User = Depends(get_current_active_admin),
+    current_user: User = Depends(get_current_active_admin_async),
 ) -> Any:
     """
     Update a user. Only accessible to admin users.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -131,16 +208,22 @@ def update_user(
     
     update_data = user_in.dict(exclude_unset=True)
     if update_data.get("password"):
-        hashed_password = get_password_hash(update_data["password"])
+        hashed_password = await password_hasher.hash(update_data["password"])
         del update_data["password"]
         update_data["hashed_password"] = hashed_password
     
+    revoke = revokes_tokens(user, update_data)
     for field, value in update_data.items():
         setattr(user, field, value)
+    if revoke:
+        await db.run_sync(bump_token_version, user.id)
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principal_cache.invalidate_user(user.id)
+    if revoke:
+        token_versions.invalidate(user.id)
+    await db.refresh(user)
     return user
 
 
@@ -160,6 +243,10 @@ def delete_user(
             status_code=404,
             detail="The user with this ID does not exist in the system",
         )
+    forget_user_progress(db, user_id)
+    bump_token_version(db, user_id)
     db.delete(user)
     db.commit()
+    principal_cache.invalidate_user(user_id)
+    token_versions.invalidate(user_id)
     return user 
\ No newline at end of file
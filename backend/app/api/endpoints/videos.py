@@ -1,8 +1,12 @@
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Body
+from sqlalchemy.orm import Session, defer
 
-from app.api.deps import get_db, get_current_user, get_current_admin_user
+from app.api.deps import catalog_etag, get_db, get_current_user, get_current_admin_user
+from app.core.catalog_cache import catalog_cache
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate
 from app.models.user import User
 from app.models.learning import Video, VideoProgress
 from app.models.quiz import Quiz, QuizAttempt
@@ -10,28 +14,42 @@ from app.schemas.learning import (
     VideoCreate, VideoUpdate, VideoResponse, VideoWithMetadataResponse,
     QuizResponse, QuizAttemptCreate, QuizAttemptResponse,
     VideoProgressResponse, VideoProgressUpdate,
+    VideoProgressBatchItem, VideoProgressBatchResult,
 )
+from app.services.course_progress import track_unit_completions
+from app.services.quiz_grading import answer_keys, grade, grade_questions, score
+from app.services.quiz_responses import record_quiz_responses
+from app.services.study_events import study_events
+from app.services.video_progress import apply_progress_batch, progress_buffer, video_exists
+from app.services.watch_intervals import watch_summary, watch_tracker
 
 router = APIRouter()
 
-@router.get("/", response_model=List[VideoResponse])
+@router.get("/", response_model=List[VideoResponse], dependencies=[Depends(catalog_etag)])
 def get_videos(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     unit_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve all videos, optionally filtered by unit.
+
+    Pass the X-Next-Cursor response header back as ``cursor`` to fetch the next page.
     """
     query = db.query(Video)
     if unit_id:
         query = query.filter(Video.unit_id == unit_id)
     
-    return query.order_by(Video.order).offset(skip).limit(limit).all()
+    videos, next_cursor = paginate(query, (Video.order, Video.id), skip=skip, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return videos
 
-@router.get("/{video_id}", response_model=VideoResponse)
-def get_video(video_id: int, db: Session = Depends(get_db)):
+@router.get("/{video_id}", response_model=VideoResponse, dependencies=[Depends(catalog_etag)])
+def get_video(video_id: int, db: Session = Depends(get_read_db)):
     """
     Retrieve a specific video by ID.
     """
@@ -43,8 +61,8 @@ def get_video(video_id: int, db: Session = Depends(get_db)):
         )
     return video
 
-@router.get("/{video_id}/metadata", response_model=VideoWithMetadataResponse)
-def get_video_with_metadata(video_id: int, db: Session = Depends(get_db)):
+@router.get("/{video_id}/metadata", response_model=VideoWithMetadataResponse, dependencies=[Depends(catalog_etag)])
+def get_video_with_metadata(video_id: int, db: Session = Depends(get_read_db)):
     """
     Retrieve a video with its metadata.
     """
@@ -92,11 +110,37 @@ def create_video(
         video_metadata=video.video_metadata or {}
     )
     
-    db.add(db_video)
+    with track_unit_completions(db, [video.unit_id]):
+        db.add(db_video)
+    catalog_cache.bump(db)
     db.commit()
     db.refresh(db_video)
     return db_video
 
+# Declared before PUT /{video_id} so "progress:batch" is not taken for a video id
+@router.put("/progress:batch", response_model=List[VideoProgressBatchResult])
+def update_video_progress_batch(
+    items: List[VideoProgressBatchItem],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Report progress for many videos at once (several tabs, offline sync).
+
+    Per video only the newest client_ts is kept, within the batch and against
+    what is already stored. Results come back in request order.
+    """
+    if len(items) > settings.PROGRESS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.PROGRESS_BATCH_MAX_ITEMS} items per batch",
+        )
+    results = apply_progress_batch(db, current_user.id, items)
+    for item, result in zip(items, results):
+        if result["status"] != "not_found":
+            study_events.record(current_user.id, "video_progress", "video", item.video_id, at=item.client_ts)
+    return results
+
 @router.put("/{video_id}", response_model=VideoResponse)
 def update_video(
     video_id: int,
@@ -137,10 +181,12 @@ def update_video(
             db_video.video_metadata = {}
         db_video.video_metadata.update(update_data.pop("video_metadata", {}))
     
-    # Update other fields
-    for key, value in update_data.items():
-        setattr(db_video, key, value)
+    # Update other fields; moving a video to another unit changes both units' completion
+    with track_unit_completions(db, {db_video.unit_id, update_data.get("unit_id")}):
+        for key, value in update_data.items():
+            setattr(db_video, key, value)
     
+    catalog_cache.bump(db)
     db.commit()
     db.refresh(db_video)
     return db_video
@@ -161,7 +207,9 @@ def delete_video(
             detail="Video not found"
         )
     
-    db.delete(db_video)
+    with track_unit_completions(db, [db_video.unit_id]):
+        db.delete(db_video)
+    catalog_cache.bump(db)
     db.commit()
     return None
 
@@ -196,6 +244,7 @@ def reorder_videos(
         
         db_video.order = new_order
     
+    catalog_cache.bump(db)
     db.commit()
     return {"message": "Videos reordered successfully"}
 
@@ -222,27 +271,31 @@ def submit_quiz_attempt(
     current_user: User = Depends(get_current_user)
 ):
     """Submit a quiz attempt."""
-    quiz = db.query(Quiz).filter(Quiz.video_id == video_id).first()
+    # The questions are only loaded when the cached answer key is stale
+    quiz = db.query(Quiz).options(defer(Quiz.questions)).filter(Quiz.video_id == video_id).first()
     if not quiz:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Quiz not found"
         )
     
-    # Calculate score
-    score = calculate_quiz_score(quiz, attempt.responses)
+    # Grade each question; the score and the per-question rows come from the same pass
+    graded = grade_questions(answer_keys.get(quiz), attempt.responses)
     
     # Create attempt record
     db_attempt = QuizAttempt(
         user_id=current_user.id,
         quiz_id=quiz.id,
         responses=attempt.responses,
-        score=score
+        score=score(graded)
     )
     
     db.add(db_attempt)
+    db.flush()
+    record_quiz_responses(db, db_attempt.id, quiz.id, graded)
     db.commit()
     db.refresh(db_attempt)
+    study_events.record(current_user.id, "quiz_attempt", "quiz", quiz.id)
     return db_attempt
 
 @router.get("/{video_id}/progress", response_model=VideoProgressResponse)
@@ -251,15 +304,23 @@ def get_video_progress(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get user's progress for a specific video."""
+    """Get user's progress for a specific video, with the time actually watched."""
+    progress = progress_buffer.pending(current_user.id, video_id)
+    if progress is None:
+        progress = _stored_video_progress(db, current_user.id, video_id)
+    return VideoProgressResponse.model_validate(progress).model_copy(
+        update=watch_summary(db, current_user.id, video_id)
+    )
+
+def _stored_video_progress(db: Session, user_id: int, video_id: int) -> VideoProgress:
     progress = db.query(VideoProgress).filter(
         VideoProgress.video_id == video_id,
-        VideoProgress.user_id == current_user.id
+        VideoProgress.user_id == user_id
     ).first()
     
     if not progress:
         progress = VideoProgress(
-            user_id=current_user.id,
+            user_id=user_id,
             video_id=video_id
         )
         db.add(progress)
@@ -275,7 +336,25 @@ def update_video_progress(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Update user's progress for a specific video."""
+    """
+    Update user's progress for a specific video.
+
+    Heartbeats are buffered and written in bulk every
+    PROGRESS_FLUSH_INTERVAL_SECONDS, so this returns without touching the database.
+    Consecutive heartbeats also extend the watched ranges of the video.
+    """
+    if not video_exists(db, video_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+    watch_tracker.heartbeat(current_user.id, video_id, progress_update.last_position)
+    study_events.record(current_user.id, "video_progress", "video", video_id)
+    if settings.PROGRESS_WRITE_BEHIND:
+        return progress_buffer.record(
+            current_user.id, video_id, progress_update.progress, progress_update.last_position
+        )
+
     progress = db.query(VideoProgress).filter(
         VideoProgress.video_id == video_id,
         VideoProgress.user_id == current_user.id
@@ -296,28 +375,5 @@ def update_video_progress(
     return progress
 
 def calculate_quiz_score(quiz: Quiz, responses: Dict[str, Any]) -> float:
-    """Calculate quiz score based on responses."""
-    correct_answers = 0
-    total_questions = len(quiz.questions)
-    
-    for question in quiz.questions:
-        question_id = str(question['id'])
-        if question_id not in responses:
-            continue
-            
-        if question['question_type'] == 'multiple_choice':
-            # For multiple choice, check if selected answer is correct
-            selected_choice = responses[question_id]
-            correct_choice = next(
-                (choice for choice in question['choices'] if choice['is_correct']),
-                None
-            )
-            if correct_choice and selected_choice == correct_choice['id']:
-                correct_answers += 1
-        else:
-            # For short answer, we could implement more sophisticated checking
-            # For now, just check if an answer was provided
-            if responses[question_id].strip():
-                correct_answers += 1
-    
-    return (correct_answers / total_questions) * 100 if total_questions > 0 else 0 
\ No newline at end of file
+    """Calculate quiz score based on responses, from the quiz's compiled answer key."""
+    return grade(answer_keys.get(quiz), responses)
@@ -0,0 +1,153 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.etag import make_etag
+from app.core.replicas import RoutingSession
+from app.models.catalog_version import CatalogVersion
+
+
+class CatalogCache:
+    """
+    In-process cache for catalog reads (categories, courses, units, videos).
+
+    The catalog version is the one row of ``catalog_version``, which every
+    catalog write bumps inside its own transaction with ``bump(db)``, so all
+    workers share it. Each worker re-reads it at most once per
+    ``check_interval`` seconds, and right after its own catalog writes
+    commit. Entries are keyed by the version current when the read started,
+    so a read racing a write can never store pre-write data under the
+    post-write version. Reads through a replica session only fill the cache
+    from a replica that has replayed that version, and clients pinned to the
+    primary after a write key on the primary's version (see ``pin``).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        maxsize: int,
+        ttl: float,
+        check_interval: float,
+    ):
+        self.session_factory = session_factory
+        self._cache = LRUCache(maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.check_interval = check_interval
+        self.version = 0
+        # Monotonic time of the last version read; None forces a read
+        self._checked_at: Optional[float] = None
+
+    def current_version(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return self.version
+            # One thread reads the version, the others wait for it
+            db = self.session_factory()
+            try:
+                version = read_version(db)
+            finally:
+                db.close()
+            changed = version != self.version
+            self.version = version
+            self._checked_at = now
+        if changed:
+            # Entries from older versions can never be hit again
+            self._cache.clear()
+        return version
+
+    def bump(self, db: Session) -> None:
+        """
+        Bump the shared version in ``db``'s transaction; this worker picks up
+        the new version as soon as that transaction commits. Async endpoints
+        call it through ``AsyncSession.run_sync``.
+        """
+        result = db.execute(
+            update(CatalogVersion).where(CatalogVersion.id == 1).values(version=CatalogVersion.version + 1)
+        )
+        if not result.rowcount:
+            db.execute(insert(CatalogVersion).values(id=1, version=1))
+        db.info["catalog_version_bumped"] = True
+        if not event.contains(db, "after_commit", self._after_commit):
+            event.listen(db, "after_commit", self._after_commit)
+
+    def _after_commit(self, session: Session) -> None:
+        if session.info.pop("catalog_version_bumped", False):
+            self._expire()
+
+    def _expire(self) -> None:
+        with self._lock:
+            self._checked_at = None
+
+    def clear(self) -> None:
+        """Drop every entry and re-read the version on the next lookup."""
+        self._expire()
+        self._cache.clear()
+
+    def pin(self, db: Session) -> int:
+        """
+        The version to key and tag ``db``'s catalog reads with. A replica
+        session is held to replicas that have replayed it, and reads from the
+        primary otherwise, so nothing it loads is older than that version.
+        """
+        if isinstance(db, RoutingSession) and db.sticky:
+            # A client that just wrote reads the primary: key on its version
+            # rather than a poll that may predate the write
+            return self._observe(read_version(db))
+        version = self.current_version()
+        if isinstance(db, RoutingSession):
+            db.require_replica(lambda connection: read_version(connection) >= version)
+        return version
+
+    def _observe(self, version: int) -> int:
+        """Take ``version``, read elsewhere, if it is newer than the polled one."""
+        with self._lock:
+            changed = version > self.version
+            if changed:
+                self.version = version
+                self._checked_at = time.monotonic()
+        if changed:
+            self._cache.clear()
+        return version
+
+    def get_or_load(
+        self, name: str, params: Hashable, loader: Callable[[], Any], db: Optional[Session] = None
+    ) -> Any:
+        """``loader()``'s result, cached per version; ``loader`` reads through ``db``."""
+        key = (self.current_version() if db is None else self.pin(db), name, params)
+        value = self._cache.get(key)
+        if value is None:
+            value = loader()
+            self._cache.set(key, value)
+        return value
+
+    def etag(self, *parts: Any, version: int) -> str:
+        """
+        ETag for a catalog representation: the shared version plus ``parts``,
+        so every worker tags unchanged data the same way. ``version`` comes
+        from where the body is read: ``pin`` on its session, or the version
+        read in the same statement as the other inputs.
+        """
+        return make_etag(version, *parts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"version": self.version, **self._cache.stats()}
+
+
+def read_version(db: Union[Session, Connection]) -> int:
+    return db.execute(select(CatalogVersion.version).where(CatalogVersion.id == 1)).scalar() or 0
+
+
+catalog_cache = CatalogCache(
+    SessionLocal,
+    maxsize=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    check_interval=settings.CATALOG_VERSION_CHECK_SECONDS,
+)
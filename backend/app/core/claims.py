@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.models.user_token_version import UserTokenVersion
+
+logger = logging.getLogger(__name__)
+
+# User fields whose change revokes the user's outstanding claims tokens
+REVOKING_FIELDS = frozenset({"hashed_password", "is_active", "is_admin"})
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+@dataclass
+class TokenPrincipal:
+    """The caller as described by a claims token; stands in for ``User`` in auth dependencies."""
+
+    id: int
+    email: Optional[str]
+    is_active: bool
+    is_admin: bool
+
+
+def user_claims(user: User, token_version: int) -> Dict[str, Any]:
+    """Claims that let get_current_user authorize the token without loading the user."""
+    return {
+        "uid": user.id,
+        "act": bool(user.is_active),
+        "adm": bool(user.is_admin),
+        "ver": token_version,
+    }
+
+
+def revokes_tokens(user: User, changes: Dict[str, Any]) -> bool:
+    """Whether applying ``changes`` to ``user`` must revoke their claims tokens."""
+    return any(
+        field in REVOKING_FIELDS and getattr(user, field) != value
+        for field, value in changes.items()
+    )
+
+
+def bump_token_version(db: Session, user_id: int) -> None:
+    """
+    Revoke every claims token issued to ``user_id`` so far, in ``db``'s
+    transaction. Async endpoints call it through ``AsyncSession.run_sync``.
+    """
+    now = datetime.now(timezone.utc)
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        result = db.execute(
+            update(UserTokenVersion)
+            .where(UserTokenVersion.user_id == user_id)
+            .values(token_version=UserTokenVersion.token_version + 1, changed_at=now)
+        )
+        if not result.rowcount:
+            db.add(UserTokenVersion(user_id=user_id, token_version=1, changed_at=now))
+        return
+    stmt = insert(UserTokenVersion).values(user_id=user_id, token_version=1, changed_at=now)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserTokenVersion.user_id],
+        set_={"token_version": UserTokenVersion.token_version + 1, "changed_at": now},
+    ))
+
+
+class TokenVersions:
+    """
+    In-memory user id -> (token version, is_active), used to revoke claims tokens.
+
+    Changes that revoke tokens bump the user's row in ``user_token_versions``,
+    so tokens issued before the change stop validating. ``refresh()`` reads
+    only rows whose changed_at moved since the last refresh, plus a periodic
+    full reload that also notices deleted or deactivated users. Unknown users
+    are loaded one row at a time on first sight; ids with no user are
+    remembered until the next refresh interval, so tokens of a deleted user
+    do not cost a query each. Local writes call ``invalidate`` so this
+    worker never waits for the next refresh.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        refresh_interval: float,
+        full_refresh_every: int,
+        max_missing: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.full_refresh_every = full_refresh_every
+        self._versions: Dict[int, Tuple[int, bool]] = {}
+        self._missing = LRUCache(max_missing, ttl=refresh_interval)
+        self._lock = threading.Lock()
+        self._high_water: Optional[datetime] = None
+        self._loaded = False
+        self._refreshes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def is_current(self, user_id: int, version: int) -> bool:
+        """Whether a token for ``user_id`` issued at ``version`` is still valid."""
+        with self._lock:
+            entry = self._versions.get(user_id)
+        if entry is None:
+            entry = self._load_one(user_id)
+            if entry is None:
+                return False
+        current_version, is_active = entry
+        return is_active and version >= current_version
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._versions.pop(user_id, None)
+        self._missing.pop(user_id)
+
+    def _load_one(self, user_id: int) -> Optional[Tuple[int, bool]]:
+        if self._missing.get(user_id) is not None:
+            return None
+        db = self.session_factory()
+        try:
+            row = db.execute(
+                select(User.is_active, UserTokenVersion.token_version)
+                .outerjoin(UserTokenVersion, UserTokenVersion.user_id == User.id)
+                .where(User.id == user_id)
+            ).first()
+        finally:
+            db.close()
+        if row is None:
+            self._missing.set(user_id, True)
+            return None
+        entry = (row.token_version or 0, bool(row.is_active))
+        with self._lock:
+            self._versions[user_id] = entry
+        return entry
+
+    def refresh(self) -> int:
+        """Pull changed users into the map; returns the number of rows read."""
+        full = not self._loaded or self._refreshes % self.full_refresh_every == 0
+        if full:
+            query = select(
+                User.id, User.is_active, UserTokenVersion.token_version, UserTokenVersion.changed_at
+            ).outerjoin(UserTokenVersion, UserTokenVersion.user_id == User.id)
+        else:
+            # A version row without a user is a deleted user
+            query = select(
+                UserTokenVersion.user_id.label("id"),
+                User.is_active,
+                UserTokenVersion.token_version,
+                UserTokenVersion.changed_at,
+            ).outerjoin(User, User.id == UserTokenVersion.user_id)
+            if self._high_water is not None:
+                # >= so rows sharing the high-water timestamp are never skipped
+                query = query.where(UserTokenVersion.changed_at >= self._high_water)
+        db = self.session_factory()
+        try:
+            rows = db.execute(query).all()
+        finally:
+            db.close()
+
+        entries = {row.id: (row.token_version or 0, bool(row.is_active)) for row in rows}
+        stamps = [row.changed_at for row in rows if row.changed_at is not None]
+        with self._lock:
+            if full:
+                self._versions = entries
+            else:
+                self._versions.update(entries)
+            if stamps:
+                self._high_water = max(stamps + ([self._high_water] if self._high_water else []))
+            self._loaded = True
+            self._refreshes += 1
+        return len(rows)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.refresh)
+            except Exception:
+                logger.exception("Token version refresh failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+token_versions = TokenVersions(
+    SessionLocal,
+    refresh_interval=settings.TOKEN_VERSION_REFRESH_SECONDS,
+    full_refresh_every=settings.TOKEN_VERSION_FULL_REFRESH_EVERY,
+)
@@ -15,6 +15,105 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "app")
     
     DATABASE_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}/{POSTGRES_DB}"
+
+    # Startup work; migrations normally own the schema, and the seed users are
+    # only for local development
+    DB_CREATE_ALL_ON_STARTUP: bool = True
+    SEED_TEST_USERS: bool = True
+
+    # Connection pool settings (applied to the sync and async engines)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+
+    # Read replicas for catalog GET endpoints (empty list = primary only)
+    DATABASE_REPLICA_URLS: List[str] = []
+    DB_REPLICA_SELECTION: str = "round_robin"  # or "least_connections"
+    DB_REPLICA_RETRY_SECONDS: float = 30  # skip a failed replica for this long
+    READ_YOUR_WRITES_SECONDS: float = 5  # pin a client to the primary after a write
+
+    # Per-request SQL statistics (X-DB-Query-Count / X-DB-Time-Ms headers)
+    QUERY_STATS_ENABLED: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 10  # identical statements per request before warning
+
+    # In-process catalog cache for course/unit/video listings, keyed by the
+    # shared catalog version, which each worker re-reads at most this often
+    CATALOG_CACHE_MAX_ENTRIES: int = 1024
+    CATALOG_CACHE_TTL_SECONDS: float = 300
+    CATALOG_VERSION_CHECK_SECONDS: float = 1.0
+
+    # Write-behind buffer for video progress heartbeats; the flush interval is
+    # the most progress a crash can lose
+    PROGRESS_WRITE_BEHIND: bool = True
+    PROGRESS_FLUSH_INTERVAL_SECONDS: float = 2.0
+    PROGRESS_BUFFER_MAX_PENDING: int = 10000
+    PROGRESS_BATCH_MAX_ITEMS: int = 500  # per PUT /videos/progress:batch
+    # A video counts as completed (towards unit and course rollups) once this % of it has been watched
+    VIDEO_COMPLETE_PROGRESS: float = 95
+
+    # /ws/progress only hands an update to the buffer when progress moved by
+    # PROGRESS_WS_MIN_DELTA points, every PROGRESS_WS_PERSIST_SECONDS, or on close
+    PROGRESS_WS_MIN_DELTA: float = 1.0
+    PROGRESS_WS_PERSIST_SECONDS: float = 10
+
+    # Watched ranges per (user, video): two heartbeats cover the span between
+    # them when the position moved forward at most WATCH_MAX_PLAYBACK_RATE
+    # times the elapsed time, at most WATCH_MAX_GAP_SECONDS apart
+    WATCH_MAX_PLAYBACK_RATE: float = 2.0
+    WATCH_MAX_GAP_SECONDS: float = 60
+    WATCH_TRACKER_MAX_ENTRIES: int = 50000
+    # Cached states are reloaded after this long, picking up other workers' ranges
+    WATCH_TRACKER_STATE_TTL_SECONDS: float = 300
+
+    # Study events (player heartbeats, quiz attempts) are queued and appended to
+    # study_events in bulk; a repeat of the same event within
+    # STUDY_EVENT_MIN_INTERVAL_SECONDS is dropped. Events of one content more
+    # than STUDY_SESSION_GAP_SECONDS apart start a new learning session
+    STUDY_EVENTS_ENABLED: bool = True
+    STUDY_EVENTS_FLUSH_INTERVAL_SECONDS: float = 10
+    STUDY_EVENTS_MAX_PENDING: int = 20000
+    STUDY_EVENT_MIN_INTERVAL_SECONDS: float = 15
+    STUDY_SESSION_GAP_SECONDS: float = 1800
+
+    # Admin exports stream from a server-side cursor, EXPORT_BATCH_SIZE rows per fetch
+    EXPORT_BATCH_SIZE: int = 2000
+    # Course funnel reports read video_progress in chunks of FUNNEL_BATCH_SIZE
+    # rows and are cached per course for FUNNEL_CACHE_TTL_SECONDS
+    FUNNEL_BATCH_SIZE: int = 50000
+    FUNNEL_CACHE_TTL_SECONDS: float = 300
+    FUNNEL_CACHE_MAX_ENTRIES: int = 256
+
+    # Compiled quiz answer keys, by quiz id
+    QUIZ_ANSWER_KEY_CACHE_MAX_ENTRIES: int = 2000
+
+    # Resolved users by token hash; the TTL bounds how long other workers keep
+    # a user that was changed or deleted elsewhere
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+
+    # bcrypt runs on its own bounded pool; requests beyond workers + queue get a 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # Opt-in stateless auth: tokens carry user id, active/admin flags and a
+    # token version, and revocation goes through an in-memory version map
+    AUTH_CLAIMS_MODE: bool = False
+    TOKEN_VERSION_REFRESH_SECONDS: float = 5
+    TOKEN_VERSION_FULL_REFRESH_EVERY: int = 60  # refreshes between full reloads
+
+    # Login throttling: token buckets per client IP and per username, checked
+    # before any password work. A Redis URL (needs the redis package) shares
+    # the buckets across workers instead of keeping them per process
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 20
+    LOGIN_USER_BURST: int = 5
+    LOGIN_USER_PER_MINUTE: float = 5
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 100000
+    LOGIN_RATE_LIMIT_REDIS_URL: Optional[str] = None
     
     UPLOAD_DIRECTORY: str = os.getenv("UPLOAD_DIRECTORY", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads"))
     
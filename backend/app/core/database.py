@@ -1,22 +1,94 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi import Request
+from starlette.requests import HTTPConnection
 import os
 
 from app.core.config import settings
+from app.core.pool_metrics import PoolMetrics, instrument_engine, pool_options
+from app.core.replicas import ReadYourWrites, ReplicaRouter, RoutingSession, client_key
+
+pool_metrics = PoolMetrics("primary")
+async_pool_metrics = PoolMetrics("primary-async")
 
 # Use SQLite for testing
 if os.environ.get("TESTING") == "1":
     DATABASE_URL = "sqlite:///./test.db"
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    async_pool_kwargs = {}
 else:
     # Convert the PostgresDsn to a string
-    db_url = str(settings.DATABASE_URL)
-    engine = create_engine(db_url)
+    DATABASE_URL = str(settings.DATABASE_URL)
+    engine = create_engine(DATABASE_URL, **pool_options(pool_metrics, settings))
+    async_pool_kwargs = pool_options(async_pool_metrics, settings, is_async=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto its asyncio driver (asyncpg / aiosqlite)."""
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+
+async_engine = create_async_engine(
+    get_async_database_url(DATABASE_URL), **async_pool_kwargs
+)
+
+instrument_engine(engine, pool_metrics)
+instrument_engine(async_engine.sync_engine, async_pool_metrics)
+
+# (metrics, engine) pairs reported by the admin pool endpoint
+monitored_pools = [(pool_metrics, engine), (async_pool_metrics, async_engine.sync_engine)]
+
+# Read replicas used by the catalog GET endpoints
+replica_engines = []
+async_replica_engines = []
+for index, replica_url in enumerate(settings.DATABASE_REPLICA_URLS):
+    replica_metrics = PoolMetrics(f"replica-{index}")
+    async_replica_metrics = PoolMetrics(f"replica-{index}-async")
+    replica_engine = create_engine(replica_url, **pool_options(replica_metrics, settings))
+    async_replica_engine = create_async_engine(
+        get_async_database_url(replica_url),
+        **pool_options(async_replica_metrics, settings, is_async=True),
+    )
+    instrument_engine(replica_engine, replica_metrics)
+    instrument_engine(async_replica_engine.sync_engine, async_replica_metrics)
+    replica_engines.append(replica_engine)
+    async_replica_engines.append(async_replica_engine)
+    monitored_pools.append((replica_metrics, replica_engine))
+    monitored_pools.append((async_replica_metrics, async_replica_engine.sync_engine))
+
+replica_router = ReplicaRouter(
+    replica_engines,
+    strategy=settings.DB_REPLICA_SELECTION,
+    retry_after=settings.DB_REPLICA_RETRY_SECONDS,
+)
+async_replica_router = ReplicaRouter(
+    [replica.sync_engine for replica in async_replica_engines],
+    strategy=settings.DB_REPLICA_SELECTION,
+    retry_after=settings.DB_REPLICA_RETRY_SECONDS,
+)
+read_your_writes = ReadYourWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
+
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
@@ -25,10 +97,51 @@ def get_db():
     finally:
         db.close()
 
+
+# Dependency to get an async DB session for `async def` endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency to get a read-only DB session, served from a replica when one is
+# configured and the client has not written within READ_YOUR_WRITES_SECONDS
+def get_read_db(request: Request):
+    db = ReadSessionLocal(
+        router=replica_router,
+        use_primary=read_your_writes.is_sticky(client_key(request)),
+    )
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for streamed responses and websockets, which outlive one request:
+# they open short-lived read sessions from this factory as they need them
+def get_read_session_factory(request: HTTPConnection):
+    use_primary = read_your_writes.is_sticky(client_key(request))
+    return lambda: ReadSessionLocal(router=replica_router, use_primary=use_primary)
+
+
+async def get_async_read_db(request: Request):
+    async with AsyncSession(
+        bind=async_engine,
+        sync_session_class=RoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+        router=async_replica_router,
+        use_primary=read_your_writes.is_sticky(client_key(request)),
+    ) as db:
+        yield db
+
 # Import all models to ensure they are registered with the Base metadata
 from app.models.base import Base
 from app.models.user import User
 from app.models.learning import Category, Course, Unit, Video
+import app.db.base  # noqa: F401  (remaining models and composite indexes)
+
 
-# Create the tables if they don't exist
-Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+def create_tables() -> None:
+    """Create missing tables; deployments that run Alembic turn this off at startup."""
+    Base.metadata.create_all(bind=engine)
@@ -39,34 +39,37 @@ def init_db(db: Session) -> None:
     logger.info("Initial database setup completed")
 
 
+# Seed accounts for local testing. The hashes are bcrypt("admin123") and
+# bcrypt("user123") computed once, so seeding never pays for bcrypt at boot.
+TEST_USERS = [
+    {
+        "email": "admin@example.com",
+        "full_name": "Admin User",
+        "hashed_password": "$2b$12$ieG7IQqS3KvB/ukd7Qa7BO6ex9P56uT1DCmN6wrNl.5NZtJ/cG32q",
+        "is_superuser": True,
+    },
+    {
+        "email": "user@example.com",
+        "full_name": "Test User",
+        "hashed_password": "$2b$12$pkF2EPRMKlVptjeHX6/lDee8X0BeCsWjcijtEjFsF7bUOfIdbaHyW",
+        "is_superuser": False,
+    },
+]
+
+
 def init_test_users(db: Session) -> None:
     """Initialize test admin and regular user if they don't exist."""
-    
-    # Check if admin exists
-    admin = db.query(User).filter(User.email == "admin@example.com").first()
-    if not admin:
-        admin = User(
-            email="admin@example.com",
-            full_name="Admin User",
-            hashed_password=get_password_hash("admin123"),
-            is_active=True,
-            is_superuser=True,
-        )
-        db.add(admin)
-        logger.info("Created test admin user")
-    
-    # Check if regular user exists
-    user = db.query(User).filter(User.email == "user@example.com").first()
-    if not user:
-        user = User(
-            email="user@example.com",
-            full_name="Test User",
-            hashed_password=get_password_hash("user123"),
-            is_active=True,
-            is_superuser=False,
-        )
-        db.add(user)
-        logger.info("Created test regular user")
-    
+    emails = [seed["email"] for seed in TEST_USERS]
+    existing = {
+        email for (email,) in db.query(User.email).filter(User.email.in_(emails))
+    }
+    if len(existing) == len(emails):
+        return
+
+    for seed in TEST_USERS:
+        if seed["email"] not in existing:
+            db.add(User(is_active=True, **seed))
+            logger.info("Created test user %s", seed["email"])
+
     db.commit()
-    logger.info("Test users initialization completed") 
\ No newline at end of file
+    logger.info("Test users initialization completed")
@@ -0,0 +1,83 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor holding the sort key of the last row on a page."""
+    return base64.urlsafe_b64encode(json.dumps(list(values), default=_json_default).encode()).decode().rstrip("=")
+
+
+def _cursor_value(column: Any, value: Any) -> Any:
+    """Datetimes travel as ISO strings; turn them back for the comparison."""
+    if isinstance(value, str):
+        try:
+            if column.type.python_type is datetime:
+                return datetime.fromisoformat(value)
+        except (NotImplementedError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+    return value
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return values
+
+
+def paginate(
+    query: Query,
+    order_by: Sequence[Any],
+    *,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Order ``query`` by the unique key ``order_by`` and return one page of rows
+    plus the cursor for the next page (None on the last page).
+
+    With a cursor the page starts after the encoded key (a range scan on the
+    matching index); without one it falls back to ``skip`` as an offset, so
+    existing skip/limit clients keep working and still receive a cursor.
+    ``descending`` reverses every column of the key.
+    """
+    if limit < 1:
+        return [], None
+    query = query.order_by(*(column.desc() if descending else column for column in order_by))
+    if cursor is not None:
+        after = [_cursor_value(column, value) for column, value in zip(order_by, decode_cursor(cursor, len(order_by)))]
+        key, after = (order_by[0], after[0]) if len(order_by) == 1 else (tuple_(*order_by), tuple_(*after))
+        query = query.filter(key < after if descending else key > after)
+    elif skip:
+        query = query.offset(skip)
+
+    # One extra row tells us whether another page exists without a COUNT
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in order_by])
@@ -0,0 +1,90 @@
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.user import User
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """
+    Users already resolved from a bearer token, keyed by the token's hash.
+
+    A hit skips the JWT decode and the user lookup. Entries hold a detached
+    column snapshot, never a session-bound instance, and are re-attached to the
+    request's session with ``merge(load=False)`` (no SELECT). An entry lives
+    for at most the TTL and never past the token's own expiry; user updates and
+    deletes call ``invalidate_user``. Other workers keep their entry until the
+    TTL runs out, so the TTL bounds how long a deactivated user stays signed in.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._keys_by_user: Dict[int, Set[str]] = defaultdict(set)
+        self.ttl = ttl
+
+    def get(self, token: str, db: Session) -> Optional[User]:
+        snapshot = self._cache.get(token_key(token))
+        if snapshot is None:
+            return None
+        return db.merge(_detached_copy(snapshot), load=False)
+
+    def set(self, token: str, user: User, expires_at: Optional[float] = None) -> None:
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        key = token_key(token)
+        snapshot = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        self._cache.set(key, snapshot, ttl=ttl)
+        with self._lock:
+            self._keys_by_user[user.id].add(key)
+            if len(self._keys_by_user) > self._cache.maxsize:
+                self._prune()
+
+    def _prune(self) -> None:
+        """Forget index entries whose cache entries were evicted or expired."""
+        for user_id in list(self._keys_by_user):
+            live = {key for key in self._keys_by_user[user_id] if key in self._cache}
+            if live:
+                self._keys_by_user[user_id] = live
+            else:
+                del self._keys_by_user[user_id]
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+        for key in keys:
+            self._cache.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys_by_user.clear()
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+def _detached_copy(snapshot: Dict[str, Any]) -> User:
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # optional, only needed for a shared backend
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottled(Exception):
+    """Raised when a login attempt is over its IP or username budget."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Too many login attempts, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class MemoryBucketBackend:
+    """
+    Token buckets in this process, at most ``max_keys`` of them.
+
+    A bucket left alone long enough to refill completely is indistinguishable
+    from a missing one, so it expires then; beyond that, the least recently
+    used bucket is evicted first.
+    """
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, max_keys: int):
+        self._buckets = LRUCache(max_keys)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / refill_per_second
+            self._buckets.set(key, (tokens, now), ttl=(capacity - tokens) / refill_per_second)
+        return retry_after
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        cache_stats = self._buckets.stats()
+        return {"keys": cache_stats["size"], "evictions": cache_stats["evictions"]}
+
+
+# KEYS[1] = bucket; ARGV = capacity, refill per second, now (seconds)
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1)
+return tostring(retry)
+"""
+
+
+class RedisBucketBackend:
+    """Token buckets in Redis, shared by every worker; each take is one atomic script call."""
+
+    name = "redis"
+    # Each take is a network round trip
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "login-throttle:"):
+        if redis is None:
+            raise RuntimeError("LOGIN_RATE_LIMIT_REDIS_URL is set but the redis package is not installed")
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self.prefix = prefix
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[capacity, refill_per_second, time.time()]))
+
+    def reset(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": None, "evictions": None}
+
+
+class LoginThrottle:
+    """
+    Per-IP and per-username login budgets, checked before any password work.
+
+    The IP bucket is checked first so a rejected sprayer does not also drain
+    the budget of the accounts it targets. If the backend is unreachable,
+    logins are let through and counted under ``backend_errors``.
+    """
+
+    def __init__(
+        self,
+        backend,
+        ip_burst: float,
+        ip_per_minute: float,
+        user_burst: float,
+        user_per_minute: float,
+        enabled: bool = True,
+    ):
+        self.backend = backend
+        self.ip_limit = (ip_burst, ip_per_minute / 60)
+        self.user_limit = (user_burst, user_per_minute / 60)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected_ip = 0
+        self.rejected_user = 0
+        self.backend_errors = 0
+
+    def check(self, client_ip: Optional[str], username: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            retry_after = self.backend.take(f"ip:{client_ip}", *self.ip_limit)
+            if retry_after:
+                self._count("rejected_ip")
+                raise LoginThrottled(retry_after)
+            retry_after = self.backend.take(f"user:{username.strip().lower()}", *self.user_limit)
+            if retry_after:
+                self._count("rejected_user")
+                raise LoginThrottled(retry_after)
+        except LoginThrottled:
+            raise
+        except Exception:
+            logger.exception("Login throttle backend failed, letting the attempt through")
+            self._count("backend_errors")
+            return
+        self._count("allowed")
+
+    async def acheck(self, client_ip: Optional[str], username: str) -> None:
+        """``check`` for async endpoints, run off the event loop when the backend blocks."""
+        if self.enabled and self.backend.blocking:
+            await run_in_threadpool(self.check, client_ip, username)
+        else:
+            self.check(client_ip, username)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def reset(self) -> None:
+        self.backend.reset()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "allowed": self.allowed,
+                "rejected_ip": self.rejected_ip,
+                "rejected_user": self.rejected_user,
+                "backend_errors": self.backend_errors,
+            }
+        return {"enabled": self.enabled, "backend": self.backend.name, **counters, **self.backend.stats()}
+
+
+login_throttle = LoginThrottle(
+    RedisBucketBackend(settings.LOGIN_RATE_LIMIT_REDIS_URL)
+    if settings.LOGIN_RATE_LIMIT_REDIS_URL
+    else MemoryBucketBackend(settings.LOGIN_RATE_LIMIT_MAX_KEYS),
+    ip_burst=settings.LOGIN_IP_BURST,
+    ip_per_minute=settings.LOGIN_IP_PER_MINUTE,
+    user_burst=settings.LOGIN_USER_BURST,
+    user_per_minute=settings.LOGIN_USER_PER_MINUTE,
+    enabled=settings.LOGIN_RATE_LIMIT_ENABLED,
+)
@@ -0,0 +1,172 @@
+import hashlib
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+
+
+class ReplicaRouter:
+    """
+    Picks a read replica engine and skips replicas that recently failed to connect.
+
+    Replicas are tried in strategy order; a replica whose connect attempt fails
+    is marked down for ``retry_after`` seconds. When every replica is down,
+    ``connect()`` returns None and the caller falls back to the primary.
+    """
+
+    def __init__(
+        self,
+        replicas: List[Engine],
+        strategy: str = ROUND_ROBIN,
+        retry_after: float = 30.0,
+    ):
+        if strategy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica selection strategy: {strategy}")
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._counter = itertools.count()
+        self._down_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[Engine]:
+        """Healthy replicas in the order they should be tried."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [
+                replica for index, replica in enumerate(self.replicas)
+                if self._down_until.get(index, 0) <= now
+            ]
+        if not healthy:
+            return []
+        if self.strategy == LEAST_CONNECTIONS:
+            return sorted(healthy, key=_checked_out)
+        start = next(self._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._down_until[self.replicas.index(replica)] = time.monotonic() + self.retry_after
+
+    def connect(self) -> Optional[Connection]:
+        """Open a connection on the first reachable replica, or return None."""
+        for replica in self.candidates():
+            try:
+                return replica.connect()
+            except exc.DBAPIError:
+                logger.warning("Read replica %s is unreachable, skipping it", replica.url)
+                self.mark_down(replica)
+        return None
+
+
+def _checked_out(replica: Engine) -> int:
+    pool = replica.pool
+    return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+
+class ReadYourWrites:
+    """Remembers clients that wrote recently so their reads stay on the primary."""
+
+    def __init__(self, window: float, max_entries: int = 10000):
+        self.window = window
+        self.max_entries = max_entries
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark_write(self, key: Optional[str]) -> None:
+        if not key or self.window <= 0:
+            return
+        with self._lock:
+            self._expiry[key] = time.monotonic() + self.window
+            self._expiry.move_to_end(key)
+            while len(self._expiry) > self.max_entries:
+                self._expiry.popitem(last=False)
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        with self._lock:
+            expiry = self._expiry.get(key)
+            if expiry is None:
+                return False
+            if expiry <= time.monotonic():
+                del self._expiry[key]
+                return False
+            return True
+
+
+def client_key(request) -> Optional[str]:
+    """Identify the caller for read-your-writes: bearer token if present, else client address."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    if request.client:
+        return request.client.host
+    return None
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica connection and everything else to the primary.
+
+    The replica connection is opened lazily on first use, so requests that never
+    touch the database never check out a connection. Flushes always go to the
+    primary bind.
+    """
+
+    def __init__(self, router: Optional[ReplicaRouter] = None, use_primary: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self._router = router
+        # The caller asked for the primary (read-your-writes), as opposed to
+        # having no replica to use
+        self.sticky = use_primary
+        self._use_primary = use_primary or router is None or not router.replicas
+        self._replica_connection: Optional[Connection] = None
+        self._replica_check: Optional[Callable[[Connection], bool]] = None
+
+    def require_replica(self, check: Callable[[Connection], bool]) -> None:
+        """
+        Only read from a replica connection for which ``check`` holds (e.g. it
+        has replayed a given write), otherwise from the primary. The check runs
+        once, when the replica connection is opened, or now if it already is.
+        """
+        self._replica_check = check
+        if self._replica_connection is not None and not check(self._replica_connection):
+            self._leave_replica()
+
+    def _leave_replica(self) -> None:
+        self._replica_connection.close()
+        self._replica_connection = None
+        self._use_primary = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._use_primary or self._flushing:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self._replica_connection is None:
+            self._replica_connection = self._router.connect()
+            if self._replica_connection is not None and self._replica_check is not None:
+                if not self._replica_check(self._replica_connection):
+                    logger.info("Read replica is behind, reading from the primary")
+                    self._leave_replica()
+            if self._replica_connection is None:
+                self._use_primary = True
+                return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return self._replica_connection
+
+    def close(self) -> None:
+        super().close()
+        if self._replica_connection is not None:
+            self._replica_connection.close()
+            self._replica_connection = None
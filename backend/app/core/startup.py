@@ -0,0 +1,66 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Wall-clock time spent in each startup phase of this worker.
+
+    The clock starts when the module is first imported, which happens early
+    in ``app.main``, so the ``imports`` phase of the first startup covers
+    loading the app itself. Each startup calls ``begin()`` first, so a later
+    one in the same process (tests re-entering the lifespan, an app factory)
+    is timed on its own.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._mark = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.ready = False
+
+    def begin(self) -> None:
+        """Start a startup run, forgetting the phases of any previous one."""
+        if self.phases or self.ready:
+            self.started = self._mark = time.perf_counter()
+            self.phases = []
+            self.ready = False
+
+    def mark(self, name: str) -> None:
+        """Record the time since the previous phase ended as ``name``."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._mark))
+        self._mark = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._mark = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def finish(self) -> None:
+        self.ready = True
+        logger.info(
+            "Startup finished in %.0f ms (%s)",
+            self.total() * 1000,
+            ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases),
+        )
+
+    def total(self) -> float:
+        return self._mark - self.started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "total_ms": self.total() * 1000,
+            "phases": [{"name": name, "ms": seconds * 1000} for name, seconds in self.phases],
+        }
+
+
+startup_timer = StartupTimer()
@@ -7,6 +7,13 @@ from app.models.quiz import (  # noqa
     QuizAttempt,
     QuizQuestionResponse,
 )
+from app.models.watch_interval import VideoWatchIntervals  # noqa
+from app.models.study_event import StudyEvent  # noqa
+from app.models.daily_activity import DailyUserActivity  # noqa
+from app.models.progress_summary import CourseProgressSummary, UserProgressSummary  # noqa
+from app.models.quiz_question_stats import QuizQuestionStats  # noqa
+from app.models.catalog_version import CatalogVersion  # noqa
+from app.models.user_token_version import UserTokenVersion  # noqa
 from app.models.learning import (  # noqa
     Category,
     Course,
@@ -19,4 +26,34 @@ from app.models.learning import (  # noqa
     VideoProcessingJob,
     LLMInteraction,
     VideoProgress,
-) 
\ No newline at end of file
+) 
+from sqlalchemy import Index, func, text  # noqa: E402
+
+# (order, id) keys used by cursor pagination on the catalog list endpoints;
+# existing databases get them from migration 5d2c8e1f4a7b
+Index("ix_courses_order_id", Course.order, Course.id)
+Index("ix_courses_category_order_id", Course.category_id, Course.order, Course.id)
+Index("ix_units_order_id", Unit.order, Unit.id)
+Index("ix_videos_order_id", Video.order, Video.id)
+Index("ix_videos_unit_order_id", Video.unit_id, Video.order, Video.id)
+
+# Open learning session per (user, content), looked up on every study event flush; migration c4d9e2a6f813
+Index(
+    "ix_learning_sessions_user_content_status",
+    LearningSession.user_id, LearningSession.content_type, LearningSession.content_id, LearningSession.status,
+)
+
+# Active sessions by end time, for closing idle ones on each flush; migration d8a4f6c2b913
+Index(
+    "ix_learning_sessions_active_end_time",
+    LearningSession.end_time,
+    postgresql_where=text("status = 'active'"),
+    sqlite_where=text("status = 'active'"),
+)
+
+# Case-insensitive username prefix search on the admin progress list; migration f7b3d1e8c245
+Index(
+    "ix_users_username_lower",
+    func.lower(User.username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+)
@@ -1,12 +1,25 @@
-from fastapi import FastAPI
+# Imported first so the startup clock also covers loading the rest of the app
+from app.core.startup import startup_timer
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.api.api import api_router
 from fastapi.staticfiles import StaticFiles
+import math
 import os
 import logging
-from app.core.database import SessionLocal
+from app.core.claims import token_versions
+from app.core.database import SessionLocal, create_tables, read_your_writes
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_stats import track_queries
+from app.core.rate_limit import LoginThrottled
+from app.core.replicas import client_key
+from app.core.security import PasswordHasherBusy
 from app.core.init_db import init_test_users
+from app.services.video_progress import progress_buffer
+from app.services.study_events import study_events
+from app.services.watch_intervals import watch_tracker
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -24,8 +37,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Pin clients to the primary for a short window after they write, so reads
+# routed to replicas still see their own writes
+@app.middleware("http")
+async def track_client_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        read_your_writes.mark_write(client_key(request))
+    return response
+
+# Count SQL statements and DB time per request and flag likely N+1 patterns
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    if not settings.QUERY_STATS_ENABLED:
+        return await call_next(request)
+    with track_queries() as stats:
+        response = await call_next(request)
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.1f}"
+    for shape, count in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning(
+            "Possible N+1 on %s %s: %d x %s", request.method, request.url.path, count, shape
+        )
+    return response
+
+# Shed password hashing load fast instead of queueing behind a login storm
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many password operations in progress, retry shortly"},
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+# Reject over-budget logins before they reach the database or bcrypt
+@app.exception_handler(LoginThrottled)
+async def login_throttled_handler(request: Request, exc: LoginThrottled):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many login attempts, retry later"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
 # Include the API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -35,12 +91,34 @@ app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIRECTORY), name="up
 
 @app.on_event("startup")
 async def startup_event():
-    # Initialize test users
-    db = SessionLocal()
-    try:
-        init_test_users(db)
-    finally:
-        db.close()
+    startup_timer.begin()
+    startup_timer.mark("imports")
+    if settings.DB_CREATE_ALL_ON_STARTUP:
+        with startup_timer.phase("create_all"):
+            create_tables()
+
+    if settings.SEED_TEST_USERS:
+        with startup_timer.phase("seed_users"):
+            db = SessionLocal()
+            try:
+                init_test_users(db)
+            finally:
+                db.close()
+
+    progress_buffer.start()
+    watch_tracker.start()
+    study_events.start()
+    if settings.AUTH_CLAIMS_MODE:
+        token_versions.start()
+    startup_timer.finish()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Drain buffered progress heartbeats before the process exits
+    await progress_buffer.stop()
+    await watch_tracker.stop()
+    await study_events.stop()
+    await token_versions.stop()
 
 @app.get("/")
 def root():
@@ -0,0 +1,24 @@
+from sqlalchemy import DDL, Column, Integer, event
+
+from app.db.base_class import Base
+
+
+class CatalogVersion(Base):
+    """
+    The single row (id 1) holding the catalog version, bumped in the same
+    transaction as every write to categories, courses, units or videos so
+    that all workers key their catalog caches and ETags on one value.
+    """
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+# Databases built with create_all get the row the migration inserts
+event.listen(
+    CatalogVersion.__table__,
+    "after_create",
+    DDL("INSERT INTO catalog_version (id, version) VALUES (1, 0)"),
+)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, UniqueConstraint
+
+from app.db.base_class import Base
+
+
+class DailyUserActivity(Base):
+    """
+    Seconds studied per user, UTC day and category, added to as learning
+    sessions complete. ``category_id`` 0 holds content outside any category;
+    it is not a foreign key so deleting a category keeps the history.
+    """
+
+    __tablename__ = "daily_user_activity"
+    # Also the index behind per-user date range reads
+    __table_args__ = (UniqueConstraint("user_id", "day", "category_id"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    category_id = Column(Integer, nullable=False, default=0)
+    seconds = Column(Integer, nullable=False, default=0)
+    sessions = Column(Integer, nullable=False, default=0)
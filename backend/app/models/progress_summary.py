@@ -0,0 +1,38 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer
+
+from app.db.base_class import Base
+
+
+class UserProgressSummary(Base):
+    """
+    One row per user with course progress, aggregated from ``course_progress``
+    and moved by the same deltas whenever those rows change. Backs the admin
+    progress dashboard's sorting, filtering and keyset paging.
+    """
+
+    __tablename__ = "user_progress_summary"
+    __table_args__ = (
+        Index("ix_user_progress_summary_last_accessed", "last_accessed", "user_id"),
+        Index("ix_user_progress_summary_avg_progress", "avg_progress", "user_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    courses_started = Column(Integer, nullable=False, default=0)
+    courses_completed = Column(Integer, nullable=False, default=0)
+    # Sum of progress_percentage, so avg_progress can be kept up to date by deltas
+    progress_total = Column(Float, nullable=False, default=0)
+    avg_progress = Column(Float, nullable=False, default=0)
+    last_accessed = Column(DateTime(timezone=True), nullable=False)
+
+
+class CourseProgressSummary(Base):
+    """Learner counts and average progress per course, aggregated from ``course_progress``."""
+
+    __tablename__ = "course_progress_summary"
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    learners = Column(Integer, nullable=False, default=0)
+    completed_learners = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Float, nullable=False, default=0)
+    avg_progress = Column(Float, nullable=False, default=0)
+    last_accessed = Column(DateTime(timezone=True), nullable=True)
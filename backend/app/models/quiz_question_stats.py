@@ -0,0 +1,20 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+
+from app.db.base_class import Base
+
+
+class QuizQuestionStats(Base):
+    """
+    Running answer counts per quiz question, incremented with every graded
+    attempt, so item difficulty is a primary key read instead of an
+    aggregate over ``quiz_question_responses``. Questions are keyed by their
+    id in the quiz's ``questions`` JSON, which need not be a
+    ``quiz_questions`` row.
+    """
+
+    __tablename__ = "quiz_question_stats"
+
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+    question_id = Column(String(64), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.db.base_class import Base
+
+
+class StudyEvent(Base):
+    """Append-only log of study activity (player heartbeats, quiz attempts); rows are never updated."""
+
+    __tablename__ = "study_events"
+    __table_args__ = (Index("ix_study_events_user_occurred", "user_id", "occurred_at"),)
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    event_type = Column(String(32), nullable=False)
+    content_type = Column(String(32), nullable=False)
+    content_id = Column(Integer, nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Integer
+
+from app.db.base_class import Base
+
+
+class UserTokenVersion(Base):
+    """
+    Claims token version per user, bumped only by changes that must revoke
+    the user's outstanding tokens: a password change, deactivation, an admin
+    flag change or deletion. Users without a row are at version 0. There is
+    no foreign key, so the row outlives a deleted user and keeps their tokens
+    revoked.
+    """
+
+    __tablename__ = "user_token_versions"
+
+    user_id = Column(Integer, primary_key=True)
+    token_version = Column(Integer, nullable=False, default=0)
+    changed_at = Column(DateTime(timezone=True), nullable=False, index=True)
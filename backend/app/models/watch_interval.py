@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, LargeBinary, UniqueConstraint, func
+
+from app.db.base_class import Base
+
+
+class VideoWatchIntervals(Base):
+    """Merged ranges of a video a user has actually played, packed as little-endian float32 pairs."""
+
+    __tablename__ = "video_watch_intervals"
+    __table_args__ = (UniqueConstraint("user_id", "video_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False)
+    intervals = Column(LargeBinary, nullable=False, default=b"")
+    watched_seconds = Column(Float, nullable=False, default=0)
+    last_position = Column(Float, nullable=True)
+    last_heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1 +1,173 @@
- 
\ No newline at end of file
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    name: str
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    peak_checked_out: int
+    peak_overflow: int
+    checkouts: int
+    checkins: int
+    connects: int
+    invalidations: int
+    timeouts: int
+    wait_total_s: float
+    wait_avg_ms: float
+    wait_p50_ms: float
+    wait_p99_ms: float
+    wait_max_ms: float
+
+
+class PoolStatsResponse(BaseModel):
+    pools: List[PoolStats]
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+
+
+class CatalogCacheStats(CacheStats):
+    version: int
+
+
+class PasswordHasherStats(BaseModel):
+    workers: int
+    max_queue: int
+    in_flight: int
+    completed: int
+    rejected: int
+
+
+class LoginThrottleStats(BaseModel):
+    enabled: bool
+    backend: str
+    allowed: int
+    rejected_ip: int
+    rejected_user: int
+    backend_errors: int
+    keys: Optional[int] = None
+    evictions: Optional[int] = None
+
+
+class WriteBehindStats(BaseModel):
+    name: str
+    pending: int
+    received: int
+    coalesced: int
+    flushes: int
+    rows_flushed: int
+    failures: int
+    dropped: int
+    abandoned: int
+    overflowed: int
+    last_flush_size: int
+    max_flush_size: int
+    avg_flush_size: float
+    flush_interval_s: float
+    flush_p50_ms: float
+    flush_p99_ms: float
+    flush_max_ms: float
+
+
+class ProgressChannelStats(BaseModel):
+    connections: int
+    peak_connections: int
+    total_connections: int
+    messages: int
+    persisted: int
+    skipped: int
+    rejected: int
+
+
+class StartupPhase(BaseModel):
+    name: str
+    ms: float
+
+
+class StartupStats(BaseModel):
+    ready: bool
+    total_ms: float
+    phases: List[StartupPhase]
+
+
+class CourseProgressEntry(BaseModel):
+    progress_percentage: float
+    completed_units: int
+    total_units: int
+    last_accessed: Optional[datetime] = None
+
+
+class UserCourseProgress(BaseModel):
+    id: int
+    title: str
+    progress: CourseProgressEntry
+
+
+class UserProgressOverview(BaseModel):
+    id: int
+    username: str
+    courses_started: int
+    courses_completed: int
+    avg_progress: float
+    last_accessed: datetime
+    courses: List[UserCourseProgress]
+
+
+class CourseProgressOverview(BaseModel):
+    id: int
+    title: str
+    learners: int
+    completed_learners: int
+    avg_progress: float
+    last_accessed: Optional[datetime] = None
+
+
+class UnitFunnel(BaseModel):
+    unit_id: int
+    title: Optional[str] = None
+    videos: int
+    completed: int
+    completed_through: int  # completed this unit and every unit before it
+
+
+class VideoFunnel(BaseModel):
+    video_id: int
+    unit_id: int
+    title: Optional[str] = None
+    started: int
+    completed: int
+    furthest: int  # learners whose furthest completed video is this one
+
+
+class CourseFunnel(BaseModel):
+    course_id: int
+    learners: int
+    completed: int
+    video_learners: int
+    progress_histogram: List[int]  # 0-9%, 10-19%, ..., 90-99%, 100%
+    median_seconds_to_complete: Optional[float] = None
+    p90_seconds_to_complete: Optional[float] = None
+    drop_off_video_id: Optional[int] = None
+    units: List[UnitFunnel]
+    videos: List[VideoFunnel]
+    generated_at: datetime
+
+
+class QuizQuestionStat(BaseModel):
+    question_id: str
+    attempts: int
+    correct: int
+    correct_rate: float
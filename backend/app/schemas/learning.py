@@ -1,7 +1,7 @@
 from typing import Optional, List, Any, Dict, ForwardRef, TYPE_CHECKING, Annotated
 from pydantic import BaseModel, HttpUrl, Field
 from enum import Enum
-from datetime import datetime
+from datetime import date, datetime
 
 # Forward references
 UnitResponse = ForwardRef('UnitResponse')
@@ -319,8 +319,9 @@ class QuizAttemptResponse(BaseModel):
 
 
 class VideoProgressUpdate(BaseModel):
-    progress: float
-    last_position: float
+    # Same bounds as /ws/progress messages (parse_update)
+    progress: float = Field(ge=0, le=100)
+    last_position: float = Field(ge=0, allow_inf_nan=False)
 
 
 class VideoProgressResponse(BaseModel):
@@ -328,11 +329,29 @@ class VideoProgressResponse(BaseModel):
     progress: float
     last_position: float
     updated_at: datetime
+    # Seconds actually played (seeks skipped), only filled in by GET
+    watched_duration: Optional[float] = None
+    completed: Optional[bool] = None
 
     class Config:
         from_attributes = True
 
 
+class VideoProgressBatchItem(BaseModel):
+    video_id: int
+    progress: float = Field(ge=0, le=100)
+    last_position: float = Field(ge=0, allow_inf_nan=False)
+    client_ts: datetime
+
+
+class VideoProgressBatchResult(BaseModel):
+    video_id: int
+    status: str  # applied, stale or not_found
+    progress: Optional[float] = None
+    last_position: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+
 # Progress schemas
 class ProgressCreate(ProgressBase):
     pass
@@ -414,6 +433,13 @@ class LearningSession(LearningSessionInDBBase):
     pass
 
 
+class DailyActivity(BaseModel):
+    day: date
+    category_id: Optional[int] = None  # None for content outside any category
+    minutes: float
+    sessions: int
+
+
 # Video Processing Job schemas
 class VideoProcessingJobBase(BaseModel):
     video_id: int
@@ -0,0 +1,226 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.learning import CourseProgress, Unit, Video, VideoProgress
+
+# Buckets of the course progress histogram: 0-9%, 10-19%, ..., 90-99%, 100%
+PROGRESS_BUCKETS = 11
+
+# Seconds since the epoch computed by the database, so no datetime objects are
+# built per row; other dialects convert in Python
+_EPOCH_DIALECTS = {
+    "postgresql": lambda column: cast(func.extract("epoch", column), Float),
+    "sqlite": lambda column: (func.julianday(column) - 2440587.5) * 86400.0,
+}
+
+
+def _timestamps(values) -> np.ndarray:
+    return np.fromiter((value.timestamp() for value in values), dtype=np.float64, count=len(values))
+
+
+class FunnelAccumulator:
+    """
+    Funnel counters of one course, fed with ``video_progress`` chunks.
+
+    Each chunk must hold whole users (rows of a user never straddle two
+    chunks) in ascending user order; everything is computed per chunk with
+    array operations and summed, so memory is bounded by the chunk size.
+    """
+
+    def __init__(self, video_ids: List[int], unit_of_video: List[int], unit_count: int):
+        self.video_count = len(video_ids)
+        self.unit_count = unit_count
+        order = np.argsort(video_ids)
+        self._sorted_ids = np.asarray(video_ids, dtype=np.int64)[order]
+        self._position_of_sorted = order
+        self._unit_of = np.asarray(unit_of_video, dtype=np.int64)
+        self.unit_sizes = np.bincount(self._unit_of, minlength=unit_count)
+        self.learners = 0
+        self.started = np.zeros(self.video_count, dtype=np.int64)
+        self.completed = np.zeros(self.video_count, dtype=np.int64)
+        # Index 0: learners with no completed video; i + 1: furthest completed is video i
+        self.furthest = np.zeros(self.video_count + 1, dtype=np.int64)
+        self.units_completed = np.zeros(unit_count, dtype=np.int64)
+        self.units_completed_through = np.zeros(unit_count, dtype=np.int64)
+        self._durations: List[np.ndarray] = []
+
+    def add(self, users: np.ndarray, videos: np.ndarray, progress: np.ndarray, done: np.ndarray,
+            created: np.ndarray, updated: np.ndarray) -> None:
+        if not len(users):
+            return
+        position = self._position_of_sorted[np.searchsorted(self._sorted_ids, videos)]
+        new_user = np.r_[True, users[1:] != users[:-1]]
+        starts = np.flatnonzero(new_user)
+        user_index = np.cumsum(new_user) - 1
+        user_count = len(starts)
+
+        self.learners += user_count
+        self.started += np.bincount(position[progress > 0], minlength=self.video_count)
+        self.completed += np.bincount(position[done], minlength=self.video_count)
+        furthest = np.maximum.reduceat(np.where(done, position, -1), starts)
+        self.furthest += np.bincount(furthest + 1, minlength=self.video_count + 1)
+
+        per_unit = np.bincount(
+            user_index[done] * self.unit_count + self._unit_of[position[done]],
+            minlength=user_count * self.unit_count,
+        ).reshape(user_count, self.unit_count) >= self.unit_sizes
+        # An empty unit is never complete, as in unit_completions
+        empty = self.unit_sizes == 0
+        per_unit &= ~empty
+        self.units_completed += per_unit.sum(axis=0)
+        self.units_completed_through += np.logical_and.accumulate(per_unit, axis=1).sum(axis=0)
+
+        # First heartbeat on the course to the last completed video, of learners who finished every video
+        finished = (per_unit | empty).all(axis=1)
+        if finished.any():
+            first = np.minimum.reduceat(created, starts)
+            last = np.maximum.reduceat(np.where(done, updated, -np.inf), starts)
+            self._durations.append((last - first)[finished])
+
+    def durations(self) -> np.ndarray:
+        return np.concatenate(self._durations) if self._durations else np.empty(0)
+
+
+def video_progress_chunks(db: Session, course_id: int, batch_size: int):
+    """(users, videos, progress, completed, created, updated) arrays, whole users per chunk."""
+    epoch = _EPOCH_DIALECTS.get(db.get_bind().dialect.name)
+    created = VideoProgress.created_at
+    updated = func.coalesce(VideoProgress.updated_at, VideoProgress.created_at)
+    if epoch is not None:
+        created, updated = epoch(created), epoch(updated)
+    course_videos = select(Video.id).join(Unit, Unit.id == Video.unit_id).where(Unit.course_id == course_id)
+    # A Core result: ORM row processing would cost more than the funnel itself
+    result = db.connection().execute(
+        select(
+            VideoProgress.user_id,
+            VideoProgress.video_id,
+            func.coalesce(VideoProgress.progress, 0),
+            VideoProgress.completed.is_(True),
+            created,
+            updated,
+        )
+        .where(VideoProgress.video_id.in_(course_videos))
+        .order_by(VideoProgress.user_id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    carry = None
+    for rows in result.partitions(batch_size):
+        users, videos, progress, completed, created, updated = zip(*rows)
+        chunk = [
+            np.asarray(users, dtype=np.int64),
+            np.asarray(videos, dtype=np.int64),
+            np.asarray(progress, dtype=np.float64),
+            np.asarray(completed, dtype=bool),
+            np.asarray(created, dtype=np.float64) if epoch else _timestamps(created),
+            np.asarray(updated, dtype=np.float64) if epoch else _timestamps(updated),
+        ]
+        if carry is not None:
+            chunk = [np.concatenate(pair) for pair in zip(carry, chunk)]
+        # The last user may continue in the next chunk
+        cut = np.searchsorted(chunk[0], chunk[0][-1])
+        carry = [column[cut:] for column in chunk]
+        yield [column[:cut] for column in chunk]
+    if carry is not None:
+        yield carry
+
+
+def _percentile(values: np.ndarray, q: float) -> Optional[float]:
+    return float(np.percentile(values, q)) if len(values) else None
+
+
+def compute_course_funnel(db: Session, course_id: int, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Completion funnel of a course across all its learners.
+
+    Per video: learners who started it, completed it, and for whom it is the
+    furthest video completed (where they dropped off). Per unit: learners
+    who completed it, and who completed it and every unit before it. Plus
+    the course progress histogram and the median / p90 time to complete.
+    """
+    batch_size = batch_size or settings.FUNNEL_BATCH_SIZE
+    units = db.execute(
+        select(Unit.id, Unit.title).where(Unit.course_id == course_id).order_by(Unit.order, Unit.id)
+    ).all()
+    unit_position = {unit.id: index for index, unit in enumerate(units)}
+    videos = db.execute(
+        select(Video.id, Video.title, Video.unit_id)
+        .join(Unit, Unit.id == Video.unit_id)
+        .where(Unit.course_id == course_id)
+        .order_by(Unit.order, Unit.id, Video.order, Video.id)
+    ).all()
+
+    funnel = FunnelAccumulator(
+        [video.id for video in videos], [unit_position[video.unit_id] for video in videos], len(units)
+    )
+    if videos:
+        for chunk in video_progress_chunks(db, course_id, batch_size):
+            funnel.add(*chunk)
+
+    histogram = np.zeros(PROGRESS_BUCKETS, dtype=np.int64)
+    result = db.connection().execute(
+        select(func.coalesce(CourseProgress.progress_percentage, 0))
+        .where(CourseProgress.course_id == course_id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for rows in result.partitions(batch_size):
+        percentages = np.fromiter((row[0] for row in rows), dtype=np.float64, count=len(rows))
+        buckets = np.clip(percentages // 10, 0, PROGRESS_BUCKETS - 1).astype(np.int64)
+        histogram += np.bincount(buckets, minlength=PROGRESS_BUCKETS)
+
+    # The last video is where finishers stop, not a drop-off
+    dropped = funnel.furthest[1:-1]
+    durations = funnel.durations()
+    return {
+        "course_id": course_id,
+        "learners": int(histogram.sum()),
+        "completed": int(histogram[-1]),
+        "video_learners": funnel.learners,
+        "progress_histogram": histogram.tolist(),
+        "median_seconds_to_complete": _percentile(durations, 50),
+        "p90_seconds_to_complete": _percentile(durations, 90),
+        "drop_off_video_id": videos[int(dropped.argmax())].id if dropped.any() else None,
+        "units": [
+            {
+                "unit_id": unit.id,
+                "title": unit.title,
+                "videos": int(size),
+                "completed": int(completed),
+                "completed_through": int(through),
+            }
+            for unit, size, completed, through in zip(
+                units, funnel.unit_sizes, funnel.units_completed, funnel.units_completed_through
+            )
+        ],
+        "videos": [
+            {
+                "video_id": video.id,
+                "unit_id": video.unit_id,
+                "title": video.title,
+                "started": int(started),
+                "completed": int(completed),
+                "furthest": int(furthest),
+            }
+            for video, started, completed, furthest in zip(
+                videos, funnel.started, funnel.completed, funnel.furthest[1:]
+            )
+        ],
+        "generated_at": datetime.now(timezone.utc),
+    }
+
+
+funnel_cache = LRUCache(settings.FUNNEL_CACHE_MAX_ENTRIES, ttl=settings.FUNNEL_CACHE_TTL_SECONDS)
+
+
+def course_funnel(db: Session, course_id: int, refresh: bool = False) -> Dict[str, Any]:
+    """``compute_course_funnel``, cached per course for FUNNEL_CACHE_TTL_SECONDS."""
+    report = None if refresh else funnel_cache.get(course_id)
+    if report is None:
+        report = compute_course_funnel(db, course_id)
+        funnel_cache.set(course_id, report)
+    return report
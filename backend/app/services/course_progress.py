@@ -0,0 +1,307 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, case, func, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.learning import Course, CourseProgress, Unit, Video, VideoProgress
+from app.models.quiz import Quiz
+from app.services.progress_summary import apply_progress_changes, progress_snapshot, touch_summaries
+
+# (user_id, video_id, +1 when the video became completed / -1 when it stopped being)
+Transition = Tuple[int, int, int]
+
+
+def is_completed(watched: float, duration: Optional[float]) -> bool:
+    """A video is completed once the watched ranges cover VIDEO_COMPLETE_PROGRESS % of it."""
+    return bool(duration) and watched * 100 >= duration * settings.VIDEO_COMPLETE_PROGRESS
+
+
+def completion_delta(old: Optional[bool], new: Optional[bool]) -> int:
+    return int(bool(new)) - int(bool(old))
+
+
+def unit_completions(db: Session, unit_id: int) -> Set[int]:
+    """Users who have completed every video of a unit (an empty unit is never complete)."""
+    total = db.execute(select(func.count(Video.id)).where(Video.unit_id == unit_id)).scalar_one()
+    if not total:
+        return set()
+    return set(db.execute(
+        select(VideoProgress.user_id)
+        .join(Video, Video.id == VideoProgress.video_id)
+        .where(Video.unit_id == unit_id, VideoProgress.completed.is_(True))
+        .group_by(VideoProgress.user_id)
+        .having(func.count(VideoProgress.id) == total)
+    ).scalars())
+
+
+def recompute_course_progress(db: Session, user_id: int, course_id: int) -> CourseProgress:
+    """Count a user's completed units from scratch; used for new rows and repairs."""
+    totals = dict(db.execute(
+        select(Unit.id, func.count(Video.id))
+        .outerjoin(Video, Video.unit_id == Unit.id)
+        .where(Unit.course_id == course_id)
+        .group_by(Unit.id)
+    ).all())
+    done = dict(db.execute(
+        select(Video.unit_id, func.count(VideoProgress.id))
+        .join(VideoProgress, VideoProgress.video_id == Video.id)
+        .join(Unit, Unit.id == Video.unit_id)
+        .where(
+            Unit.course_id == course_id,
+            VideoProgress.user_id == user_id,
+            VideoProgress.completed.is_(True),
+        )
+        .group_by(Video.unit_id)
+    ).all())
+    completed = sum(1 for unit_id, total in totals.items() if total and done.get(unit_id) == total)
+
+    progress = db.execute(
+        select(CourseProgress)
+        .where(CourseProgress.user_id == user_id, CourseProgress.course_id == course_id)
+        .execution_options(populate_existing=True)
+    ).scalars().first()
+    key = (user_id, course_id)
+    if progress is None:
+        before = {}
+        progress = CourseProgress(user_id=user_id, course_id=course_id, last_accessed=datetime.now(timezone.utc))
+        db.add(progress)
+    else:
+        before = {key: (progress.progress_percentage or 0, progress.last_accessed or progress.created_at)}
+    progress.completed_units = completed
+    progress.total_units = len(totals)
+    progress.progress_percentage = completed * 100.0 / len(totals) if totals else 0
+    apply_progress_changes(
+        db, before, {key: (progress.progress_percentage, progress.last_accessed or progress.created_at)}
+    )
+    return progress
+
+
+def adjust_course_progress(
+    db: Session, course_id: int, completed: Dict[int, int], total_delta: int = 0
+) -> None:
+    """
+    Apply completed-unit deltas per user, and a total-units delta to everyone,
+    to the stored rollups of one course. Users without a row get one computed
+    from scratch, which already reflects the change. The summaries move by
+    the difference in the affected rows only.
+    """
+    completed = {user_id: delta for user_id, delta in completed.items() if delta}
+    if not (total_delta or completed):
+        return
+    scope = CourseProgress.course_id == course_id
+    if not total_delta:
+        scope = scope & CourseProgress.user_id.in_(list(completed))
+    before = progress_snapshot(db, scope)
+
+    if total_delta:
+        db.execute(
+            update(CourseProgress)
+            .where(CourseProgress.course_id == course_id)
+            .values(total_units=CourseProgress.total_units + total_delta)
+            .execution_options(synchronize_session=False)
+        )
+    if completed:
+        existing = set(db.execute(
+            select(CourseProgress.user_id).where(
+                CourseProgress.course_id == course_id,
+                CourseProgress.user_id.in_(list(completed)),
+            )
+        ).scalars())
+        by_delta: Dict[int, List[int]] = defaultdict(list)
+        for user_id, delta in completed.items():
+            if user_id in existing:
+                by_delta[delta].append(user_id)
+        for delta, user_ids in by_delta.items():
+            db.execute(
+                update(CourseProgress)
+                .where(CourseProgress.course_id == course_id, CourseProgress.user_id.in_(user_ids))
+                .values(completed_units=CourseProgress.completed_units + delta)
+                .execution_options(synchronize_session=False)
+            )
+        for user_id in completed.keys() - existing:
+            recompute_course_progress(db, user_id, course_id)
+
+    db.execute(
+        update(CourseProgress)
+        .where(scope)
+        .values(progress_percentage=case(
+            (CourseProgress.total_units > 0,
+             CourseProgress.completed_units * 100.0 / CourseProgress.total_units),
+            else_=0,
+        ))
+        .execution_options(synchronize_session=False)
+    )
+    # Rows created above already counted themselves
+    after = progress_snapshot(db, scope)
+    apply_progress_changes(db, before, {key: value for key, value in after.items() if key in before})
+
+
+def apply_video_completions(db: Session, transitions: Iterable[Transition]) -> None:
+    """
+    Update course rollups for videos that became (or stopped being) completed.
+
+    Runs after the progress rows are written, in the same transaction: one
+    lookup maps the videos to units and courses, two aggregates over just the
+    affected units tell which of them flipped for which users.
+    """
+    transitions = [t for t in transitions if t[2]]
+    if not transitions:
+        return
+    placement = {
+        video_id: (unit_id, course_id)
+        for video_id, unit_id, course_id in db.execute(
+            select(Video.id, Video.unit_id, Unit.course_id)
+            .join(Unit, Unit.id == Video.unit_id)
+            .where(Video.id.in_({video_id for _, video_id, _ in transitions}))
+        )
+    }
+    pairs: Dict[Tuple[int, int], int] = defaultdict(int)
+    for user_id, video_id, delta in transitions:
+        if video_id in placement:
+            pairs[(user_id, placement[video_id][0])] += delta
+    if not pairs:
+        return
+
+    unit_ids = {unit_id for _, unit_id in pairs}
+    user_ids = {user_id for user_id, _ in pairs}
+    totals = dict(db.execute(
+        select(Video.unit_id, func.count(Video.id))
+        .where(Video.unit_id.in_(unit_ids))
+        .group_by(Video.unit_id)
+    ).all())
+    done = {
+        (user_id, unit_id): count
+        for user_id, unit_id, count in db.execute(
+            select(VideoProgress.user_id, Video.unit_id, func.count(VideoProgress.id))
+            .join(Video, Video.id == VideoProgress.video_id)
+            .where(
+                Video.unit_id.in_(unit_ids),
+                VideoProgress.user_id.in_(user_ids),
+                VideoProgress.completed.is_(True),
+            )
+            .group_by(VideoProgress.user_id, Video.unit_id)
+        )
+    }
+    course_of_unit = {unit_id: course_id for unit_id, course_id in placement.values()}
+
+    by_course: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for (user_id, unit_id), delta in pairs.items():
+        total = totals.get(unit_id, 0)
+        after = done.get((user_id, unit_id), 0)
+        was_complete = bool(total) and after - delta == total
+        is_complete = bool(total) and after == total
+        if was_complete != is_complete:
+            by_course[course_of_unit[unit_id]][user_id] += 1 if is_complete else -1
+    for course_id, completed in by_course.items():
+        adjust_course_progress(db, course_id, completed)
+
+
+def content_placement(
+    db: Session, contents: Iterable[Tuple[str, int]]
+) -> Dict[Tuple[str, int], Tuple[int, Optional[int]]]:
+    """(course_id, category_id) of each ("video" | "quiz", id), one query per content type."""
+    ids: Dict[str, Set[int]] = defaultdict(set)
+    for content_type, content_id in contents:
+        ids[content_type].add(content_id)
+    placement = {}
+    if ids.get("video"):
+        for video_id, course_id, category_id in db.execute(
+            select(Video.id, Course.id, Course.category_id)
+            .join(Unit, Unit.id == Video.unit_id)
+            .join(Course, Course.id == Unit.course_id)
+            .where(Video.id.in_(ids["video"]))
+        ):
+            placement[("video", video_id)] = (course_id, category_id)
+    if ids.get("quiz"):
+        for quiz_id, course_id, category_id in db.execute(
+            select(Quiz.id, Course.id, Course.category_id)
+            .join(Video, Video.id == Quiz.video_id)
+            .join(Unit, Unit.id == Video.unit_id)
+            .join(Course, Course.id == Unit.course_id)
+            .where(Quiz.id.in_(ids["quiz"]))
+        ):
+            placement[("quiz", quiz_id)] = (course_id, category_id)
+    return placement
+
+
+def record_course_access(db: Session, accesses: Iterable[Tuple[int, str, int, datetime]]) -> None:
+    """
+    Move ``last_accessed`` of the courses behind (user_id, content_type,
+    content_id, at) accesses forward. A user's first access to a course
+    creates its progress row.
+    """
+    accesses = list(accesses)
+    placement = content_placement(db, {(content_type, content_id) for _, content_type, content_id, _ in accesses})
+    latest: Dict[Tuple[int, int], datetime] = {}
+    for user_id, content_type, content_id, at in accesses:
+        course = placement.get((content_type, content_id))
+        if course is not None:
+            key = (user_id, course[0])
+            latest[key] = max(latest.get(key, at), at)
+    if not latest:
+        return
+
+    existing = set(db.execute(
+        select(CourseProgress.user_id, CourseProgress.course_id).where(
+            tuple_(CourseProgress.user_id, CourseProgress.course_id).in_(list(latest))
+        )
+    ).tuples())
+    for user_id, course_id in latest.keys() - existing:
+        recompute_course_progress(db, user_id, course_id)
+    db.flush()
+    # Core table statement: one executemany, not an ORM bulk update by primary key
+    table = CourseProgress.__table__
+    db.execute(
+        update(table)
+        .where(
+            table.c.user_id == bindparam("b_user_id"),
+            table.c.course_id == bindparam("b_course_id"),
+            or_(table.c.last_accessed.is_(None), table.c.last_accessed < bindparam("b_at")),
+        )
+        .values(last_accessed=bindparam("b_at")),
+        [{"b_user_id": user_id, "b_course_id": course_id, "b_at": at} for (user_id, course_id), at in latest.items()],
+    )
+    touch_summaries(db, latest)
+
+
+def _course_of(db: Session, unit_id: int) -> Optional[int]:
+    return db.execute(select(Unit.course_id).where(Unit.id == unit_id)).scalar()
+
+
+@contextmanager
+def track_unit_completions(db: Session, unit_ids: Iterable[Optional[int]]) -> Iterator[None]:
+    """
+    Keep course rollups right across a catalog edit touching ``unit_ids``.
+
+    Records which users had each unit complete (and the unit's course) before
+    the wrapped block, flushes, and applies the difference: a video added to
+    or removed from a unit, a video or unit moved elsewhere, or a unit
+    deleted. Creating a unit only changes totals; see ``adjust_course_progress``.
+    """
+    unit_ids = {unit_id for unit_id in unit_ids if unit_id is not None}
+    before = {unit_id: (_course_of(db, unit_id), unit_completions(db, unit_id)) for unit_id in unit_ids}
+    yield
+    db.flush()
+
+    completed: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    totals: Dict[int, int] = defaultdict(int)
+    for unit_id, (old_course, old_users) in before.items():
+        new_course = _course_of(db, unit_id)
+        new_users = unit_completions(db, unit_id) if new_course is not None else set()
+        if old_course is not None:
+            for user_id in old_users:
+                completed[old_course][user_id] -= 1
+        if new_course is not None:
+            for user_id in new_users:
+                completed[new_course][user_id] += 1
+        if old_course != new_course:
+            if old_course is not None:
+                totals[old_course] -= 1
+            if new_course is not None:
+                totals[new_course] += 1
+    for course_id in completed.keys() | totals.keys():
+        adjust_course_progress(db, course_id, completed.get(course_id, {}), totals.get(course_id, 0))
@@ -0,0 +1,129 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.daily_activity import DailyUserActivity
+from app.models.learning import LearningSession
+from app.services.course_progress import content_placement
+
+UNCATEGORIZED = 0
+# Status of a finished learning session, see app.services.study_events
+SESSION_COMPLETED = "completed"
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# (user_id, day, category_id) -> [seconds, sessions]
+Totals = Dict[Tuple[int, date, int], List[int]]
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def split_by_day(start: datetime, end: datetime) -> Iterator[Tuple[date, int]]:
+    """Seconds of ``[start, end]`` falling on each UTC day."""
+    start, end = _as_utc(start), _as_utc(end)
+    while start < end:
+        midnight = datetime.combine(start.date() + timedelta(days=1), time(), tzinfo=timezone.utc)
+        chunk_end = min(end, midnight)
+        yield start.date(), int((chunk_end - start).total_seconds())
+        start = chunk_end
+
+
+def session_totals(db: Session, sessions: Iterable[LearningSession]) -> Totals:
+    """Per (user, day, category) totals of completed sessions; a session counts on its first day."""
+    sessions = [s for s in sessions if s.start_time is not None and s.end_time is not None]
+    totals: Totals = defaultdict(lambda: [0, 0])
+    placement = content_placement(db, {(s.content_type, s.content_id) for s in sessions})
+    for session in sessions:
+        _, category_id = placement.get((session.content_type, session.content_id), (None, None))
+        category_id = category_id or UNCATEGORIZED
+        totals[(session.user_id, _as_utc(session.start_time).date(), category_id)][1] += 1
+        for day, seconds in split_by_day(session.start_time, session.end_time):
+            totals[(session.user_id, day, category_id)][0] += seconds
+    return totals
+
+
+def add_daily_activity(db: Session, totals: Totals) -> None:
+    """Add totals onto the stored rollup rows, creating missing ones, in one upsert."""
+    if not totals:
+        return
+    rows = [
+        {"user_id": user_id, "day": day, "category_id": category_id, "seconds": seconds, "sessions": count}
+        for (user_id, day, category_id), (seconds, count) in totals.items()
+    ]
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        for row in rows:
+            existing = db.execute(select(DailyUserActivity).where(
+                DailyUserActivity.user_id == row["user_id"],
+                DailyUserActivity.day == row["day"],
+                DailyUserActivity.category_id == row["category_id"],
+            )).scalars().first()
+            if existing is None:
+                db.add(DailyUserActivity(**row))
+            else:
+                existing.seconds += row["seconds"]
+                existing.sessions += row["sessions"]
+        return
+    stmt = insert(DailyUserActivity).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyUserActivity.user_id, DailyUserActivity.day, DailyUserActivity.category_id],
+        set_={
+            "seconds": DailyUserActivity.seconds + stmt.excluded.seconds,
+            "sessions": DailyUserActivity.sessions + stmt.excluded.sessions,
+        },
+    )
+    db.execute(stmt)
+
+
+def record_completed_sessions(db: Session, sessions: Iterable[LearningSession]) -> None:
+    """Roll sessions that just completed into ``daily_user_activity``; each must be passed exactly once."""
+    add_daily_activity(db, session_totals(db, sessions))
+
+
+def daily_activity(db: Session, user_id: int, since: date) -> List[DailyUserActivity]:
+    """A user's rollup rows from ``since`` on, read by one range scan of the (user, day, category) key."""
+    return db.execute(
+        select(DailyUserActivity)
+        .where(DailyUserActivity.user_id == user_id, DailyUserActivity.day >= since)
+        .order_by(DailyUserActivity.day, DailyUserActivity.category_id)
+    ).scalars().all()
+
+
+def rebuild_daily_activity(
+    session_factory: Callable[[], Session], batch: int = 1000, user_id: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """
+    Recompute the rollup from completed sessions, ``batch`` sessions per
+    transaction, keyset-paginated by id so memory stays bounded by one batch.
+    Yields (sessions, rows touched) after each batch.
+    """
+    with session_factory() as db:
+        scope = delete(DailyUserActivity)
+        if user_id is not None:
+            scope = scope.where(DailyUserActivity.user_id == user_id)
+        db.execute(scope)
+        db.commit()
+
+    last_id, processed = 0, 0
+    while True:
+        with session_factory() as db:
+            query = select(LearningSession).where(
+                LearningSession.id > last_id, LearningSession.status == SESSION_COMPLETED
+            )
+            if user_id is not None:
+                query = query.where(LearningSession.user_id == user_id)
+            sessions = db.execute(query.order_by(LearningSession.id).limit(batch)).scalars().all()
+            if not sessions:
+                return
+            last_id = sessions[-1].id
+            totals = session_totals(db, sessions)
+            add_daily_activity(db, totals)
+            db.commit()
+        processed += len(sessions)
+        yield processed, len(totals)
@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.video_progress import progress_buffer
+
+
+@dataclass
+class _Position:
+    progress: float
+    last_position: float
+    at: float
+
+
+class ProgressConnection:
+    """
+    Progress state of one player connection.
+
+    Every update replaces the in-memory position for its video, but only some
+    reach the write-behind buffer: the first one, any that moves progress by
+    at least ``min_delta`` points since the last persisted one, and the latest
+    one once ``persist_interval`` seconds have passed. ``close()`` persists
+    whatever is left.
+    """
+
+    def __init__(self, channel: "ProgressChannel", user_id: int):
+        self.channel = channel
+        self.user_id = user_id
+        self._latest: Dict[int, _Position] = {}
+        self._persisted: Dict[int, _Position] = {}
+
+    def update(self, video_id: int, progress: float, last_position: float) -> bool:
+        """Record a position update; returns whether it was persisted."""
+        self.channel._count(messages=1)
+        now = time.monotonic()
+        position = _Position(progress, last_position, now)
+        self._latest[video_id] = position
+        persisted = self._persisted.get(video_id)
+        if (
+            persisted is None
+            or abs(progress - persisted.progress) >= self.channel.min_delta
+            or now - persisted.at >= self.channel.persist_interval
+        ):
+            self._persist(video_id, position)
+            return True
+        self.channel._count(skipped=1)
+        return False
+
+    def reject(self) -> None:
+        """Count a malformed message."""
+        self.channel._count(rejected=1)
+
+    def _persist(self, video_id: int, position: _Position) -> None:
+        progress_buffer.record(self.user_id, video_id, position.progress, position.last_position)
+        self._persisted[video_id] = position
+        self.channel._count(persisted=1)
+
+    def close(self) -> None:
+        for video_id, position in self._latest.items():
+            if self._persisted.get(video_id) is not position:
+                self._persist(video_id, position)
+        self._latest.clear()
+        self.channel._disconnect()
+
+
+class ProgressChannel:
+    """Connection and message counters for the ``/ws/progress`` channel of this worker."""
+
+    def __init__(self, min_delta: float, persist_interval: float):
+        self.min_delta = min_delta
+        self.persist_interval = persist_interval
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.peak_connections = 0
+        self.total_connections = 0
+        self.messages = 0
+        self.persisted = 0
+        self.skipped = 0
+        self.rejected = 0
+
+    def connect(self, user_id: int) -> ProgressConnection:
+        with self._lock:
+            self.connections += 1
+            self.total_connections += 1
+            self.peak_connections = max(self.peak_connections, self.connections)
+        return ProgressConnection(self, user_id)
+
+    def _disconnect(self) -> None:
+        with self._lock:
+            self.connections -= 1
+
+    def _count(self, **counters: int) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connections": self.connections,
+                "peak_connections": self.peak_connections,
+                "total_connections": self.total_connections,
+                "messages": self.messages,
+                "persisted": self.persisted,
+                "skipped": self.skipped,
+                "rejected": self.rejected,
+            }
+
+
+def parse_update(message: Any) -> Optional[Tuple[int, float, float]]:
+    """
+    ``(video_id, progress, last_position)`` from a client message, or None if
+    malformed or out of range (progress outside 0-100, a negative or
+    non-finite position).
+    """
+    if not isinstance(message, dict):
+        return None
+    try:
+        video_id = int(message["video_id"])
+        progress = float(message["progress"])
+        last_position = float(message["last_position"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not 0 <= progress <= 100 or not 0 <= last_position < math.inf:
+        return None
+    return video_id, progress, last_position
+
+
+progress_channel = ProgressChannel(
+    min_delta=settings.PROGRESS_WS_MIN_DELTA,
+    persist_interval=settings.PROGRESS_WS_PERSIST_SECONDS,
+)
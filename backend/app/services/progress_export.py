@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.learning import CourseProgress, Unit, Video, VideoProgress
+from app.models.quiz import Quiz, QuizAttempt
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _video_progress():
+    updated_at = func.coalesce(VideoProgress.updated_at, VideoProgress.created_at)
+    stmt = (
+        select(
+            VideoProgress.id,
+            VideoProgress.user_id,
+            VideoProgress.video_id,
+            Unit.course_id,
+            VideoProgress.progress,
+            VideoProgress.last_position,
+            updated_at.label("updated_at"),
+        )
+        .outerjoin(Video, Video.id == VideoProgress.video_id)
+        .outerjoin(Unit, Unit.id == Video.unit_id)
+    )
+    return stmt, VideoProgress, Unit.course_id, updated_at
+
+
+def _course_progress():
+    last_accessed = func.coalesce(CourseProgress.last_accessed, CourseProgress.created_at)
+    stmt = select(
+        CourseProgress.id,
+        CourseProgress.user_id,
+        CourseProgress.course_id,
+        CourseProgress.completed_units,
+        CourseProgress.total_units,
+        CourseProgress.progress_percentage,
+        last_accessed.label("last_accessed"),
+    )
+    return stmt, CourseProgress, CourseProgress.course_id, last_accessed
+
+
+def _quiz_attempts():
+    stmt = (
+        select(
+            QuizAttempt.id,
+            QuizAttempt.user_id,
+            QuizAttempt.quiz_id,
+            Unit.course_id,
+            QuizAttempt.score,
+            QuizAttempt.responses,
+            QuizAttempt.created_at,
+            QuizAttempt.completed_at,
+        )
+        .outerjoin(Quiz, Quiz.id == QuizAttempt.quiz_id)
+        .outerjoin(Video, Video.id == Quiz.video_id)
+        .outerjoin(Unit, Unit.id == Video.unit_id)
+    )
+    return stmt, QuizAttempt, Unit.course_id, QuizAttempt.created_at
+
+
+# Exportable datasets: each builds (select, model, course column, date column)
+DATASETS = {
+    "video_progress": _video_progress,
+    "course_progress": _course_progress,
+    "quiz_attempts": _quiz_attempts,
+}
+
+
+def export_query(
+    dataset: str,
+    *,
+    course_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Rows of ``dataset`` in id order, filtered by course, user and [since, until)."""
+    stmt, model, course_column, date_column = DATASETS[dataset]()
+    if course_id is not None:
+        stmt = stmt.where(course_column == course_id)
+    if user_id is not None:
+        stmt = stmt.where(model.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(date_column >= since)
+    if until is not None:
+        stmt = stmt.where(date_column < until)
+    return stmt.order_by(model.id)
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson(columns: Sequence[str], rows: List[Any]) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_value, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def _csv(rows: List[Sequence[Any]]) -> str:
+    data = io.StringIO()
+    writer = csv.writer(data)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value) if isinstance(value, (dict, list)) else _value(value)
+            for value in row
+        ])
+    return data.getvalue()
+
+
+def stream_export(
+    session_factory: Callable[[], Session],
+    dataset: str,
+    fmt: str = "ndjson",
+    batch_size: Optional[int] = None,
+    **filters: Any,
+) -> Iterator[str]:
+    """
+    Encode ``dataset`` one batch of rows at a time, for a StreamingResponse.
+
+    The rows come from a server-side cursor (``stream_results``) fetched
+    ``batch_size`` at a time, so memory holds one batch whatever the size of
+    the table. The session is opened here rather than taken from the request:
+    the body is produced after the endpoint's dependencies are closed.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    stmt = export_query(dataset, **filters).execution_options(stream_results=True, yield_per=batch_size)
+    with session_factory() as db:
+        result = db.execute(stmt)
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield _csv([columns])
+        for rows in result.partitions(batch_size):
+            yield _ndjson(columns, rows) if fmt == "ndjson" else _csv(rows)
@@ -0,0 +1,376 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, delete, exists, func, or_, select, union, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.pagination import paginate
+from app.models.learning import Course, CourseProgress
+from app.models.progress_summary import CourseProgressSummary, UserProgressSummary
+from app.models.user import User
+
+# Users per aggregate query and upsert, well under the bind parameter limits
+REFRESH_CHUNK = 500
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+_completed = case((CourseProgress.progress_percentage >= 100, 1), else_=0)
+_accessed = func.coalesce(CourseProgress.last_accessed, CourseProgress.created_at)
+
+# (progress_percentage, last accessed) of course_progress rows by (user_id, course_id)
+Snapshot = Dict[Tuple[int, int], Tuple[float, Optional[datetime]]]
+
+# Per summary table: (model, key column, learner count column, completed count column)
+_USERS = (UserProgressSummary, "user_id", "courses_started", "courses_completed")
+_COURSES = (CourseProgressSummary, "course_id", "learners", "completed_learners")
+
+
+def progress_snapshot(db: Session, *criteria) -> Snapshot:
+    """The course_progress rows matching ``criteria``, to diff before and after a change."""
+    return {
+        (user_id, course_id): (percentage or 0, accessed)
+        for user_id, course_id, percentage, accessed in db.execute(
+            select(
+                CourseProgress.user_id, CourseProgress.course_id, CourseProgress.progress_percentage, _accessed
+            ).where(*criteria)
+        )
+    }
+
+
+def apply_progress_changes(db: Session, before: Snapshot, after: Snapshot) -> None:
+    """
+    Move the user and course summary rows by the difference between two
+    snapshots of the same course_progress rows, in ``db``'s transaction. A
+    key only in ``after`` is a new learner, one only in ``before`` a removed
+    one. ``last_accessed`` only moves forward; ``rebuild_progress_summaries``
+    recomputes everything, including it after deletions.
+    """
+    users: Dict[int, List[Any]] = defaultdict(_no_change)
+    courses: Dict[int, List[Any]] = defaultdict(_no_change)
+    for key in before.keys() | after.keys():
+        old, new = before.get(key), after.get(key)
+        if old == new:
+            continue
+        change = [
+            (new is not None) - (old is not None),
+            (new is not None and new[0] >= 100) - (old is not None and old[0] >= 100),
+            (new[0] if new else 0) - (old[0] if old else 0),
+            new[1] if new else None,
+        ]
+        for deltas, summary_id in ((users, key[0]), (courses, key[1])):
+            _add(deltas[summary_id], change)
+    _apply(db, _USERS, users)
+    _apply(db, _COURSES, courses)
+
+
+def touch_summaries(db: Session, accessed: Dict[Tuple[int, int], datetime]) -> None:
+    """Move ``last_accessed`` of the summaries forward for (user_id, course_id) accesses."""
+    users: Dict[int, List[Any]] = defaultdict(_no_change)
+    courses: Dict[int, List[Any]] = defaultdict(_no_change)
+    for (user_id, course_id), at in accessed.items():
+        _add(users[user_id], [0, 0, 0, at])
+        _add(courses[course_id], [0, 0, 0, at])
+    _apply(db, _USERS, users)
+    _apply(db, _COURSES, courses)
+
+
+def forget_user_progress(db: Session, user_id: int) -> None:
+    """Take a user out of the course summaries; call before deleting the user."""
+    apply_progress_changes(db, progress_snapshot(db, CourseProgress.user_id == user_id), {})
+
+
+def forget_course_progress(db: Session, *course_ids: int) -> None:
+    """Take courses out of their learners' summaries; call before deleting the courses."""
+    if course_ids:
+        apply_progress_changes(db, progress_snapshot(db, CourseProgress.course_id.in_(course_ids)), {})
+
+
+def _no_change() -> List[Any]:
+    # [learners, completed, progress total, latest access]
+    return [0, 0, 0.0, None]
+
+
+def _add(delta: List[Any], change: List[Any]) -> None:
+    delta[0] += change[0]
+    delta[1] += change[1]
+    delta[2] += change[2]
+    if change[3] is not None and (delta[3] is None or change[3] > delta[3]):
+        delta[3] = change[3]
+
+
+def _apply(db: Session, spec, deltas: Dict[int, List[Any]]) -> None:
+    """
+    Add ``deltas`` to the summary rows of one table: existing rows in one
+    executemany UPDATE, new ones in one upsert, and rows left without
+    learners are deleted.
+    """
+    model, key, count, completed = spec
+    table = model.__table__
+    deltas = {summary_id: delta for summary_id, delta in deltas.items() if delta != _no_change()}
+    if not deltas:
+        return
+    existing = set(db.execute(select(table.c[key]).where(table.c[key].in_(list(deltas)))).scalars())
+
+    def incremented(learners, done, total, at):
+        new_learners = table.c[count] + learners
+        new_total = table.c.progress_total + total
+        return {
+            count: new_learners,
+            completed: table.c[completed] + done,
+            "progress_total": new_total,
+            "avg_progress": case((new_learners > 0, new_total / new_learners), else_=0),
+            "last_accessed": case(
+                (or_(table.c.last_accessed.is_(None), table.c.last_accessed < at), at),
+                else_=table.c.last_accessed,
+            ),
+        }
+
+    if existing:
+        at = bindparam("b_at", type_=table.c.last_accessed.type)
+        db.execute(
+            update(table)
+            .where(table.c[key] == bindparam("b_id"))
+            .values(incremented(bindparam("b_learners"), bindparam("b_done"), bindparam("b_total"), at)),
+            [
+                {
+                    "b_id": summary_id,
+                    "b_learners": delta[0],
+                    "b_done": delta[1],
+                    "b_total": delta[2],
+                    "b_at": delta[3],
+                }
+                for summary_id, delta in deltas.items()
+                if summary_id in existing
+            ],
+        )
+    rows = [
+        {
+            key: summary_id,
+            count: delta[0],
+            completed: delta[1],
+            "progress_total": delta[2],
+            "avg_progress": delta[2] / delta[0],
+            "last_accessed": delta[3],
+        }
+        for summary_id, delta in deltas.items()
+        if summary_id not in existing and delta[0] > 0
+    ]
+    if rows:
+        insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+        if insert is None:
+            db.add_all(model(**row) for row in rows)
+        else:
+            # Another transaction may have created the row since the lookup above
+            stmt = insert(table).values(rows)
+            excluded = stmt.excluded
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c[key]],
+                set_=incremented(excluded[count], excluded[completed], excluded.progress_total, excluded.last_accessed),
+            ))
+    if any(delta[0] < 0 for delta in deltas.values()):
+        db.execute(delete(table).where(table.c[key].in_(list(deltas)), table.c[count] <= 0))
+
+
+def _chunks(ids: Iterable[int], size: int = REFRESH_CHUNK) -> Iterable[List[int]]:
+    ids = sorted(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _upsert(db: Session, model, key, rows: List[Dict[str, Any]]) -> None:
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        for row in rows:
+            db.merge(model(**row))
+        return
+    stmt = insert(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={column: stmt.excluded[column] for column in rows[0] if column != key.key},
+    )
+    db.execute(stmt)
+
+
+def refresh_user_summaries(db: Session, user_ids: Iterable[int]) -> None:
+    """Recompute the summaries of ``user_ids`` from their course_progress rows."""
+    for chunk in _chunks(user_ids):
+        rows = [
+            dict(row._mapping)
+            for row in db.execute(
+                select(
+                    CourseProgress.user_id,
+                    func.count(CourseProgress.id).label("courses_started"),
+                    func.sum(_completed).label("courses_completed"),
+                    func.sum(func.coalesce(CourseProgress.progress_percentage, 0)).label("progress_total"),
+                    func.avg(func.coalesce(CourseProgress.progress_percentage, 0)).label("avg_progress"),
+                    func.max(_accessed).label("last_accessed"),
+                )
+                .where(CourseProgress.user_id.in_(chunk))
+                .group_by(CourseProgress.user_id)
+            )
+        ]
+        if rows:
+            _upsert(db, UserProgressSummary, UserProgressSummary.user_id, rows)
+        gone = set(chunk) - {row["user_id"] for row in rows}
+        if gone:
+            db.execute(delete(UserProgressSummary).where(UserProgressSummary.user_id.in_(gone)))
+
+
+def refresh_course_summaries(db: Session, course_ids: Iterable[int]) -> None:
+    """Recompute the summaries of ``course_ids`` from their course_progress rows."""
+    for chunk in _chunks(course_ids):
+        rows = [
+            dict(row._mapping)
+            for row in db.execute(
+                select(
+                    CourseProgress.course_id,
+                    func.count(CourseProgress.id).label("learners"),
+                    func.sum(_completed).label("completed_learners"),
+                    func.sum(func.coalesce(CourseProgress.progress_percentage, 0)).label("progress_total"),
+                    func.avg(func.coalesce(CourseProgress.progress_percentage, 0)).label("avg_progress"),
+                    func.max(_accessed).label("last_accessed"),
+                )
+                .where(CourseProgress.course_id.in_(chunk))
+                .group_by(CourseProgress.course_id)
+            )
+        ]
+        if rows:
+            _upsert(db, CourseProgressSummary, CourseProgressSummary.course_id, rows)
+        gone = set(chunk) - {row["course_id"] for row in rows}
+        if gone:
+            db.execute(delete(CourseProgressSummary).where(CourseProgressSummary.course_id.in_(gone)))
+
+
+def rebuild_progress_summaries(
+    session_factory: Callable[[], Session], batch: int = REFRESH_CHUNK
+) -> Iterator[Tuple[str, int]]:
+    """
+    Recompute every summary row from course_progress: the repair job for
+    the deltas applied as progress changes. Yields ("users" | "courses",
+    rows refreshed) per batch of ``batch`` ids, each batch in its own
+    transaction.
+    """
+    for name, refresh, progress_key, summary_key in (
+        ("users", refresh_user_summaries, CourseProgress.user_id, UserProgressSummary.user_id),
+        ("courses", refresh_course_summaries, CourseProgress.course_id, CourseProgressSummary.course_id),
+    ):
+        with session_factory() as db:
+            # Ids with progress, and summary rows whose progress is gone
+            ids = db.execute(union(select(progress_key), select(summary_key))).scalars().all()
+        for chunk in _chunks(ids, batch):
+            with session_factory() as db:
+                refresh(db, chunk)
+                db.commit()
+            yield name, len(chunk)
+
+
+# Sort keys of the admin progress listing; each is backed by a (column, user_id) index
+SORT_COLUMNS = {
+    "last_accessed": UserProgressSummary.last_accessed,
+    "progress": UserProgressSummary.avg_progress,
+}
+
+
+def user_progress_page(
+    db: Session,
+    *,
+    sort: str = "last_accessed",
+    descending: bool = True,
+    search: Optional[str] = None,
+    course_id: Optional[int] = None,
+    min_progress: Optional[float] = None,
+    max_progress: Optional[float] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One keyset page of users with course progress, from the per-user summary,
+    each with its course rows. Two queries whatever the page size: the
+    summary page (joined to users for the name) and the page's course rows.
+    """
+    query = db.query(
+        UserProgressSummary.user_id,
+        User.username,
+        UserProgressSummary.courses_started,
+        UserProgressSummary.courses_completed,
+        UserProgressSummary.avg_progress,
+        UserProgressSummary.last_accessed,
+    ).join(User, User.id == UserProgressSummary.user_id)
+    if search:
+        # Case-insensitive prefix match, served by ix_users_username_lower
+        pattern = search.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(func.lower(User.username).like(f"{pattern}%", escape="\\"))
+    if min_progress is not None:
+        query = query.filter(UserProgressSummary.avg_progress >= min_progress)
+    if max_progress is not None:
+        query = query.filter(UserProgressSummary.avg_progress <= max_progress)
+    if course_id is not None:
+        query = query.filter(exists().where(
+            CourseProgress.user_id == UserProgressSummary.user_id, CourseProgress.course_id == course_id
+        ))
+    rows, next_cursor = paginate(
+        query, (SORT_COLUMNS[sort], UserProgressSummary.user_id),
+        limit=limit, cursor=cursor, descending=descending,
+    )
+
+    courses: Dict[int, List[Dict[str, Any]]] = {row.user_id: [] for row in rows}
+    if courses:
+        for progress in db.execute(
+            select(
+                CourseProgress.user_id,
+                CourseProgress.course_id,
+                Course.title,
+                CourseProgress.progress_percentage,
+                CourseProgress.completed_units,
+                CourseProgress.total_units,
+                CourseProgress.last_accessed,
+            )
+            .join(Course, Course.id == CourseProgress.course_id)
+            .where(CourseProgress.user_id.in_(list(courses)))
+            .order_by(CourseProgress.user_id, CourseProgress.course_id)
+        ):
+            courses[progress.user_id].append({
+                "id": progress.course_id,
+                "title": progress.title,
+                "progress": {
+                    "progress_percentage": progress.progress_percentage or 0,
+                    "completed_units": progress.completed_units or 0,
+                    "total_units": progress.total_units or 0,
+                    "last_accessed": progress.last_accessed,
+                },
+            })
+    users = [
+        {
+            "id": row.user_id,
+            "username": row.username,
+            "courses_started": row.courses_started,
+            "courses_completed": row.courses_completed,
+            "avg_progress": row.avg_progress,
+            "last_accessed": row.last_accessed,
+            "courses": courses[row.user_id],
+        }
+        for row in rows
+    ]
+    return users, next_cursor
+
+
+def course_progress_overview(db: Session) -> List[Dict[str, Any]]:
+    """Every course with learners, from the per-course summary, most learners first."""
+    return [
+        dict(row._mapping)
+        for row in db.execute(
+            select(
+                Course.id,
+                Course.title,
+                CourseProgressSummary.learners,
+                CourseProgressSummary.completed_learners,
+                CourseProgressSummary.avg_progress,
+                CourseProgressSummary.last_accessed,
+            )
+            .join(Course, Course.id == CourseProgressSummary.course_id)
+            .order_by(CourseProgressSummary.learners.desc(), Course.id)
+        )
+    ]
+
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.quiz import Quiz
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """
+    What grading a quiz needs, extracted once from ``quiz.questions``.
+
+    ``choices`` maps the id (as a string, like response keys) of each multiple
+    choice question with a correct choice to that choice's id; a question
+    without one can never be answered correctly and only counts in
+    ``total``. Short answer questions are correct when answered with
+    non-blank text; any other answer (a number, a list) counts as wrong.
+    ``questions`` lists every question id in quiz order.
+    """
+
+    total: int
+    choices: Dict[str, Any]
+    short_answers: FrozenSet[str]
+    questions: Tuple[str, ...]
+
+
+def compile_answer_key(questions: Optional[List[Dict[str, Any]]]) -> AnswerKey:
+    questions = questions or []
+    choices: Dict[str, Any] = {}
+    short_answers = []
+    for question in questions:
+        question_id = str(question["id"])
+        if question["question_type"] == "multiple_choice":
+            correct = next((choice for choice in question["choices"] if choice["is_correct"]), None)
+            if correct is not None:
+                choices[question_id] = correct["id"]
+        else:
+            short_answers.append(question_id)
+    return AnswerKey(
+        len(questions), choices, frozenset(short_answers), tuple(str(question["id"]) for question in questions)
+    )
+
+
+def grade(key: AnswerKey, responses: Dict[str, Any]) -> float:
+    """Percentage of questions answered correctly, one dict lookup per question."""
+    if not key.total:
+        return 0
+    correct = sum(
+        1 for question_id, choice_id in key.choices.items()
+        if question_id in responses and responses[question_id] == choice_id
+    )
+    correct += sum(1 for question_id in key.short_answers if _is_text(responses.get(question_id)))
+    return correct / key.total * 100
+
+
+def _is_text(answer: Any) -> bool:
+    return isinstance(answer, str) and bool(answer.strip())
+
+
+def grade_questions(key: AnswerKey, responses: Dict[str, Any]) -> List[Tuple[str, Any, bool]]:
+    """(question id, answer or None, correct) for every question, in quiz order."""
+    graded = []
+    for question_id in key.questions:
+        answer = responses.get(question_id)
+        if answer is None:
+            correct = False
+        elif question_id in key.short_answers:
+            correct = _is_text(answer)
+        else:
+            correct = question_id in key.choices and answer == key.choices[question_id]
+        graded.append((question_id, answer, correct))
+    return graded
+
+
+def score(graded: List[Tuple[str, Any, bool]]) -> float:
+    """What ``grade`` returns, from ``grade_questions`` output."""
+    return sum(correct for _, _, correct in graded) / len(graded) * 100 if graded else 0
+
+
+class AnswerKeyCache:
+    """
+    Compiled answer keys by quiz id, each tagged with the ``updated_at`` it
+    was compiled from. A quiz edited through another worker gets a new
+    ``updated_at`` and is recompiled on its next lookup; edits through this
+    one also drop the entry right away.
+    """
+
+    def __init__(self, maxsize: int):
+        self._cache = LRUCache(maxsize)
+
+    def get(self, quiz: Quiz) -> AnswerKey:
+        """
+        The key of ``quiz``. ``quiz.questions`` is only read on a miss, so
+        callers can load quizzes with that column deferred.
+        """
+        cached = self._cache.get(quiz.id)
+        if cached is not None and cached[0] == quiz.updated_at:
+            return cached[1]
+        key = compile_answer_key(quiz.questions)
+        self._cache.set(quiz.id, (quiz.updated_at, key))
+        return key
+
+    def invalidate(self, quiz_id: int) -> None:
+        self._cache.pop(quiz_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+answer_keys = AnswerKeyCache(settings.QUIZ_ANSWER_KEY_CACHE_MAX_ENTRIES)
+
+
+@event.listens_for(Quiz, "after_update")
+@event.listens_for(Quiz, "after_delete")
+def _invalidate_answer_key(mapper, connection, target: Quiz) -> None:
+    answer_keys.invalidate(target.id)
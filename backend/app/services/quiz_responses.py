@@ -0,0 +1,100 @@
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.quiz import QuizQuestion, QuizQuestionResponse
+from app.models.quiz_question_stats import QuizQuestionStats
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def record_quiz_responses(
+    db: Session, attempt_id: int, quiz_id: int, graded: List[Tuple[str, Any, bool]]
+) -> None:
+    """
+    Add an attempt's graded answers (``grade_questions`` output) to the
+    per-question counters in ``quiz_question_stats`` with one upsert, keyed
+    by the questions' JSON ids. Answers to questions that are also
+    ``quiz_questions`` rows of the quiz are stored in
+    ``quiz_question_responses`` with one multi-row INSERT; that table's
+    question id is a foreign key to them. Unanswered questions are stored
+    and counted too, with no answer, as missed.
+    """
+    if not graded:
+        return
+    question_rows = _question_rows(db, quiz_id, [question_id for question_id, _, _ in graded])
+    responses = [
+        {
+            "attempt_id": attempt_id,
+            "question_id": question_rows[str(question_id)],
+            "user_answer": None if answer is None else str(answer),
+            "is_correct": correct,
+        }
+        for question_id, answer, correct in graded
+        if str(question_id) in question_rows
+    ]
+    if responses:
+        db.execute(insert(QuizQuestionResponse).values(responses))
+
+    attempts: Counter = Counter()
+    corrects: Counter = Counter()
+    for question_id, _, correct in graded:
+        attempts[str(question_id)] += 1
+        corrects[str(question_id)] += correct
+    # Sorted so concurrent attempts lock the counter rows in the same order
+    rows = [
+        {"quiz_id": quiz_id, "question_id": question_id, "attempts": count, "correct": corrects[question_id]}
+        for question_id, count in sorted(attempts.items())
+    ]
+    insert_stats = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert_stats is None:
+        for row in rows:
+            stats = db.get(QuizQuestionStats, (row["quiz_id"], row["question_id"]))
+            if stats is None:
+                db.add(QuizQuestionStats(**row))
+            else:
+                stats.attempts += row["attempts"]
+                stats.correct += row["correct"]
+        return
+    stmt = insert_stats(QuizQuestionStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[QuizQuestionStats.quiz_id, QuizQuestionStats.question_id],
+        set_={
+            "attempts": QuizQuestionStats.attempts + stmt.excluded.attempts,
+            "correct": QuizQuestionStats.correct + stmt.excluded.correct,
+        },
+    )
+    db.execute(stmt)
+
+
+def _question_rows(db: Session, quiz_id: int, question_ids: List[Any]) -> Dict[str, int]:
+    """``quiz_questions`` ids of the quiz among ``question_ids``, by JSON id."""
+    numeric = {int(question_id) for question_id in question_ids if str(question_id).isdigit()}
+    if not numeric:
+        return {}
+    return {
+        str(row_id): row_id
+        for row_id in db.execute(
+            select(QuizQuestion.id).where(QuizQuestion.quiz_id == quiz_id, QuizQuestion.id.in_(numeric))
+        ).scalars()
+    }
+
+
+def question_stats(db: Session, quiz_id: int) -> List[Dict[str, Any]]:
+    """Counters of a quiz's answered questions, read from ``quiz_question_stats``."""
+    return [
+        {
+            "question_id": stats.question_id,
+            "attempts": stats.attempts,
+            "correct": stats.correct,
+            "correct_rate": stats.correct / stats.attempts if stats.attempts else 0.0,
+        }
+        for stats in db.execute(
+            select(QuizQuestionStats)
+            .where(QuizQuestionStats.quiz_id == quiz_id)
+            .order_by(QuizQuestionStats.question_id)
+        ).scalars()
+    ]
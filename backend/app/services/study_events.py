@@ -0,0 +1,232 @@
+import csv
+import io
+import itertools
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.learning import LearningSession
+from app.models.study_event import StudyEvent
+from app.services.course_progress import record_course_access
+from app.services.daily_activity import SESSION_COMPLETED, record_completed_sessions
+from app.services.write_behind import WriteBehindBuffer
+
+SESSION_ACTIVE = "active"
+
+_COLUMNS = ("user_id", "event_type", "content_type", "content_id", "occurred_at")
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class StudyEventQueue(WriteBehindBuffer):
+    """
+    Study events queued in memory and appended to ``study_events`` in bulk.
+
+    Events are never coalesced with each other (every key is unique), except
+    that repeats of the same event for the same content within
+    ``min_interval`` seconds are not recorded at all: a player heartbeat
+    every few seconds adds nothing to sessions measured in minutes. Each
+    flush also folds its events into ``learning_sessions``, see ``sessionize``,
+    adds the sessions that completed to the daily activity rollup, and moves
+    the courses' ``last_accessed`` forward. Flushes with no events still
+    close sessions that went idle, so a quiet system does not leave them open.
+    """
+
+    name = "study-events"
+
+    def __init__(
+        self, session_factory, flush_interval, max_pending, min_interval, session_gap,
+        enabled=True, max_keys=100000,
+    ):
+        super().__init__(session_factory, flush_interval, max_pending)
+        self.enabled = enabled
+        self.min_interval = min_interval
+        self.session_gap = session_gap
+        self._ids = itertools.count()
+        self._last_recorded = LRUCache(max_keys)
+
+    def record(
+        self,
+        user_id: int,
+        event_type: str,
+        content_type: str,
+        content_id: int,
+        at: Optional[datetime] = None,
+    ) -> bool:
+        """Queue an event; returns False when it repeats one recorded less than ``min_interval`` ago."""
+        if not self.enabled:
+            return False
+        now = datetime.now(timezone.utc)
+        # A client clock running ahead must not stretch sessions into the future
+        at = min(_as_utc(at), now) if at is not None else now
+        key = (user_id, event_type, content_type, content_id)
+        last = self._last_recorded.get(key)
+        if last is not None and timedelta(0) <= at - last < timedelta(seconds=self.min_interval):
+            return False
+        if last is None or at > last:
+            self._last_recorded.set(key, at)
+        self.add(next(self._ids), {
+            "user_id": user_id,
+            "event_type": event_type,
+            "content_type": content_type,
+            "content_id": content_id,
+            "occurred_at": at,
+        })
+        return True
+
+    def clear(self) -> None:
+        self._last_recorded.clear()
+
+    def flush(self) -> int:
+        written = super().flush()
+        if not written and self.enabled:
+            self.close_idle()
+        return written
+
+    def close_idle(self) -> int:
+        """Complete sessions idle for longer than ``session_gap``; returns how many."""
+        with self._flush_lock:
+            db = self.session_factory()
+            try:
+                completed = close_idle_sessions(db, datetime.now(timezone.utc) - timedelta(seconds=self.session_gap))
+                record_completed_sessions(db, completed)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        return len(completed)
+
+    def write(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        append_study_events(db, rows)
+        record_course_access(
+            db, [(row["user_id"], row["content_type"], row["content_id"], row["occurred_at"]) for row in rows]
+        )
+        completed = sessionize(db, rows, self.session_gap)
+        db.flush()
+        completed += close_idle_sessions(db, datetime.now(timezone.utc) - timedelta(seconds=self.session_gap))
+        record_completed_sessions(db, completed)
+
+
+def append_study_events(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """COPY on Postgres (psycopg2), one multi-row INSERT elsewhere."""
+    if db.get_bind().dialect.name == "postgresql":
+        cursor = db.connection().connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):
+                data = io.StringIO()
+                writer = csv.writer(data)
+                for row in rows:
+                    writer.writerow([
+                        row[column].isoformat() if column == "occurred_at" else row[column]
+                        for column in _COLUMNS
+                    ])
+                data.seek(0)
+                cursor.copy_expert(
+                    f"COPY {StudyEvent.__tablename__} ({', '.join(_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    data,
+                )
+                return
+        finally:
+            cursor.close()
+    db.execute(insert(StudyEvent).values(rows))
+
+
+def sessionize(db: Session, events: List[Dict[str, Any]], gap: float) -> List[LearningSession]:
+    """
+    Fold events into learning sessions, one timeline per (user, content).
+
+    Events less than ``gap`` seconds apart belong to the same session; the
+    open (``active``) session of a timeline absorbs events that fall within
+    ``gap`` of it, whether they arrive late or extend it. Of the resulting
+    sessions only the newest of each timeline stays active; the ones that
+    completed are returned. Assumes one flusher per user at a time;
+    concurrent flushes from several workers can open duplicate sessions for
+    the same content.
+    """
+    timelines: Dict[Tuple[int, str, int], List[datetime]] = defaultdict(list)
+    for event in events:
+        timelines[(event["user_id"], event["content_type"], event["content_id"])].append(
+            _as_utc(event["occurred_at"])
+        )
+    if not timelines:
+        return []
+
+    open_sessions: Dict[Tuple[int, str, int], LearningSession] = {}
+    for session in db.execute(
+        select(LearningSession)
+        .where(
+            LearningSession.user_id.in_({user_id for user_id, _, _ in timelines}),
+            LearningSession.status == SESSION_ACTIVE,
+        )
+        .order_by(LearningSession.end_time)
+    ).scalars():
+        # The latest wins if duplicates exist
+        open_sessions[(session.user_id, session.content_type, session.content_id)] = session
+
+    window = timedelta(seconds=gap)
+    completed = []
+    for key, times in timelines.items():
+        spans: List[List[Any]] = [[at, at, None] for at in times]
+        session = open_sessions.get(key)
+        if session is not None and session.start_time is not None and session.end_time is not None:
+            spans.append([_as_utc(session.start_time), _as_utc(session.end_time), session])
+        spans.sort(key=lambda span: span[0])
+
+        runs: List[List[Any]] = []
+        for start, end, existing in spans:
+            if runs and start - runs[-1][1] <= window:
+                run = runs[-1]
+                run[1] = max(run[1], end)
+                run[2] = run[2] or existing
+            else:
+                runs.append([start, end, existing])
+
+        for index, (start, end, existing) in enumerate(runs):
+            if existing is None:
+                existing = LearningSession(user_id=key[0], content_type=key[1], content_id=key[2])
+                db.add(existing)
+            existing.start_time = start
+            existing.end_time = end
+            existing.duration = int((end - start).total_seconds())
+            if index == len(runs) - 1:
+                existing.status = SESSION_ACTIVE
+            else:
+                existing.status = SESSION_COMPLETED
+                completed.append(existing)
+    return completed
+
+
+def idle_sessions_query(idle_since: datetime):
+    # The status is inlined so the planner can match the partial index on
+    # active sessions, which a bound parameter would not
+    return select(LearningSession).where(
+        LearningSession.status == literal_column(f"'{SESSION_ACTIVE}'"), LearningSession.end_time < idle_since
+    )
+
+
+def close_idle_sessions(db: Session, idle_since: datetime) -> List[LearningSession]:
+    """Complete active sessions without events since ``idle_since``; returns them."""
+    sessions = db.execute(idle_sessions_query(idle_since)).scalars().all()
+    for session in sessions:
+        session.status = SESSION_COMPLETED
+    return sessions
+
+
+study_events = StudyEventQueue(
+    SessionLocal,
+    flush_interval=settings.STUDY_EVENTS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.STUDY_EVENTS_MAX_PENDING,
+    min_interval=settings.STUDY_EVENT_MIN_INTERVAL_SECONDS,
+    session_gap=settings.STUDY_SESSION_GAP_SECONDS,
+    enabled=settings.STUDY_EVENTS_ENABLED,
+)
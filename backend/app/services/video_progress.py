@@ -0,0 +1,256 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.catalog_cache import catalog_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.learning import Video, VideoProgress
+from app.services.course_progress import Transition, apply_video_completions, completion_delta
+from app.services.write_behind import WriteBehindBuffer
+
+# Rows per INSERT ... ON CONFLICT statement, well under the bind parameter limits
+UPSERT_CHUNK = 500
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert_video_progress(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert or update many (user_id, video_id) progress rows in bulk.
+
+    Each row carries ``updated_at``; an existing row is only overwritten by a
+    strictly newer one, so a late or replayed batch never moves progress back.
+    The reported progress never completes a video; see ``upsert_watch_progress``.
+    """
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[start:start + UPSERT_CHUNK]
+        if insert is None:
+            _merge_video_progress(db, chunk)
+            continue
+        stmt = insert(VideoProgress).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VideoProgress.user_id, VideoProgress.video_id],
+            set_={
+                "progress": stmt.excluded.progress,
+                "last_position": stmt.excluded.last_position,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=or_(
+                VideoProgress.updated_at.is_(None),
+                VideoProgress.updated_at < stmt.excluded.updated_at,
+            ),
+        )
+        db.execute(stmt)
+
+
+def upsert_watch_progress(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Store ``watched_duration`` and ``completed``, derived from the watched
+    ranges, on many (user_id, video_id) progress rows in bulk.
+
+    Only these two columns are written, so the client's progress and its
+    ``updated_at`` ordering are left alone. Videos that become (or stop
+    being) completed update the course rollups.
+    """
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    transitions = []
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[start:start + UPSERT_CHUNK]
+        transitions.extend(_completion_transitions(db, chunk))
+        if insert is None:
+            _merge_watch_progress(db, chunk)
+            continue
+        stmt = insert(VideoProgress).values([{"progress": 0, "last_position": 0, **row} for row in chunk])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VideoProgress.user_id, VideoProgress.video_id],
+            set_={
+                "watched_duration": stmt.excluded.watched_duration,
+                "completed": stmt.excluded.completed,
+            },
+        )
+        db.execute(stmt)
+    apply_video_completions(db, transitions)
+
+
+def _completion_transitions(db: Session, rows: List[Dict[str, Any]]) -> List[Transition]:
+    """Which rows flip a video's completed state, given what is stored now."""
+    stored = dict(
+        ((user_id, video_id), completed)
+        for user_id, video_id, completed in db.execute(
+            select(VideoProgress.user_id, VideoProgress.video_id, VideoProgress.completed).where(
+                tuple_(VideoProgress.user_id, VideoProgress.video_id).in_(
+                    [(row["user_id"], row["video_id"]) for row in rows]
+                )
+            )
+        )
+    )
+    transitions = []
+    for row in rows:
+        delta = completion_delta(stored.get((row["user_id"], row["video_id"])), row["completed"])
+        if delta:
+            transitions.append((row["user_id"], row["video_id"], delta))
+    return transitions
+
+
+def _merge_video_progress(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Row-at-a-time fallback for databases without INSERT ... ON CONFLICT."""
+    for row in rows:
+        progress = db.query(VideoProgress).filter(
+            VideoProgress.user_id == row["user_id"],
+            VideoProgress.video_id == row["video_id"],
+        ).first()
+        if progress is None:
+            db.add(VideoProgress(**row))
+        elif progress.updated_at is None or progress.updated_at < row["updated_at"]:
+            progress.progress = row["progress"]
+            progress.last_position = row["last_position"]
+            progress.updated_at = row["updated_at"]
+
+
+def _merge_watch_progress(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Row-at-a-time fallback of ``upsert_watch_progress``."""
+    for row in rows:
+        result = db.execute(
+            update(VideoProgress)
+            .where(VideoProgress.user_id == row["user_id"], VideoProgress.video_id == row["video_id"])
+            # Keep updated_at: it orders the client's progress reports
+            .values(
+                watched_duration=row["watched_duration"],
+                completed=row["completed"],
+                updated_at=VideoProgress.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            db.add(VideoProgress(progress=0, last_position=0, **row))
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes; everything stored here is UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def video_exists(db: Session, video_id: int) -> bool:
+    """
+    Whether ``video_id`` is a video, cached per catalog version like other
+    catalog reads, so repeated heartbeats for a video skip the lookup.
+    """
+    return catalog_cache.get_or_load(
+        "video_exists",
+        video_id,
+        lambda: db.execute(select(Video.id).where(Video.id == video_id)).first() is not None,
+        db,
+    )
+
+
+def apply_progress_batch(db: Session, user_id: int, items: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Write many progress reports for one user with a single bulk upsert.
+
+    ``items`` carry ``video_id``, ``progress``, ``last_position`` and
+    ``client_ts``. Per video only the newest report is written, and only if it
+    is newer than what is stored (or still buffered). Returns one result per
+    item, in order, with status ``applied``, ``stale`` or ``not_found`` and the
+    progress the video ends up with.
+    """
+    now = datetime.now(timezone.utc)
+    newest: Dict[int, Dict[str, Any]] = {}
+    winners: Dict[int, int] = {}
+    for index, item in enumerate(items):
+        # A client clock running ahead must not pin progress in the future
+        client_ts = min(_as_utc(item.client_ts), now)
+        current = newest.get(item.video_id)
+        if current is None or client_ts >= current["updated_at"]:
+            newest[item.video_id] = {
+                "user_id": user_id,
+                "video_id": item.video_id,
+                "progress": item.progress,
+                "last_position": item.last_position,
+                "updated_at": client_ts,
+            }
+            winners[item.video_id] = index
+
+    known = set(db.execute(select(Video.id).where(Video.id.in_(list(newest)))).scalars())
+    rows = [row for video_id, row in newest.items() if video_id in known]
+    stored = {}
+    if rows:
+        upsert_video_progress(db, rows)
+        db.commit()
+        stored = {
+            row.video_id: dict(row._mapping)
+            for row in db.execute(
+                select(
+                    VideoProgress.video_id,
+                    VideoProgress.progress,
+                    VideoProgress.last_position,
+                    VideoProgress.updated_at,
+                ).where(VideoProgress.user_id == user_id, VideoProgress.video_id.in_(list(known)))
+            )
+        }
+
+    results = []
+    for index, item in enumerate(items):
+        if item.video_id not in known:
+            results.append({"video_id": item.video_id, "status": "not_found"})
+            continue
+        final = stored[item.video_id]
+        pending = progress_buffer.pending(user_id, item.video_id)
+        if pending is not None and _as_utc(pending["updated_at"]) > _as_utc(final["updated_at"]):
+            final = pending
+        applied = (
+            winners[item.video_id] == index
+            and _as_utc(final["updated_at"]) == newest[item.video_id]["updated_at"]
+        )
+        results.append({
+            "video_id": item.video_id,
+            "status": "applied" if applied else "stale",
+            "progress": final["progress"],
+            "last_position": final["last_position"],
+            "updated_at": final["updated_at"],
+        })
+    return results
+
+
+class ProgressBuffer(WriteBehindBuffer):
+    """Keeps the latest progress heartbeat per (user, video) until the next flush."""
+
+    name = "video-progress"
+
+    def record(
+        self,
+        user_id: int,
+        video_id: int,
+        progress: float,
+        last_position: float,
+        updated_at: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        row = {
+            "user_id": user_id,
+            "video_id": video_id,
+            "progress": progress,
+            "last_position": last_position,
+            "updated_at": updated_at or datetime.now(timezone.utc),
+        }
+        self.add((user_id, video_id), row)
+        return row
+
+    def pending(self, user_id: int, video_id: int) -> Optional[Dict[str, Any]]:
+        return self.get((user_id, video_id))
+
+    def merge(self, current: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        return new if new["updated_at"] >= current["updated_at"] else current
+
+    def write(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        upsert_video_progress(db, rows)
+
+
+progress_buffer = ProgressBuffer(
+    SessionLocal,
+    flush_interval=settings.PROGRESS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.PROGRESS_BUFFER_MAX_PENDING,
+)
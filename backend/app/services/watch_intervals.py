@@ -0,0 +1,232 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.intervals import IntervalSet, as_packed
+from app.models.learning import Video
+from app.models.watch_interval import VideoWatchIntervals
+from app.services.course_progress import is_completed
+from app.services.video_progress import upsert_watch_progress
+from app.services.write_behind import WriteBehindBuffer
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+@dataclass
+class WatchState:
+    user_id: int
+    video_id: int
+    intervals: IntervalSet
+    last_position: Optional[float] = None
+    last_heartbeat_at: Optional[datetime] = None
+
+
+class WatchTracker(WriteBehindBuffer):
+    """
+    Watched ranges per (user, video), built from consecutive player heartbeats.
+
+    Two heartbeats ``elapsed`` seconds apart cover the range between their
+    positions only if the position moved forward by no more than
+    ``elapsed * max_rate`` and ``elapsed <= max_gap``; anything else is a seek
+    or a pause and covers nothing. States of active viewers stay in an LRU in
+    memory for up to ``state_ttl`` seconds and are written back in bulk like
+    progress heartbeats; each flush also stores the watched time and
+    completion on the progress rows, which is what course rollups count.
+    Flushes add the stored ranges to the buffered ones under a row lock, so
+    workers sharing a (user, video) pair never drop each other's ranges.
+    """
+
+    name = "watch-intervals"
+
+    def __init__(self, session_factory, flush_interval, max_pending, max_entries, max_rate, max_gap, state_ttl):
+        super().__init__(session_factory, flush_interval, max_pending)
+        self._states = LRUCache(max_entries, ttl=state_ttl)
+        self.max_rate = max_rate
+        self.max_gap = max_gap
+
+    def heartbeat(
+        self, user_id: int, video_id: int, position: float, at: Optional[datetime] = None
+    ) -> WatchState:
+        at = at or datetime.now(timezone.utc)
+        # Positions are kept at the packed precision so a reloaded range still
+        # touches the next heartbeat exactly
+        position = as_packed(position)
+        key = (user_id, video_id)
+        state = self._state(key)
+        with self._lock:
+            if state.last_heartbeat_at is not None and state.last_position is not None:
+                elapsed = (at - state.last_heartbeat_at).total_seconds()
+                advanced = position - state.last_position
+                if 0 < elapsed <= self.max_gap and 0 < advanced <= elapsed * self.max_rate:
+                    state.intervals.add(state.last_position, position)
+            state.last_position = position
+            state.last_heartbeat_at = at
+        self.add(key, state)
+        return state
+
+    def clear(self) -> None:
+        """Forget cached states; pending ones are still written by the next flush."""
+        self._states.clear()
+
+    def state(self, db: Session, user_id: int, video_id: int) -> WatchState:
+        return self._state((user_id, video_id), db)
+
+    def is_loaded(self, user_id: int, video_id: int) -> bool:
+        """Whether ``heartbeat`` can run without a database read (async callers)."""
+        return self._states.get((user_id, video_id)) is not None
+
+    def load(self, user_id: int, video_id: int) -> None:
+        self._state((user_id, video_id))
+
+    def _state(self, key: Tuple[int, int], db: Optional[Session] = None) -> WatchState:
+        state = self._states.get(key)
+        if state is None:
+            # Evicted from the LRU but not flushed yet: the buffer still holds it
+            state = self.get(key) or self._load(key, db)
+            self._states.set(key, state)
+        return state
+
+    def _load(self, key: Tuple[int, int], db: Optional[Session]) -> WatchState:
+        own_session = db is None
+        db = db or self.session_factory()
+        try:
+            row = db.execute(
+                select(
+                    VideoWatchIntervals.intervals,
+                    VideoWatchIntervals.last_position,
+                    VideoWatchIntervals.last_heartbeat_at,
+                ).where(VideoWatchIntervals.user_id == key[0], VideoWatchIntervals.video_id == key[1])
+            ).first()
+        finally:
+            if own_session:
+                db.close()
+        if row is None:
+            return WatchState(key[0], key[1], IntervalSet())
+        last_at = row.last_heartbeat_at
+        if last_at is not None and last_at.tzinfo is None:
+            last_at = last_at.replace(tzinfo=timezone.utc)
+        return WatchState(key[0], key[1], IntervalSet.unpack(row.intervals), row.last_position, last_at)
+
+    def write(self, db: Session, rows: List[WatchState]) -> None:
+        stored = db.execute(
+            select(
+                VideoWatchIntervals.user_id,
+                VideoWatchIntervals.video_id,
+                VideoWatchIntervals.intervals,
+                VideoWatchIntervals.last_position,
+                VideoWatchIntervals.last_heartbeat_at,
+            )
+            .where(
+                tuple_(VideoWatchIntervals.user_id, VideoWatchIntervals.video_id).in_(
+                    [(state.user_id, state.video_id) for state in rows]
+                )
+            )
+            .with_for_update()
+        ).all()
+        stored = {(row.user_id, row.video_id): row for row in stored}
+        # heartbeat() mutates states under the same lock
+        with self._lock:
+            for state in rows:
+                row = stored.get((state.user_id, state.video_id))
+                if row is not None:
+                    _merge_stored(state, row)
+            values = [
+                {
+                    "user_id": state.user_id,
+                    "video_id": state.video_id,
+                    "intervals": state.intervals.pack(),
+                    "watched_seconds": state.intervals.total,
+                    "last_position": state.last_position,
+                    "last_heartbeat_at": state.last_heartbeat_at,
+                }
+                for state in rows
+            ]
+        upsert_watch_intervals(db, values)
+        durations = video_durations(db, {row["video_id"] for row in values})
+        upsert_watch_progress(db, [
+            {
+                "user_id": row["user_id"],
+                "video_id": row["video_id"],
+                # Whole seconds, as video_progress stores them
+                "watched_duration": int(row["watched_seconds"]),
+                "completed": is_completed(row["watched_seconds"], durations.get(row["video_id"])),
+            }
+            for row in values
+        ])
+
+
+def _merge_stored(state: WatchState, row: Any) -> None:
+    """Add ranges another worker stored to ``state``, and take its newer heartbeat."""
+    for start, end in IntervalSet.unpack(row.intervals):
+        state.intervals.add(start, end)
+    stored_at = row.last_heartbeat_at
+    if stored_at is not None and stored_at.tzinfo is None:
+        stored_at = stored_at.replace(tzinfo=timezone.utc)
+    if stored_at is not None and (state.last_heartbeat_at is None or stored_at > state.last_heartbeat_at):
+        state.last_position = row.last_position
+        state.last_heartbeat_at = stored_at
+
+
+def upsert_watch_intervals(db: Session, rows: List[Dict[str, Any]]) -> None:
+    insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        for row in rows:
+            existing = db.query(VideoWatchIntervals).filter(
+                VideoWatchIntervals.user_id == row["user_id"],
+                VideoWatchIntervals.video_id == row["video_id"],
+            ).first()
+            if existing is None:
+                db.add(VideoWatchIntervals(**row))
+            else:
+                for field, value in row.items():
+                    setattr(existing, field, value)
+        return
+    stmt = insert(VideoWatchIntervals).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[VideoWatchIntervals.user_id, VideoWatchIntervals.video_id],
+        set_={
+            "intervals": stmt.excluded.intervals,
+            "watched_seconds": stmt.excluded.watched_seconds,
+            "last_position": stmt.excluded.last_position,
+            "last_heartbeat_at": stmt.excluded.last_heartbeat_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def video_durations(db: Session, video_ids: Iterable[int]) -> Dict[int, Optional[float]]:
+    """Duration in seconds from each video's metadata, None where unknown."""
+    return {
+        video_id: (metadata or {}).get("duration")
+        for video_id, metadata in db.execute(
+            select(Video.id, Video.video_metadata).where(Video.id.in_(list(video_ids)))
+        )
+    }
+
+
+def watch_summary(db: Session, user_id: int, video_id: int) -> Dict[str, Any]:
+    """
+    ``watched_duration`` and ``completed`` from the watched ranges as they
+    are now; the flush stores the same values on the progress row.
+    """
+    watched = watch_tracker.state(db, user_id, video_id).intervals.total
+    duration = video_durations(db, [video_id]).get(video_id)
+    return {"watched_duration": watched, "completed": is_completed(watched, duration)}
+
+
+watch_tracker = WatchTracker(
+    SessionLocal,
+    flush_interval=settings.PROGRESS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.PROGRESS_BUFFER_MAX_PENDING,
+    max_entries=settings.WATCH_TRACKER_MAX_ENTRIES,
+    max_rate=settings.WATCH_MAX_PLAYBACK_RATE,
+    max_gap=settings.WATCH_MAX_GAP_SECONDS,
+    state_ttl=settings.WATCH_TRACKER_STATE_TTL_SECONDS,
+)
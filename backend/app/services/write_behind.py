@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.pool_metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer(ABC):
+    """
+    Coalesces writes in memory by key and persists them periodically in bulk.
+
+    Only the newest value per key is kept, so a burst of updates to the same
+    row costs one row in the next flush. ``run()`` flushes every
+    ``flush_interval`` seconds, which bounds how much is lost if the process
+    dies; ``stop()`` drains whatever is still pending. Reaching
+    ``max_pending`` wakes that loop early instead of flushing in the caller,
+    so ``add()`` never waits on the database and is safe to call from the
+    event loop. A failed flush puts its rows back for the next one, up to
+    ``max_retries`` times per key; while the database is down at most
+    ``max_backlog`` keys are held and the oldest are dropped beyond that,
+    counted under ``abandoned`` and ``overflowed``. Subclasses implement
+    ``write(db, rows)`` and may override ``merge`` to decide which of two
+    values for a key wins.
+    """
+
+    name = "write-behind"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float,
+        max_pending: int,
+        window: int = 1024,
+        max_retries: int = 5,
+        max_backlog: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.max_backlog = max_backlog if max_backlog is not None else 10 * max_pending
+        self._pending: Dict[Hashable, Any] = {}
+        # Failed flushes each key has been through since it was last written
+        self._attempts: Dict[Hashable, int] = {}
+        # Batch being written right now, still visible to get()
+        self._inflight: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        # Serializes flushes so rows are never written out of order
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._durations = deque(maxlen=window)
+        self.received = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failures = 0
+        self.dropped = 0
+        self.abandoned = 0
+        self.overflowed = 0
+        self.last_flush_size = 0
+        self.max_flush_size = 0
+
+    def merge(self, current: Any, new: Any) -> Any:
+        """Value to keep when ``new`` arrives for a key that is already pending."""
+        return new
+
+    @abstractmethod
+    def write(self, db: Session, rows: List[Any]) -> None:
+        """Persist ``rows`` in ``db``'s transaction; the caller commits."""
+
+    def add(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self.received += 1
+            current = self._pending.get(key)
+            if current is not None:
+                self.coalesced += 1
+                value = self.merge(current, value)
+            self._pending[key] = value
+            self._trim_backlog()
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._flush_soon()
+
+    def _trim_backlog(self) -> None:
+        """Drop the oldest keys beyond ``max_backlog``; call with ``_lock`` held."""
+        while len(self._pending) > self.max_backlog:
+            key = next(iter(self._pending))
+            del self._pending[key]
+            self._attempts.pop(key, None)
+            self.overflowed += 1
+
+    def _flush_soon(self) -> None:
+        """Have the flush loop run now rather than at its next tick."""
+        if self._loop is None:
+            # No flush loop (scripts, tests): bound memory by flushing here
+            self.flush()
+            return
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """A value that has been accepted but not flushed yet."""
+        with self._lock:
+            value = self._pending.get(key)
+            return value if value is not None else self._inflight.get(key)
+
+    def flush(self) -> int:
+        """Write everything pending in one batch; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            written = len(batch)
+            db = self.session_factory()
+            try:
+                try:
+                    self.write(db, list(batch.values()))
+                    db.commit()
+                except exc.IntegrityError:
+                    # A bad row (e.g. an unknown foreign key) must not block the rest forever
+                    db.rollback()
+                    written = self._write_each(db, list(batch.values()))
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self.failures += 1
+                    self._inflight = {}
+                    # Put the batch back, ahead of and under anything newer
+                    # that arrived meanwhile, unless a key ran out of retries
+                    restored = {}
+                    for key, value in batch.items():
+                        attempts = self._attempts.get(key, 0) + 1
+                        if attempts > self.max_retries:
+                            self._attempts.pop(key, None)
+                            self.abandoned += 1
+                            continue
+                        self._attempts[key] = attempts
+                        current = self._pending.pop(key, None)
+                        restored[key] = value if current is None else self.merge(value, current)
+                    restored.update(self._pending)
+                    self._pending = restored
+                    self._trim_backlog()
+                logger.exception("%s flush of %d rows failed, will retry", self.name, len(batch))
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                self._inflight = {}
+                for key in batch:
+                    self._attempts.pop(key, None)
+                self._durations.append(time.perf_counter() - started)
+                self.flushes += 1
+                self.rows_flushed += written
+                self.dropped += len(batch) - written
+                self.last_flush_size = written
+                self.max_flush_size = max(self.max_flush_size, written)
+            return written
+
+    def _write_each(self, db: Session, rows: List[Any]) -> int:
+        written = 0
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    self.write(db, [row])
+                written += 1
+            except exc.IntegrityError:
+                logger.warning("%s dropped a row that violates a constraint: %r", self.name, row)
+        db.commit()
+        return written
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception:
+                logger.exception("%s flush loop error", self.name)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and drain everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+        await run_in_threadpool(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            durations = sorted(self._durations)
+            return {
+                "name": self.name,
+                "pending": len(self._pending),
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "rows_flushed": self.rows_flushed,
+                "failures": self.failures,
+                "dropped": self.dropped,
+                "abandoned": self.abandoned,
+                "overflowed": self.overflowed,
+                "last_flush_size": self.last_flush_size,
+                "max_flush_size": self.max_flush_size,
+                "avg_flush_size": self.rows_flushed / self.flushes if self.flushes else 0.0,
+                "flush_interval_s": self.flush_interval,
+                "flush_p50_ms": percentile(durations, 50) * 1000,
+                "flush_p99_ms": percentile(durations, 99) * 1000,
+                "flush_max_ms": (durations[-1] if durations else 0.0) * 1000,
+            }
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Concurrent latency benchmark for the endpoints ported to the async DB path.
+
+Fires concurrent requests at a running API and reports p50/p95/p99 latency per
+endpoint, plus the latency of the cheap `/` root probe while that load is in
+flight (a blocked event loop shows up there first). Run it once against a
+build from before the async port and once against the current tree to compare.
+
+Usage: python bench_async_endpoints.py [--url URL] [--concurrency N] [--requests N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+API_URL = "http://localhost:8000/api/v1"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def report(name, samples):
+    print(
+        f"{name:<40} n={len(samples):<6} "
+        f"p50={percentile(samples, 50) * 1000:8.1f}ms "
+        f"p95={percentile(samples, 95) * 1000:8.1f}ms "
+        f"p99={percentile(samples, 99) * 1000:8.1f}ms "
+        f"mean={statistics.mean(samples) * 1000 if samples else 0:8.1f}ms"
+    )
+
+
+async def login(client, base_url, username, password):
+    response = await client.post(
+        f"{base_url}/auth/token",
+        data={"username": username, "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def worker(client, url, headers, count, samples):
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        samples.append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            print(f"{url} -> {response.status_code}")
+
+
+async def run(args):
+    root_url = args.url.rsplit("/api/", 1)[0] + "/"
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        token = await login(client, args.url, args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        targets = [f"{args.url}/categories/"]
+        if args.course_id is not None:
+            targets.append(f"{args.url}/courses/{args.course_id}/progress")
+
+        for target in targets:
+            samples, probe = [], []
+            per_worker = max(1, args.requests // args.concurrency)
+            load = [
+                worker(client, target, headers, per_worker, samples)
+                for _ in range(args.concurrency)
+            ]
+            # A single sequential prober measures how long unrelated requests wait
+            probe_task = asyncio.ensure_future(
+                worker(client, root_url, {}, per_worker, probe)
+            )
+            await asyncio.gather(*load)
+            await probe_task
+            report(target.replace(args.url, ""), samples)
+            report("  / while loaded", probe)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--username", default="admin@example.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--course-id", type=int, default=None)
+    asyncio.run(run(parser.parse_args()))
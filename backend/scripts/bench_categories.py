@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /categories on a large seeded catalog.
+
+Seeds a SQLite database with CATEGORIES x COURSES x VIDEOS (default
+50 x 200 x 50, 10 videos per unit), then times the endpoint function against
+the seeded data and reports the number of SQL statements it issued. For
+comparison it also times the previous per-category / per-course lazy-loading
+walk on a sync session.
+
+Usage: python bench_categories.py [--db PATH] [--categories N] [--courses N] [--videos N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.endpoints.categories import get_categories
+from app.core.query_stats import capture_queries
+from app.db.base import Base
+from app.models.learning import Category, Course, Unit, Video, VideoProgress
+from app.models.user import User
+
+VIDEOS_PER_UNIT = 10
+
+
+def seed(engine, categories, courses, videos):
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        if db.execute(select(Category.id).limit(1)).first():
+            print("Database already seeded, reusing it")
+            return db.execute(select(User.id)).scalar()
+
+        user = User(email="bench@example.com", full_name="Bench", hashed_password="x", is_active=True)
+        db.add(user)
+        db.flush()
+
+        db.execute(insert(Category), [
+            {"name": f"Category {c}", "description": ""} for c in range(categories)
+        ])
+        category_ids = db.execute(select(Category.id)).scalars().all()
+        db.execute(insert(Course), [
+            {"title": f"Course {c}-{k}", "category_id": category_id, "order": k}
+            for c, category_id in enumerate(category_ids) for k in range(courses)
+        ])
+        course_ids = db.execute(select(Course.id)).scalars().all()
+        units_per_course = max(1, videos // VIDEOS_PER_UNIT)
+        db.execute(insert(Unit), [
+            {"title": f"Unit {u}", "course_id": course_id, "order": u}
+            for course_id in course_ids for u in range(units_per_course)
+        ])
+        unit_ids = db.execute(select(Unit.id)).scalars().all()
+        for start in range(0, len(unit_ids), 1000):
+            db.execute(insert(Video), [
+                {"title": f"Video {v}", "url": f"https://example.com/{unit_id}/{v}",
+                 "unit_id": unit_id, "order": v}
+                for unit_id in unit_ids[start:start + 1000] for v in range(VIDEOS_PER_UNIT)
+            ])
+        # The user has watched the first video of every 20th unit
+        watched = db.execute(
+            select(Video.id).where(Video.order == 0, Video.unit_id.in_(unit_ids[::20]))
+        ).scalars().all()
+        db.execute(insert(VideoProgress), [
+            {"user_id": user.id, "video_id": video_id, "progress": 50, "last_position": 30}
+            for video_id in watched
+        ])
+        db.commit()
+        return user.id
+
+
+def legacy_walk(db, user_id):
+    """The previous implementation: lazy-load courses per category and videos per course."""
+    progress = {vp.video_id: vp for vp in db.query(VideoProgress).filter(VideoProgress.user_id == user_id)}
+    result = []
+    for category in db.query(Category).all():
+        for course in category.courses:
+            result.append([progress.get(video.id) for video in course.videos])
+    return result
+
+
+async def run(args):
+    sync_engine = create_engine(f"sqlite:///{args.db}")
+    started = time.perf_counter()
+    user_id = seed(sync_engine, args.categories, args.courses, args.videos)
+    print(f"Seed: {time.perf_counter() - started:.1f}s")
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{args.db}")
+    AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+    async with AsyncSessionLocal() as db:
+        current_user = await db.get(User, user_id)
+        for _ in range(args.repeat):
+            with capture_queries() as stats:
+                started = time.perf_counter()
+                await get_categories(db=db, current_user=current_user)
+                elapsed = time.perf_counter() - started
+            print(f"get_categories: {elapsed * 1000:9.1f}ms  statements={stats.count}")
+            db.expunge_all()
+
+    if args.legacy:
+        Session = sessionmaker(bind=sync_engine)
+        with Session() as db:
+            with capture_queries() as stats:
+                started = time.perf_counter()
+                legacy_walk(db, user_id)
+                elapsed = time.perf_counter() - started
+            print(f"legacy walk:    {elapsed * 1000:9.1f}ms  statements={stats.count}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="bench_categories.db")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--videos", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy", action="store_true", help="also time the lazy-loading walk")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark the course funnel report over a large video_progress table.
+
+Seeds one course of --units units with --videos-per-unit videos each, and
+enough learners for --rows video_progress rows (default 10,000,000): each
+learner watches a random prefix of the course, completing all but possibly
+the last video watched. Then times compute_course_funnel (NumPy over
+columnar chunks), how much of that is fetching the chunks, and unless
+--skip-naive, the per-video counts computed row by row in Python, for
+comparison. Defaults to a throwaway SQLite file; --database-url points it
+at a scratch database instead.
+
+Usage: python bench_course_funnel.py [--rows N] [--units N] [--videos-per-unit N]
+                                     [--batch N] [--database-url URL] [--skip-naive]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.learning import Category, Course, CourseProgress, Unit, Video, VideoProgress
+from app.models.user import User
+from app.services.course_funnel import compute_course_funnel, video_progress_chunks
+
+CHUNK = 20000
+
+
+def seed(session_factory, args):
+    rng = random.Random(1)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with session_factory() as db:
+        category = Category(name="Funnel benchmark")
+        db.add(category)
+        db.flush()
+        course = Course(title="Funnel benchmark", category_id=category.id, order=1)
+        db.add(course)
+        db.flush()
+        units = [Unit(title=f"unit {i}", course_id=course.id, order=i) for i in range(args.units)]
+        db.add_all(units)
+        db.flush()
+        videos = [
+            Video(title=f"video {u}.{i}", url="bench", unit_id=unit.id, order=i)
+            for u, unit in enumerate(units) for i in range(args.videos_per_unit)
+        ]
+        db.add_all(videos)
+        db.flush()
+        video_ids = [video.id for video in videos]
+
+        rows, pending, learners = 0, [], 0
+        while rows < args.rows:
+            user = User(username=f"funnel-bench-{course.id}-{learners}", hashed_password="x", is_active=True)
+            db.add(user)
+            db.flush()
+            learners += 1
+            # Drop-off roughly halves the audience every quarter of the course
+            reached = min(len(video_ids), 1 + int(rng.expovariate(2.8 / len(video_ids))), args.rows - rows)
+            for position in range(reached):
+                last = position == reached - 1
+                finished = not (last and rng.random() < 0.5)
+                pending.append({
+                    "user_id": user.id,
+                    "video_id": video_ids[position],
+                    "progress": 100 if finished else rng.uniform(5, 80),
+                    "last_position": 0.0,
+                    "completed": finished,
+                    "created_at": start + timedelta(hours=position),
+                    "updated_at": start + timedelta(hours=position + rng.uniform(0.2, 3)),
+                })
+            db.add(CourseProgress(
+                user_id=user.id, course_id=course.id, progress_percentage=100.0 * reached / len(video_ids)
+            ))
+            rows += reached
+            if len(pending) >= CHUNK:
+                db.execute(insert(VideoProgress), pending)
+                db.commit()
+                pending = []
+                print(f"\rseeded {rows} rows", end="", flush=True)
+        if pending:
+            db.execute(insert(VideoProgress), pending)
+        db.commit()
+        print(f"\rseeded {rows} rows for {learners} learners")
+        return course.id
+
+
+def naive_funnel(db, course_id):
+    """Started / completed per video and furthest video per learner, one Python step per row."""
+    videos = db.execute(
+        select(Video.id).join(Unit, Unit.id == Video.unit_id)
+        .where(Unit.course_id == course_id).order_by(Unit.order, Unit.id, Video.order, Video.id)
+    ).scalars().all()
+    position_of = {video_id: index for index, video_id in enumerate(videos)}
+    started, completed = defaultdict(int), defaultdict(int)
+    furthest = {}
+    for user_id, video_id, progress, done in db.execute(
+        select(VideoProgress.user_id, VideoProgress.video_id, VideoProgress.progress, VideoProgress.completed)
+        .where(VideoProgress.video_id.in_(videos))
+    ):
+        if progress > 0:
+            started[video_id] += 1
+        if done:
+            completed[video_id] += 1
+            furthest[user_id] = max(furthest.get(user_id, -1), position_of[video_id])
+    return started, completed, furthest
+
+
+def run(args):
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'funnel.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    course_id = seed(session_factory, args)
+
+    with session_factory() as db:
+        started = time.perf_counter()
+        for _ in video_progress_chunks(db, course_id, args.batch):
+            pass
+        fetched = time.perf_counter() - started
+    with session_factory() as db:
+        started = time.perf_counter()
+        report = compute_course_funnel(db, course_id, batch_size=args.batch)
+        elapsed = time.perf_counter() - started
+    print(f"numpy funnel: {elapsed:.1f}s ({fetched:.1f}s fetching chunks) for "
+          f"{report['video_learners']} learners, median time to complete "
+          f"{report['median_seconds_to_complete']:.0f}s")
+
+    if not args.skip_naive:
+        with session_factory() as db:
+            started = time.perf_counter()
+            naive_funnel(db, course_id)
+            elapsed = time.perf_counter() - started
+        print(f"per-row Python (fewer metrics): {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--units", type=int, default=10)
+    parser.add_argument("--videos-per-unit", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=settings.FUNNEL_BATCH_SIZE)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--skip-naive", action="store_true")
+    run(parser.parse_args())
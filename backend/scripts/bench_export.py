@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Check that streaming an admin export keeps memory flat.
+
+Seeds --rows synthetic video_progress rows (default 5,000,000, spread over
+1000 videos and rows/1000 users) into --database-url, then streams the
+video_progress export through the same generator the endpoint uses and
+samples the process RSS as it goes. The RSS once the first 5% of the rows
+are out is the baseline; the run fails if it grows by more than
+--max-growth-mb after that. Defaults to a throwaway SQLite file; point it at
+a scratch Postgres database to exercise real server-side cursors. Linux
+only (reads /proc/self/statm).
+
+Usage: python bench_export.py [--rows N] [--batch N] [--format ndjson|csv]
+                              [--database-url URL] [--max-growth-mb MB]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.learning import Category, Course, Unit, Video, VideoProgress
+from app.models.user import User
+from app.services.progress_export import stream_export
+
+VIDEOS = 1000
+CHUNK = 10000
+
+
+def rss_mb():
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def seed(session_factory, rows):
+    with session_factory() as db:
+        if db.execute(select(func.count(VideoProgress.id))).scalar() >= rows:
+            return
+        category = Category(name="Export benchmark")
+        db.add(category)
+        db.flush()
+        course = Course(title="Export benchmark", category_id=category.id, order=1)
+        db.add(course)
+        db.flush()
+        unit = Unit(title="Export benchmark", course_id=course.id, order=1)
+        db.add(unit)
+        db.flush()
+        videos = [Video(title=f"video {i}", url="bench", unit_id=unit.id, order=i) for i in range(VIDEOS)]
+        db.add_all(videos)
+        users = (rows + VIDEOS - 1) // VIDEOS
+        db.execute(insert(User), [
+            {"username": f"export-bench-{i}", "hashed_password": "x", "is_active": True} for i in range(users)
+        ])
+        db.flush()
+        user_ids = db.execute(
+            select(User.id).where(User.username.like("export-bench-%")).order_by(User.id)
+        ).scalars().all()
+        video_ids = [video.id for video in videos]
+        for start in range(0, rows, CHUNK):
+            db.execute(insert(VideoProgress), [
+                {
+                    "user_id": user_ids[i // VIDEOS],
+                    "video_id": video_ids[i % VIDEOS],
+                    "progress": i % 100,
+                    "last_position": float(i % 3600),
+                }
+                for i in range(start, min(rows, start + CHUNK))
+            ])
+            db.commit()
+            print(f"\rseeded {min(rows, start + CHUNK)} rows", end="", flush=True)
+        print()
+
+
+def run(args):
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'export.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    seed(session_factory, args.rows)
+
+    baseline = None
+    peak = 0.0
+    exported = 0
+    size = 0
+    started = time.perf_counter()
+    for chunk in stream_export(session_factory, "video_progress", args.format, batch_size=args.batch):
+        exported += chunk.count("\n")
+        size += len(chunk)
+        if baseline is None and exported >= args.rows * 0.05:
+            baseline = rss_mb()
+        elif baseline is not None:
+            peak = max(peak, rss_mb())
+    elapsed = time.perf_counter() - started
+
+    growth = max(0.0, peak - baseline) if baseline is not None else 0.0
+    print(f"exported {exported} lines, {size / 2 ** 20:.0f}MB in {elapsed:.1f}s "
+          f"({exported / elapsed:.0f} rows/s)")
+    print(f"RSS baseline {baseline or 0:.1f}MB, peak {peak:.1f}MB, growth {growth:.1f}MB")
+    if growth > args.max_growth_mb:
+        print(f"FAIL: RSS grew by more than {args.max_growth_mb}MB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000000)
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--max-growth-mb", type=float, default=50)
+    run(parser.parse_args())
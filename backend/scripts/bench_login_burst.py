@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Latency of unrelated endpoints while the API absorbs a login burst.
+
+First measures p50/p95/p99 of a probe endpoint on an idle server, then again
+while BURST concurrent clients hammer `/auth/token`. Login outcomes are
+tallied by status code, so shed load (503 + Retry-After) is visible next to
+the probe latency. Run it against a build from before the bounded bcrypt pool
+and against the current tree to compare.
+
+All logins come from one IP for one account, so run the server with
+LOGIN_RATE_LIMIT_ENABLED=false to measure the hasher rather than the throttle.
+
+Usage: python bench_login_burst.py [--url URL] [--burst N] [--logins N] [--probe PATH]
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from bench_async_endpoints import API_URL, login, report
+
+
+async def probe(client, url, headers, samples, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(url, headers=headers)
+        samples.append(time.perf_counter() - start)
+
+
+async def login_worker(client, base_url, username, password, count, outcomes):
+    for _ in range(count):
+        response = await client.post(
+            f"{base_url}/auth/token",
+            data={"username": username, "password": password},
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        outcomes[response.status_code] += 1
+
+
+async def measure_probe(client, url, headers, seconds):
+    samples, stop = [], asyncio.Event()
+    task = asyncio.ensure_future(probe(client, url, headers, samples, stop))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await task
+    return samples
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.burst + 2)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        token = await login(client, args.url, args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        probe_url = f"{args.url}{args.probe}"
+
+        report(f"{args.probe} idle", await measure_probe(client, probe_url, headers, args.idle_seconds))
+
+        samples, stop, outcomes = [], asyncio.Event(), Counter()
+        probe_task = asyncio.ensure_future(probe(client, probe_url, headers, samples, stop))
+        per_worker = max(1, args.logins // args.burst)
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            login_worker(client, args.url, args.username, args.password, per_worker, outcomes)
+            for _ in range(args.burst)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+        report(f"{args.probe} during login burst", samples)
+        print(f"logins: {sum(outcomes.values())} in {elapsed:.1f}s, by status: {dict(sorted(outcomes.items()))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--username", default="admin@example.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--burst", type=int, default=200, help="concurrent login clients")
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--probe", default="/courses/", help="unrelated endpoint to time")
+    parser.add_argument("--idle-seconds", type=float, default=5)
+    asyncio.run(run(parser.parse_args()))
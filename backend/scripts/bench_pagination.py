@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark deep pages of the video listing: OFFSET versus keyset cursors.
+
+Seeds a database with ROWS videos (default 1,000,000, spread over units of
+1000) and times fetching page N (default 1000, 100 rows per page) of the
+`GET /videos/` query both ways: `OFFSET (N-1)*limit`, which scans and discards
+every earlier row, and a keyset cursor taken from the last row of page N-1,
+which starts with an index range scan on (order, id).
+
+Usage: python bench_pagination.py [--database-url URL] [--rows N] [--page N] [--limit N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pagination import encode_cursor, paginate
+from app.db.base import Base
+from app.models.learning import Category, Course, Unit, Video
+
+VIDEOS_PER_UNIT = 1000
+BATCH = 10000
+
+
+def seed(engine, rows):
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        existing = db.query(Video).count()
+        if existing >= rows:
+            print(f"Database already has {existing} videos, reusing it")
+            return
+
+        category = Category(name="Pagination Bench", description="")
+        db.add(category)
+        db.flush()
+        course = Course(title="Pagination Bench", category_id=category.id, order=0)
+        db.add(course)
+        db.flush()
+        units = rows // VIDEOS_PER_UNIT + 1
+        db.execute(insert(Unit), [
+            {"title": f"Unit {u}", "course_id": course.id, "order": u} for u in range(units)
+        ])
+        unit_ids = db.execute(select(Unit.id).where(Unit.course_id == course.id)).scalars().all()
+        for start in range(existing, rows, BATCH):
+            db.execute(insert(Video), [
+                {"title": f"Video {v}", "url": f"https://example.com/{v}.mp4",
+                 "unit_id": unit_ids[v // VIDEOS_PER_UNIT], "order": v % VIDEOS_PER_UNIT}
+                for v in range(start, min(rows, start + BATCH))
+            ])
+        db.commit()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return result, samples
+
+
+def main(args):
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"Seed: {time.perf_counter() - started:.1f}s")
+
+    Session = sessionmaker(bind=engine)
+    order_by = (Video.order, Video.id)
+    skip = (args.page - 1) * args.limit
+    with Session() as db:
+        # The cursor a client would hold after reading page N-1
+        previous = db.query(Video).order_by(*order_by).offset(skip - 1).limit(1).one()
+        cursor = encode_cursor([previous.order, previous.id])
+
+        by_offset, offset_samples = timed(
+            lambda: paginate(db.query(Video), order_by, skip=skip, limit=args.limit)[0], args.repeat
+        )
+        db.expunge_all()
+        by_cursor, cursor_samples = timed(
+            lambda: paginate(db.query(Video), order_by, limit=args.limit, cursor=cursor)[0], args.repeat
+        )
+        assert [video.id for video in by_offset] == [video.id for video in by_cursor]
+
+    for name, samples in (("offset", offset_samples), ("keyset", cursor_samples)):
+        print(
+            f"page {args.page} via {name:<6}: median={statistics.median(samples) * 1000:8.1f}ms "
+            f"min={min(samples) * 1000:8.1f}ms max={max(samples) * 1000:8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite:///bench_pagination.db")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if args.page < 2:
+        parser.error("--page must be at least 2")
+    main(args)
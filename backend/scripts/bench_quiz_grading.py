@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark quiz grading: compiled answer keys vs walking quiz.questions.
+
+Builds a quiz of --questions questions (default 200; one in ten short
+answer, the rest multiple choice with --choices choices) and --submissions
+random submissions, then grades them from --threads threads at once: first
+the way calculate_quiz_score used to (scan each question's choices for
+the correct one on every submission), then through the answer key cache.
+Also checks that both give the same scores.
+
+Usage: python bench_quiz_grading.py [--questions N] [--choices N]
+                                    [--submissions N] [--threads N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.quiz import Quiz
+from app.services.quiz_grading import AnswerKeyCache, grade
+
+
+def scan_score(quiz, responses):
+    """The previous calculate_quiz_score."""
+    correct_answers = 0
+    for question in quiz.questions:
+        question_id = str(question["id"])
+        if question_id not in responses:
+            continue
+        if question["question_type"] == "multiple_choice":
+            correct_choice = next((choice for choice in question["choices"] if choice["is_correct"]), None)
+            if correct_choice and responses[question_id] == correct_choice["id"]:
+                correct_answers += 1
+        elif responses[question_id].strip():
+            correct_answers += 1
+    total = len(quiz.questions)
+    return (correct_answers / total) * 100 if total > 0 else 0
+
+
+def build(args, rng):
+    questions = []
+    for i in range(args.questions):
+        if i % 10 == 9:
+            questions.append({"id": i, "question_type": "short_answer"})
+            continue
+        correct = rng.randrange(args.choices)
+        questions.append({
+            "id": i,
+            "question_type": "multiple_choice",
+            "choices": [{"id": i * 100 + c, "is_correct": c == correct} for c in range(args.choices)],
+        })
+    quiz = Quiz(id=1, title="Benchmark", questions=questions, updated_at=datetime.now(timezone.utc))
+    submissions = [
+        {
+            str(q["id"]): rng.choice(["", "answer"]) if q["question_type"] == "short_answer"
+            else rng.choice(q["choices"])["id"]
+            for q in questions
+            if rng.random() < 0.95
+        }
+        for _ in range(args.submissions)
+    ]
+    return quiz, submissions
+
+
+def timed(label, args, fn, submissions):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        scores = list(pool.map(fn, submissions, chunksize=64))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {len(submissions) / elapsed:10.0f} submissions/s "
+          f"({elapsed / len(submissions) * 1e6:.1f}us each, {args.threads} threads)")
+    return scores
+
+
+def run(args):
+    rng = random.Random(1)
+    quiz, submissions = build(args, rng)
+    keys = AnswerKeyCache(16)
+
+    scanned = timed("scan quiz.questions", args, lambda responses: scan_score(quiz, responses), submissions)
+    compiled = timed("compiled answer key", args, lambda responses: grade(keys.get(quiz), responses), submissions)
+    assert scanned == compiled, "compiled answer keys graded differently"
+    print(f"answer key cache: {keys.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--choices", type=int, default=4)
+    parser.add_argument("--submissions", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    run(parser.parse_args())
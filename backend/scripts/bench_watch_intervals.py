@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark the watched-range set used by the watch tracker.
+
+Builds a viewing history of --segments disjoint segments (default 10000),
+then times: adding segments in playback order (the heartbeat case, each
+extends the last range), adding segments at random positions, and the
+naive alternative of appending to a list and sorting and merging it on
+every add. Also reports the packed size and pack/unpack time.
+
+Usage: python bench_watch_intervals.py [--segments N] [--adds N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.intervals import IntervalSet
+
+
+def naive_add(segments, start, end):
+    """Append and re-merge everything, as a list of (start, end) pairs would."""
+    segments.append((start, end))
+    segments.sort()
+    merged = [list(segments[0])]
+    for s, e in segments[1:]:
+        if s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    segments[:] = [tuple(r) for r in merged]
+
+
+def history(count):
+    """``count`` disjoint 5 second segments with 5 second gaps between them."""
+    watched = IntervalSet()
+    for i in range(count):
+        watched.add(i * 10.0, i * 10.0 + 5)
+    return watched
+
+
+def timed(label, adds, fn):
+    started = time.perf_counter()
+    for _ in range(adds):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed / adds * 1e6:9.2f}us per add")
+
+
+def run(args):
+    rng = random.Random(1)
+    horizon = args.segments * 10.0
+
+    watched = history(args.segments)
+    position = [horizon]
+    def sequential():
+        watched.add(position[0], position[0] + 1)
+        position[0] += 1
+    timed("IntervalSet sequential", args.adds, sequential)
+
+    def random_segment():
+        start = rng.uniform(0, horizon)
+        return start, start + 2
+
+    watched = history(args.segments)
+    timed("IntervalSet random", args.adds, lambda: watched.add(*random_segment()))
+
+    segments = list(history(args.segments))
+    timed("sort-and-merge random", max(1, args.adds // 100),
+          lambda: naive_add(segments, *random_segment()))
+
+    watched = history(args.segments)
+    started = time.perf_counter()
+    data = watched.pack()
+    packed = time.perf_counter() - started
+    started = time.perf_counter()
+    IntervalSet.unpack(data)
+    unpacked = time.perf_counter() - started
+    print(f"packed {len(watched)} ranges: {len(data)} bytes, "
+          f"pack {packed * 1000:.2f}ms, unpack {unpacked * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--adds", type=int, default=10000)
+    run(parser.parse_args())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Load test for the `/ws/progress` player heartbeat channel.
+
+Opens VIEWERS WebSocket connections (all as one user, spread over the
+existing video ids FIRST_VIDEO_ID .. FIRST_VIDEO_ID + VIDEOS - 1) that send a
+position update every TICK seconds, and meanwhile times the `/` root probe so
+a stalled event loop shows up. Reports connect latency, the
+message rate actually achieved, the probe latency, and the server's own
+channel counters from `/admin/progress-ws` (admin credentials required).
+
+Needs the `websockets` package. Raise the open file limit (`ulimit -n`) on
+both ends before going past a thousand viewers.
+
+Usage: python bench_ws_progress.py [--url URL] [--viewers N] [--tick SECONDS] [--seconds N]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+import websockets
+
+from bench_async_endpoints import API_URL, login, report
+
+
+async def viewer(ws_url, video_id, tick, seconds, connect_samples, sent):
+    start = time.perf_counter()
+    async with websockets.connect(ws_url) as socket:
+        connect_samples.append(time.perf_counter() - start)
+        position = 0.0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            position += tick
+            await socket.send(
+                f'{{"video_id": {video_id}, "progress": {min(100.0, position / 6):.2f}, '
+                f'"last_position": {position:.1f}}}'
+            )
+            sent[0] += 1
+            await asyncio.sleep(tick)
+
+
+async def probe(client, url, samples, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(url)
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+async def run(args):
+    async with httpx.AsyncClient(timeout=60) as client:
+        token = await login(client, args.url, args.username, args.password)
+        ws_url = args.url.replace("http", "ws", 1) + f"/ws/progress?token={token}"
+        root_url = args.url.split("/api/")[0] + "/"
+
+        connect_samples, probe_samples, sent, stop = [], [], [0], asyncio.Event()
+        probe_task = asyncio.ensure_future(probe(client, root_url, probe_samples, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            viewer(
+                ws_url, args.first_video_id + index % args.videos,
+                args.tick, args.seconds, connect_samples, sent,
+            )
+            for index in range(args.viewers)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+        report("ws connect", connect_samples)
+        report("/ probe during load", probe_samples)
+        print(f"messages: {sent[0]} in {elapsed:.1f}s ({sent[0] / elapsed:.0f}/s)")
+
+        response = await client.get(
+            f"{args.url}/admin/progress-ws", headers={"Authorization": f"Bearer {token}"}
+        )
+        if response.status_code == 200:
+            print(f"server: {response.json()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--username", default="admin@example.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--viewers", type=int, default=1000)
+    parser.add_argument("--tick", type=float, default=1.0, help="seconds between updates per viewer")
+    parser.add_argument("--seconds", type=float, default=30, help="how long each viewer streams")
+    parser.add_argument("--first-video-id", type=int, default=1)
+    parser.add_argument("--videos", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
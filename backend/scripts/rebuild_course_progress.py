@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Recount every stored course progress rollup from the completed videos.
+
+Course progress used to be client-supplied and is now maintained by the
+server; run this once after deploying that change, and any time the rollups
+are suspected to have drifted. Rows are recomputed in batches of --batch,
+each batch in its own transaction.
+
+Usage: python rebuild_course_progress.py [--batch N]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.learning import CourseProgress
+from app.services.course_progress import recompute_course_progress
+
+
+def rebuild(batch):
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(
+                CourseProgress.user_id,
+                CourseProgress.course_id,
+                CourseProgress.completed_units,
+                CourseProgress.total_units,
+            ).order_by(CourseProgress.id)
+        ).all()
+    changed = 0
+    for start in range(0, len(rows), batch):
+        with SessionLocal() as db:
+            for user_id, course_id, completed_units, total_units in rows[start:start + batch]:
+                progress = recompute_course_progress(db, user_id, course_id)
+                changed += (progress.completed_units, progress.total_units) != (completed_units, total_units)
+            db.commit()
+        print(f"{min(start + batch, len(rows))}/{len(rows)} rows, {changed} corrected")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=500)
+    rebuild(parser.parse_args().batch)
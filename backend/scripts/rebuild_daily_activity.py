@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily_user_activity rollup from completed learning sessions.
+
+The rollup is normally maintained as sessions complete; run this once after
+creating the table, and any time it is suspected to have drifted. Existing
+rows (of --user only, if given) are deleted, then sessions are read in
+batches of --batch by id, each batch in its own transaction. Sessions that
+complete while it runs can be counted twice, so run it with
+STUDY_EVENTS_ENABLED=false on the workers or in a quiet window.
+
+Usage: python rebuild_daily_activity.py [--batch N] [--user ID]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.daily_activity import rebuild_daily_activity
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--user", type=int, default=None)
+    args = parser.parse_args()
+    for sessions, rows in rebuild_daily_activity(SessionLocal, args.batch, args.user):
+        print(f"{sessions} sessions, {rows} rollup rows in the last batch")
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Recompute the per-user and per-course progress summaries from course_progress.
+
+The summaries are normally moved by deltas as course progress changes; run
+this once after creating the tables, and any time they are suspected to have
+drifted. Deleting users or courses never moves last_accessed back, which this
+also corrects. Ids are refreshed in batches of --batch, each batch in its own
+transaction.
+
+Usage: python rebuild_progress_summaries.py [--batch N]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.progress_summary import rebuild_progress_summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, default=500)
+    done = {"users": 0, "courses": 0}
+    for name, count in rebuild_progress_summaries(SessionLocal, parser.parse_args().batch):
+        done[name] += count
+        print(f"{done['users']} user and {done['courses']} course summaries refreshed")
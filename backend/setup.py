@@ -10,6 +10,8 @@ setup(
         "sqlalchemy==1.4.41",
         "alembic==1.11.1",
         "psycopg2-binary==2.9.6",
+        "asyncpg==0.29.0",
+        "aiosqlite==0.19.0",
         "python-multipart==0.0.6",
         "python-jose[cryptography]==3.3.0",
         "passlib[bcrypt]==1.7.4",
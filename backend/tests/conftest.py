@@ -1,14 +1,22 @@
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
 from fastapi.testclient import TestClient
+from app.core.catalog_cache import catalog_cache
+from app.core.claims import token_versions
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import login_throttle
+from app.core.database import get_db, get_async_db, get_read_db, get_async_read_db, get_read_session_factory
 from app.models.base import Base
 from app.main import app
 from app.models.learning import Category, Course, Unit, Video
 from app.models.user import User
+from app.services.video_progress import progress_buffer
+from app.services.study_events import study_events
+from app.services.watch_intervals import watch_tracker
 from app.core.security import get_password_hash, create_access_token
 import uuid
 import random
@@ -17,16 +25,31 @@ import os
 # Set testing environment
 os.environ["TESTING"] = "1"
 
+pytest_plugins = ["query_counter"]
 
-# Use in-memory SQLite database for testing
+
+# Use a temporary SQLite database file for testing so the sync engine and the
+# aiosqlite engine behind the async endpoints see the same data
 @pytest.fixture(scope="session")
-def engine():
-    """Create a SQLite in-memory database engine for testing."""
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+def db_path(tmp_path_factory):
+    """Path of the SQLite database file shared by the sync and async engines."""
+    return tmp_path_factory.mktemp("db") / "test.db"
+
+
+@pytest.fixture(scope="session")
+def engine(db_path):
+    """Create a SQLite database engine for testing."""
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False}, poolclass=StaticPool)
     Base.metadata.create_all(bind=engine)
     return engine
 
 
+@pytest.fixture(scope="session")
+def async_engine(engine, db_path):
+    """Create an aiosqlite engine on the same database file."""
+    return create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+
+
 @pytest.fixture(scope="session")
 def db_session(engine):
     """Create a fresh SQLAlchemy session for each test session."""
@@ -50,7 +73,7 @@ def db(db_session):
 
 
 @pytest.fixture
-def client(db):
+def client(db, engine, async_engine):
     """Return a test client with a database session override."""
     def override_get_db():
         try:
@@ -58,12 +81,44 @@ def client(db):
         finally:
             pass
     
+    AsyncTestingSession = sessionmaker(
+        bind=async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as async_db:
+            yield async_db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+
+    # Fixtures write to the database directly, so start each test from an empty catalog cache
+    catalog_cache.clear()
+    principal_cache.clear()
+    login_throttle.reset()
+
+    # Buffered progress is flushed into the test database, drained on client shutdown
+    session_factory = progress_buffer.session_factory
+    progress_buffer.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    token_versions.session_factory = progress_buffer.session_factory
+    catalog_cache.session_factory = progress_buffer.session_factory
+    watch_tracker.session_factory = progress_buffer.session_factory
+    watch_tracker.clear()
+    study_events.session_factory = progress_buffer.session_factory
+    study_events.clear()
+    app.dependency_overrides[get_read_session_factory] = lambda: progress_buffer.session_factory
     
     # Use the standard TestClient without a custom base URL
     with TestClient(app) as test_client:
         yield test_client
     
+    progress_buffer.session_factory = session_factory
+    token_versions.session_factory = session_factory
+    catalog_cache.session_factory = session_factory
+    watch_tracker.session_factory = session_factory
+    study_events.session_factory = session_factory
     app.dependency_overrides.clear()
 
 
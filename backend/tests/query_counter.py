@@ -0,0 +1,61 @@
+"""
+Pytest plugin for asserting how many SQL statements a test issues.
+
+Either mark a test::
+
+    @pytest.mark.max_queries(6)
+    def test_get_categories(client, normal_token_headers):
+        client.get("/categories/", headers=normal_token_headers)
+
+or use the fixture to bound a single block::
+
+    def test_get_categories(client, assert_max_queries):
+        with assert_max_queries(6):
+            client.get("/categories/")
+
+Only statements issued while the test body runs are counted; fixture setup is not.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app.core.query_stats import capture_queries
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "max_queries(n): fail if the test body issues more than n SQL statements"
+    )
+
+
+def _format_failure(stats, limit):
+    lines = [f"Expected at most {limit} SQL statements, got {stats.count}:"]
+    lines += [f"  {count} x {shape}" for shape, count in stats.shapes.most_common()]
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Context manager that fails if the wrapped block issues more than ``n`` statements."""
+    @contextmanager
+    def _assert_max_queries(n):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= n, _format_failure(stats, n)
+
+    return _assert_max_queries
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("max_queries")
+    if marker is None:
+        yield
+        return
+    limit = marker.args[0]
+    with capture_queries() as stats:
+        outcome = yield
+    if outcome.excinfo is None and stats.count > limit:
+        outcome.force_exception(
+            pytest.fail.Exception(_format_failure(stats, limit), pytrace=False)
+        )
@@ -0,0 +1,176 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def test_get_db_pool_stats_admin(client, admin_token_headers):
+    """Test reading connection pool telemetry as admin."""
+    response = client.get("/admin/db-pool", headers=admin_token_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["pools"]) >= 2
+    for pool in data["pools"]:
+        assert "pool_class" in pool
+        assert pool["checkouts"] >= 0
+        assert pool["wait_p99_ms"] >= 0
+
+
+def test_get_db_pool_stats_regular_user(client, normal_token_headers):
+    """Test that regular users cannot read pool telemetry."""
+    response = client.get("/admin/db-pool", headers=normal_token_headers)
+    assert response.status_code == 403
+    data = response.json()
+    assert "detail" in data
+
+
+def test_get_catalog_cache_stats_admin(client, admin_token_headers):
+    """Test reading catalog cache counters as admin."""
+    client.get("/courses/")
+    client.get("/courses/")
+    response = client.get("/admin/catalog-cache", headers=admin_token_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hits"] >= 1
+    assert data["misses"] >= 1
+    assert "version" in data
+
+
+def test_get_progress_buffer_stats_admin(client, admin_token_headers, normal_token_headers, test_video):
+    """Test that the write-behind buffer reports heartbeats and flushes."""
+    from app.services.video_progress import progress_buffer
+
+    for position in (1.0, 2.0, 3.0):
+        client.put(
+            f"/videos/{test_video.id}/progress",
+            json={"progress": 10, "last_position": position},
+            headers=normal_token_headers,
+        )
+    progress_buffer.flush()
+    response = client.get("/admin/progress-buffer", headers=admin_token_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["received"] >= 3
+    assert data["coalesced"] >= 2
+    assert data["flushes"] >= 1
+    assert data["pending"] == 0
+
+
+def test_get_startup_stats_admin(client, admin_token_headers):
+    """Test that the startup phases of this worker are reported."""
+    response = client.get("/admin/startup", headers=admin_token_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ready"] is True
+    assert "imports" in [phase["name"] for phase in data["phases"]]
+
+
+def test_get_progress_overview_pages_users(client, admin_token_headers, normal_token_headers, db, test_category):
+    """Test that the admin progress listing sorts, filters and pages users with their courses."""
+    import uuid
+    from app.models.learning import Course
+    from app.models.user import User
+    from app.services.course_progress import recompute_course_progress
+
+    course = Course(title="Overview course", category_id=test_category.id, order=1)
+    users = [User(username=f"overview{i}_{uuid.uuid4().hex[:8]}", hashed_password="x", is_active=True) for i in range(3)]
+    db.add(course)
+    db.add_all(users)
+    db.flush()
+    for user in users:
+        recompute_course_progress(db, user.id, course.id).progress_percentage = 0
+    db.commit()
+
+    params = {"course_id": course.id, "sort": "progress", "order": "asc", "limit": 2}
+    response = client.get("/admin/progress", params=params, headers=admin_token_headers)
+    assert response.status_code == 200
+    first = response.json()
+    assert [user["id"] for user in first] == [users[0].id, users[1].id]
+    assert first[0]["courses"] == [{
+        "id": course.id,
+        "title": "Overview course",
+        "progress": {
+            "progress_percentage": 0, "completed_units": 0, "total_units": 0,
+            "last_accessed": first[0]["courses"][0]["progress"]["last_accessed"],
+        },
+    }]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/admin/progress", params={**params, "cursor": cursor}, headers=admin_token_headers)
+    assert [user["id"] for user in response.json()] == [users[2].id]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get(
+        "/admin/progress", params={"course_id": course.id, "search": users[1].username},
+        headers=admin_token_headers,
+    )
+    assert [user["id"] for user in response.json()] == [users[1].id]
+
+    response = client.get("/admin/progress/courses", headers=admin_token_headers)
+    assert {"id": course.id, "learners": 3}.items() <= next(
+        row for row in response.json() if row["id"] == course.id
+    ).items()
+
+    assert client.get("/admin/progress", headers=normal_token_headers).status_code == 403
+
+
+def test_export_streams_filtered_rows(client, admin_token_headers, normal_token_headers, db, test_user, test_course):
+    """Test that the export endpoint streams the requested dataset, format and filters."""
+    from app.services.course_progress import recompute_course_progress
+
+    recompute_course_progress(db, test_user.id, test_course.id)
+    db.commit()
+
+    response = client.get(
+        "/admin/export/course_progress", params={"course_id": test_course.id}, headers=admin_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="course_progress.ndjson"' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["user_id"], row["course_id"]) for row in rows] == [(test_user.id, test_course.id)]
+
+    response = client.get(
+        "/admin/export/course_progress",
+        params={"format": "csv", "course_id": test_course.id, "since": "2999-01-01T00:00:00"},
+        headers=admin_token_headers,
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == [
+        "id,user_id,course_id,completed_units,total_units,progress_percentage,last_accessed"
+    ]
+
+    assert client.get("/admin/export/users", headers=admin_token_headers).status_code == 422
+    assert client.get("/admin/export/quiz_attempts", headers=normal_token_headers).status_code == 403
+
+
+def test_get_course_funnel_is_cached(client, admin_token_headers, normal_token_headers, test_course, test_video):
+    """Test that the course funnel is served from the cache until refreshed."""
+    url = f"/admin/progress/courses/{test_course.id}/funnel"
+    response = client.get(url, headers=admin_token_headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert [video["video_id"] for video in report["videos"]] == [test_video.id]
+    assert client.get(url, headers=admin_token_headers).json()["generated_at"] == report["generated_at"]
+    assert client.get(url, params={"refresh": True}, headers=admin_token_headers).json()["generated_at"] != report["generated_at"]
+
+    assert client.get("/admin/progress/courses/999999/funnel", headers=admin_token_headers).status_code == 404
+    assert client.get(url, headers=normal_token_headers).status_code == 403
+
+
+def test_get_quiz_question_stats(client, admin_token_headers, normal_token_headers, db, test_user, test_video):
+    """Test reading per-question counters of a quiz."""
+    from app.models.quiz import Quiz
+    from app.services.quiz_responses import record_quiz_responses
+
+    quiz = Quiz(title="Stats quiz", video_id=test_video.id, questions=[])
+    db.add(quiz)
+    db.flush()
+    record_quiz_responses(db, 1, quiz.id, [("7001", 3, True)])
+    db.commit()
+
+    response = client.get(f"/admin/quizzes/{quiz.id}/question-stats", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert response.json() == [{"question_id": "7001", "attempts": 1, "correct": 1, "correct_rate": 1.0}]
+    assert client.get("/admin/quizzes/999999/question-stats", headers=admin_token_headers).status_code == 404
+    assert client.get(f"/admin/quizzes/{quiz.id}/question-stats", headers=normal_token_headers).status_code == 403
@@ -141,4 +141,88 @@ def test_auth_token_endpoint_url(client, test_user):
     # Test with the API v1 path
     response = client.post(f"{settings.API_V1_STR}/auth/token", data=login_data)
     assert response.status_code == 200
-    assert "access_token" in response.json() 
\ No newline at end of file
+    assert "access_token" in response.json() 
+
+def test_login_sheds_load_when_hasher_is_full(client, test_user, monkeypatch):
+    """Test that logins get a fast 503 with Retry-After while the bcrypt pool is saturated."""
+    from app.api.endpoints import auth
+    from app.core.security import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    hasher._slots.acquire()  # the only slot is taken by another login
+    monkeypatch.setattr(auth, "password_hasher", hasher)
+
+    login_data = {"username": test_user.username, "password": "testpassword"}
+    response = client.post(f"{settings.API_V1_STR}/auth/token", data=login_data)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_claims_token_skips_user_lookup(client, db, test_admin, assert_max_queries, monkeypatch):
+    """Test that a claims token authorizes without a user query and is revoked by deactivation."""
+    from app.core.claims import token_versions
+
+    monkeypatch.setattr(settings, "AUTH_CLAIMS_MODE", True)
+    login_data = {"username": test_admin.username, "password": "testpassword"}
+    response = client.post(f"{settings.API_V1_STR}/auth/token", data=login_data)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    token_versions.refresh()
+    with assert_max_queries(0):
+        response = client.get(f"{settings.API_V1_STR}/admin/catalog-cache", headers=headers)
+    assert response.status_code == 200
+
+    test_admin.is_active = False
+    db.commit()
+    token_versions.invalidate(test_admin.id)
+    response = client.get(f"{settings.API_V1_STR}/admin/catalog-cache", headers=headers)
+    assert response.status_code == 401
+
+
+def test_claims_token_survives_profile_update(client, test_user, monkeypatch):
+    """Test that renaming yourself keeps a claims token valid and changing the password revokes it."""
+    monkeypatch.setattr(settings, "AUTH_CLAIMS_MODE", True)
+    login_data = {"username": test_user.username, "password": "testpassword"}
+    response = client.post(f"{settings.API_V1_STR}/auth/token", data=login_data)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = client.put(f"{settings.API_V1_STR}/users/me", json={"full_name": "Renamed"}, headers=headers)
+    assert response.status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 200
+
+    response = client.put(f"{settings.API_V1_STR}/users/me", json={"password": "newpassword"}, headers=headers)
+    assert response.status_code == 200
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 401
+
+
+def test_claims_token_of_user_deleted_elsewhere(client, db, test_user, monkeypatch):
+    """Test that /users/me answers 404, not 500, for a user deleted through another worker."""
+    monkeypatch.setattr(settings, "AUTH_CLAIMS_MODE", True)
+    login_data = {"username": test_user.username, "password": "testpassword"}
+    response = client.post(f"{settings.API_V1_STR}/auth/token", data=login_data)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 200
+
+    # This worker's token versions still know the user
+    db.delete(test_user)
+    db.commit()
+    assert client.get(f"{settings.API_V1_STR}/users/me", headers=headers).status_code == 404
+
+
+def test_login_throttled_before_password_check(client, test_user, monkeypatch):
+    """Test that over-budget logins get a 429 without reaching the password hasher."""
+    from app.core.rate_limit import login_throttle
+
+    monkeypatch.setattr(login_throttle, "user_limit", (1, 1 / 60))
+    login_data = {"username": test_user.username, "password": "wrongpassword"}
+    assert client.post(f"{settings.API_V1_STR}/auth/token", data=login_data).status_code == 401
+
+    async def fail_verify(*args):
+        raise AssertionError("password checked for a throttled login")
+
+    monkeypatch.setattr("app.api.endpoints.auth.password_hasher.verify", fail_verify)
+    response = client.post(f"{settings.API_V1_STR}/auth/token", data=login_data)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert login_throttle.stats()["rejected_user"] >= 1
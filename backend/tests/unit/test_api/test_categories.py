@@ -138,6 +138,28 @@ def test_delete_category_admin(client, admin_token_headers, db):
     assert deleted_category is None
 
 
+def test_delete_category_drops_course_summaries(client, admin_token_headers, db, test_user):
+    """Test that deleting a category takes its courses out of the progress summaries."""
+    from app.models.learning import Course
+    from app.models.progress_summary import UserProgressSummary
+    from app.services.course_progress import recompute_course_progress
+
+    category = Category(name="Category with progress", description="Deleted with its courses")
+    db.add(category)
+    db.flush()
+    course = Course(title="Course in category", category_id=category.id, order=1)
+    db.add(course)
+    db.flush()
+    recompute_course_progress(db, test_user.id, course.id)
+    db.commit()
+    assert db.get(UserProgressSummary, test_user.id) is not None
+
+    response = client.delete(f"/categories/{category.id}", headers=admin_token_headers)
+    assert response.status_code == 200
+    db.expire_all()
+    assert db.get(UserProgressSummary, test_user.id) is None
+
+
 def test_delete_category_regular_user(client, normal_token_headers, test_category):
     """Test that regular users cannot delete categories."""
     response = client.delete(f"/categories/{test_category.id}", headers=normal_token_headers)
@@ -161,4 +183,27 @@ def test_get_category_courses(client, test_category, test_course):
     data = response.json()
     assert isinstance(data, list)
     assert len(data) >= 1
-    assert any(course["title"] == test_course.title for course in data) 
\ No newline at end of file
+    assert any(course["title"] == test_course.title for course in data) 
+
+def test_get_categories_fixed_query_count(client, db, normal_token_headers, test_course, assert_max_queries):
+    """Test that the catalog tree costs the same number of statements as the catalog grows."""
+    from app.models.learning import Course
+
+    # Warm up so both measurements resolve the token from the principal cache
+    client.get("/categories/", headers=normal_token_headers)
+    with assert_max_queries(6) as small:
+        response = client.get("/categories/", headers=normal_token_headers)
+    assert response.status_code == 200
+
+    for i in range(3):
+        category = Category(name=f"Query Count Category {i}", description="")
+        db.add(category)
+        db.flush()
+        for j in range(3):
+            db.add(Course(title=f"Query Count Course {i}-{j}", category_id=category.id, order=j))
+    db.commit()
+
+    with assert_max_queries(6) as large:
+        response = client.get("/categories/", headers=normal_token_headers)
+    assert response.status_code == 200
+    assert large.count == small.count
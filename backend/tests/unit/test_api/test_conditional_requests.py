@@ -0,0 +1,98 @@
+import pytest
+
+
+@pytest.mark.parametrize("path", [
+    "/courses/",
+    "/courses/{course_id}",
+    "/courses/{course_id}/units",
+    "/units/",
+    "/units/{unit_id}",
+    "/units/{unit_id}/videos",
+    "/videos/",
+    "/videos/{video_id}",
+    "/videos/{video_id}/metadata",
+    "/categories/{category_id}",
+    "/categories/{category_id}/courses",
+])
+def test_catalog_route_answers_not_modified(client, test_video, test_unit, test_course, path, assert_max_queries):
+    """Test that catalog GETs carry an ETag and answer a matching If-None-Match with 304."""
+    url = path.format(
+        course_id=test_course.id,
+        unit_id=test_unit.id,
+        video_id=test_video.id,
+        category_id=test_course.category_id,
+    )
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    with assert_max_queries(0):
+        response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_etag_differs_by_query(client, test_course):
+    """Test that differently filtered listings do not share an ETag."""
+    first = client.get("/courses/")
+    filtered = client.get(f"/courses/?category_id={test_course.category_id}")
+    assert first.headers["ETag"] != filtered.headers["ETag"]
+
+
+def test_weak_and_listed_etags_match(client, test_course):
+    """Test that W/-prefixed and comma-separated If-None-Match values are honoured."""
+    etag = client.get(f"/courses/{test_course.id}").headers["ETag"]
+    response = client.get(f"/courses/{test_course.id}", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert response.status_code == 304
+
+
+def test_etag_invalidated_by_catalog_write(client, admin_token_headers, test_unit):
+    """Test that a write to the catalog changes the ETag so clients get the new body."""
+    url = f"/units/{test_unit.id}/videos"
+    etag = client.get(url).headers["ETag"]
+
+    created = client.post(
+        "/videos/",
+        json={
+            "title": "ETag Busting Video",
+            "url": "https://example.com/etag.mp4",
+            "unit_id": test_unit.id,
+        },
+        headers=admin_token_headers,
+    )
+    assert created.status_code == 201
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert any(video["title"] == "ETag Busting Video" for video in response.json()["videos"])
+
+
+def test_categories_etag_tracks_user_progress(client, normal_token_headers, admin_token_headers, test_course):
+    """Test that the per-user category tree is revalidated on progress and catalog changes."""
+    response = client.get("/categories/", headers=normal_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get("/categories/", headers={**normal_token_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Another user's tree never matches this user's tag
+    response = client.get("/categories/", headers={**admin_token_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+
+    progress = client.get(f"/courses/{test_course.id}/progress", headers=normal_token_headers)
+    assert progress.status_code == 200
+    response = client.get("/categories/", headers={**normal_token_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    updated = client.put(
+        f"/categories/{test_course.category_id}",
+        json={"name": "Renamed For ETag"},
+        headers=admin_token_headers,
+    )
+    assert updated.status_code == 200
+    response = client.get("/categories/", headers={**normal_token_headers, "If-None-Match": etag})
+    assert response.status_code == 200
@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from fastapi.testclient import TestClient
 from app.models.learning import Course
@@ -181,4 +183,83 @@ def test_get_course_units(client, test_course, test_unit):
     data = response.json()
     assert isinstance(data, list)
     assert len(data) >= 1
-    assert any(unit["title"] == test_unit.title for unit in data) 
\ No newline at end of file
+    assert any(unit["title"] == test_unit.title for unit in data) 
+
+def test_get_course_progress_creates_entry(client, normal_token_headers, test_course, test_unit):
+    """Test that reading course progress creates an entry with the unit count."""
+    response = client.get(f"/courses/{test_course.id}/progress", headers=normal_token_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["course_id"] == test_course.id
+    assert data["total_units"] == 1
+    assert data["completed_units"] == 0
+
+
+def test_get_course_progress_nonexistent_course(client, normal_token_headers):
+    """Test reading progress for a nonexistent course."""
+    response = client.get("/courses/999999/progress", headers=normal_token_headers)
+    assert response.status_code == 404
+
+
+def test_update_course_progress_ignores_client_count(client, normal_token_headers, test_course, test_unit):
+    """Test that updating course progress recounts it server-side instead of trusting the client."""
+    client.get(f"/courses/{test_course.id}/progress", headers=normal_token_headers)
+    response = client.put(
+        f"/courses/{test_course.id}/progress",
+        params={"completed_units": 1},
+        headers=normal_token_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["completed_units"] == 0
+    assert data["progress_percentage"] == 0
+
+
+def test_course_progress_follows_completed_videos(
+    client, normal_token_headers, test_user, test_course, test_video, assert_max_queries
+):
+    """Test that watching a video through rolls up into the course and reading it is one lookup."""
+    from app.services.video_progress import progress_buffer
+    from app.services.watch_intervals import watch_tracker
+
+    client.get(f"/courses/{test_course.id}/progress", headers=normal_token_headers)
+    client.put(
+        f"/videos/{test_video.id}/progress",
+        json={"progress": 100, "last_position": 120.0},
+        headers=normal_token_headers,
+    )
+    progress_buffer.flush()
+    watch_tracker.flush()
+    # The reported progress alone does not complete the video
+    assert client.get(
+        f"/courses/{test_course.id}/progress", headers=normal_token_headers
+    ).json()["completed_units"] == 0
+
+    start = datetime.now(timezone.utc)
+    for second in range(0, 125, 5):
+        watch_tracker.heartbeat(test_user.id, test_video.id, second, at=start + timedelta(seconds=second))
+    watch_tracker.flush()
+
+    client.get(f"/courses/{test_course.id}/progress", headers=normal_token_headers)
+    with assert_max_queries(2):  # the token's user lookup and the progress row
+        response = client.get(f"/courses/{test_course.id}/progress", headers=normal_token_headers)
+    data = response.json()
+    assert data["completed_units"] == 1
+    assert data["progress_percentage"] == 100
+
+
+def test_get_courses_served_from_catalog_cache(client, admin_token_headers, test_category, assert_max_queries):
+    """Test that repeated course listings skip the database until a write bumps the version."""
+    client.get("/courses/")
+    with assert_max_queries(0):
+        response = client.get("/courses/")
+    assert response.status_code == 200
+
+    created = client.post(
+        "/courses/",
+        json={"title": "Cache Busting Course", "category_id": test_category.id},
+        headers=admin_token_headers,
+    )
+    assert created.status_code == 201
+    response = client.get("/courses/")
+    assert any(course["title"] == "Cache Busting Course" for course in response.json())
@@ -75,6 +75,47 @@ def test_update_user_me(client, normal_token_headers, db, test_user):
     assert test_user.username == "updatedusername"
 
 
+def test_async_endpoint_authenticates_on_its_own_session(client, normal_token_headers, test_user):
+    """Test that an async endpoint never opens a sync session just to authenticate."""
+    from app.core.database import get_db
+    from app.core.principal_cache import principal_cache
+    from app.main import app
+
+    def no_sync_session():
+        raise AssertionError("sync session opened by an async endpoint")
+        yield
+
+    principal_cache.clear()
+    app.dependency_overrides[get_db] = no_sync_session
+    response = client.put("/users/me", json={"full_name": "Async"}, headers=normal_token_headers)
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Async"
+
+
+def test_get_user_me_activity(client, normal_token_headers, db, test_user, test_category):
+    """Test that daily activity comes back in minutes, within the requested window."""
+    from datetime import datetime, timedelta, timezone
+    from app.models.daily_activity import DailyUserActivity
+
+    today = datetime.now(timezone.utc).date()
+    db.add_all([
+        DailyUserActivity(user_id=test_user.id, day=today, category_id=test_category.id, seconds=1800, sessions=2),
+        DailyUserActivity(user_id=test_user.id, day=today - timedelta(days=3), category_id=0, seconds=90, sessions=1),
+        DailyUserActivity(user_id=test_user.id, day=today - timedelta(days=400), category_id=0, seconds=60, sessions=1),
+    ])
+    db.commit()
+
+    response = client.get("/users/me/activity", headers=normal_token_headers)
+    assert response.status_code == 200
+    assert response.json() == [
+        {"day": str(today - timedelta(days=3)), "category_id": None, "minutes": 1.5, "sessions": 1},
+        {"day": str(today), "category_id": test_category.id, "minutes": 30.0, "sessions": 2},
+    ]
+
+    response = client.get("/users/me/activity?days=2", headers=normal_token_headers)
+    assert len(response.json()) == 1
+
+
 def test_get_user_by_id_admin(client, admin_token_headers, test_user):
     """Test retrieving a user by ID as admin."""
     response = client.get(f"/users/{test_user.id}", headers=admin_token_headers)
@@ -147,4 +188,33 @@ def test_delete_user_regular_user(client, normal_token_headers, test_admin):
     response = client.delete(f"/users/{test_admin.id}", headers=normal_token_headers)
     assert response.status_code == 403
     data = response.json()
-    assert "detail" in data 
\ No newline at end of file
+    assert "detail" in data 
+
+def test_get_users_cursor_pagination(client, admin_token_headers, test_user):
+    """Test that users can be paged by id with the X-Next-Cursor header."""
+    first = client.get("/users/?limit=1", headers=admin_token_headers)
+    assert first.status_code == 200
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/users/?limit=1&cursor={cursor}", headers=admin_token_headers)
+    assert second.status_code == 200
+    assert second.json()[0]["id"] > first.json()[0]["id"]
+
+
+def test_repeat_requests_skip_user_lookup(client, admin_token_headers, assert_max_queries):
+    """Test that a token seen before is resolved from the principal cache."""
+    assert client.get("/admin/catalog-cache", headers=admin_token_headers).status_code == 200
+    with assert_max_queries(0):
+        response = client.get("/admin/catalog-cache", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert client.get("/admin/principal-cache", headers=admin_token_headers).json()["hits"] >= 1
+
+
+def test_deactivated_user_is_not_served_from_cache(client, db, admin_token_headers, normal_token_headers, test_user):
+    """Test that updating a user drops their cached principal."""
+    assert client.get("/categories/", headers=normal_token_headers).status_code == 200
+    response = client.put(f"/users/{test_user.id}", json={"is_active": False}, headers=admin_token_headers)
+    assert response.status_code == 200
+    # The update went through the async session; reload what the shared test session holds
+    db.expire_all()
+    response = client.get("/categories/", headers=normal_token_headers)
+    assert response.status_code == 400
@@ -1,6 +1,8 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from fastapi.testclient import TestClient
-from app.models.learning import Video
+from app.models.learning import Video, VideoProgress
 
 
 def test_get_videos(client):
@@ -269,4 +271,176 @@ def test_reorder_videos_admin(client, admin_token_headers, db, test_unit):
     db.refresh(video3)
     assert video3.order == 1
     assert video1.order == 2
-    assert video2.order == 3 
\ No newline at end of file
+    assert video2.order == 3 
+
+def test_get_videos_cursor_pagination(client, db, test_unit):
+    """Test that following X-Next-Cursor walks the same rows as skip/limit, without gaps."""
+    for i in range(5):
+        # Equal order values exercise the id tie-break
+        db.add(Video(title=f"Paged Video {i}", url=f"https://example.com/{i}.mp4", unit_id=test_unit.id, order=i // 2))
+    db.commit()
+
+    expected = [video["id"] for video in client.get(f"/videos/?unit_id={test_unit.id}").json()]
+    seen = []
+    response = client.get(f"/videos/?unit_id={test_unit.id}&limit=2")
+    while True:
+        assert response.status_code == 200
+        seen.extend(video["id"] for video in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get(f"/videos/?unit_id={test_unit.id}&limit=2&cursor={cursor}")
+    assert seen == expected
+    assert len(seen) == 5
+
+    offset_page = client.get(f"/videos/?unit_id={test_unit.id}&skip=2&limit=2").json()
+    assert [video["id"] for video in offset_page] == expected[2:4]
+
+
+def test_get_videos_invalid_cursor(client):
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/videos/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_update_video_progress_is_buffered(client, db, normal_token_headers, test_user, test_video, assert_max_queries):
+    """Test that progress heartbeats return without DB writes and are readable before the flush."""
+    from app.services.video_progress import progress_buffer
+
+    # The first heartbeat for a video loads its stored watched ranges
+    client.put(
+        f"/videos/{test_video.id}/progress",
+        json={"progress": 20, "last_position": 25.0},
+        headers=normal_token_headers,
+    )
+    with assert_max_queries(1):  # the token's user lookup only
+        response = client.put(
+            f"/videos/{test_video.id}/progress",
+            json={"progress": 25, "last_position": 30.5},
+            headers=normal_token_headers,
+        )
+    assert response.status_code == 200
+    assert response.json()["last_position"] == 30.5
+
+    response = client.get(f"/videos/{test_video.id}/progress", headers=normal_token_headers)
+    assert response.json()["progress"] == 25
+
+    progress_buffer.flush()
+    db.expire_all()
+    stored = db.query(VideoProgress).filter(
+        VideoProgress.user_id == test_user.id, VideoProgress.video_id == test_video.id
+    ).one()
+    assert stored.last_position == 30.5
+
+
+def test_update_video_progress_unknown_video(client, normal_token_headers):
+    """Test that heartbeats for a missing video are rejected instead of buffered."""
+    from app.services.video_progress import progress_buffer
+
+    received = progress_buffer.stats()["received"]
+    response = client.put(
+        "/videos/999999/progress",
+        json={"progress": 20, "last_position": 25.0},
+        headers=normal_token_headers,
+    )
+    assert response.status_code == 404
+    assert progress_buffer.stats()["received"] == received
+
+
+def test_update_video_progress_out_of_range(client, normal_token_headers, test_video):
+    """Test that progress outside 0-100 or a negative position is rejected, as over the websocket."""
+    from app.services.video_progress import progress_buffer
+
+    received = progress_buffer.stats()["received"]
+    for body in ({"progress": 500, "last_position": 1.0}, {"progress": 5, "last_position": -1.0}):
+        response = client.put(f"/videos/{test_video.id}/progress", json=body, headers=normal_token_headers)
+        assert response.status_code == 422
+    assert progress_buffer.stats()["received"] == received
+
+
+def test_get_video_progress_reports_watched_time(client, normal_token_headers, test_user, test_video):
+    """Test that progress includes the seconds actually watched and completion by watched time."""
+    from app.services.watch_intervals import watch_tracker
+
+    client.put(
+        f"/videos/{test_video.id}/progress",
+        json={"progress": 0, "last_position": 0.0},
+        headers=normal_token_headers,
+    )
+    start = datetime.now(timezone.utc)
+    for second in range(0, 60, 5):
+        watch_tracker.heartbeat(test_user.id, test_video.id, second, at=start + timedelta(seconds=second))
+    response = client.get(f"/videos/{test_video.id}/progress", headers=normal_token_headers)
+    assert response.json()["watched_duration"] == 55
+    assert response.json()["completed"] is False
+
+    for second in range(60, 120, 5):
+        watch_tracker.heartbeat(test_user.id, test_video.id, second, at=start + timedelta(seconds=second))
+    response = client.get(f"/videos/{test_video.id}/progress", headers=normal_token_headers)
+    assert response.json()["watched_duration"] == 115
+    assert response.json()["completed"] is True
+
+
+def test_progress_heartbeats_feed_learning_sessions(client, db, normal_token_headers, test_user, test_video):
+    """Test that progress heartbeats are queued as study events and become a learning session on flush."""
+    from app.models.learning import LearningSession
+    from app.services.study_events import study_events
+
+    client.put(
+        f"/videos/{test_video.id}/progress",
+        json={"progress": 10, "last_position": 12.0},
+        headers=normal_token_headers,
+    )
+    assert study_events.flush() == 1
+    db.expire_all()
+    session = db.query(LearningSession).filter(LearningSession.user_id == test_user.id).one()
+    assert (session.content_type, session.content_id) == ("video", test_video.id)
+
+
+def test_update_video_progress_batch(client, normal_token_headers, test_video):
+    """Test that batched progress reports come back with a result per item."""
+    now = datetime.now(timezone.utc).isoformat()
+    response = client.put(
+        "/videos/progress:batch",
+        json=[
+            {"video_id": test_video.id, "progress": 75, "last_position": 90.0, "client_ts": now},
+            {"video_id": 999999, "progress": 10, "last_position": 1.0, "client_ts": now},
+        ],
+        headers=normal_token_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status"] for item in data] == ["applied", "not_found"]
+    assert data[0]["last_position"] == 90.0
+
+    response = client.get(f"/videos/{test_video.id}/progress", headers=normal_token_headers)
+    assert response.json()["progress"] == 75
+
+
+def test_progress_websocket(client, normal_token_headers, test_user, test_video):
+    """Test that the progress socket authenticates once and feeds the write-behind buffer."""
+    from app.services.video_progress import progress_buffer
+
+    token = normal_token_headers["Authorization"].split()[1]
+    with client.websocket_connect(f"/ws/progress?token={token}") as websocket:
+        websocket.send_text("not json")
+        assert "error" in websocket.receive_json()
+        websocket.send_json({"video_id": test_video.id, "progress": 500, "last_position": 1.0})
+        assert "error" in websocket.receive_json()
+        websocket.send_json({"video_id": test_video.id + 1000, "progress": 5, "last_position": 1.0})
+        assert websocket.receive_json() == {"error": "video not found"}
+        for position in (10.0, 11.0, 12.0):
+            websocket.send_json({"video_id": test_video.id, "progress": 5, "last_position": position})
+        # A reply to a later message means the updates before it were handled
+        websocket.send_text("not json")
+        websocket.receive_json()
+    assert progress_buffer.pending(test_user.id, test_video.id)["last_position"] == 12.0
+
+
+def test_progress_websocket_rejects_bad_token(client):
+    """Test that an invalid token closes the socket before it is accepted."""
+    from starlette.websockets import WebSocketDisconnect
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/ws/progress?token=invalid") as websocket:
+            websocket.receive_text()
@@ -0,0 +1,145 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.cache import LRUCache
+from app.core.catalog_cache import CatalogCache
+from app.core.replicas import ReplicaRouter, RoutingSession
+from app.models.catalog_version import CatalogVersion
+
+
+@pytest.fixture
+def version_sessions():
+    """Session factory over a fresh database holding just the catalog_version row."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    CatalogVersion.__table__.create(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test that the cache stays within maxsize and evicts the oldest entry."""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_lru_cache_ttl_expires_entries():
+    """Test that entries past their TTL are dropped on read."""
+    cache = LRUCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_catalog_cache_serves_from_memory_until_bumped(version_sessions):
+    """Test that loads are cached per version and a committed bump forces a reload."""
+    cache = CatalogCache(version_sessions, maxsize=10, ttl=60, check_interval=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return [len(calls)]
+
+    assert cache.get_or_load("courses", (0, 100, None), load) == [1]
+    assert cache.get_or_load("courses", (0, 100, None), load) == [1]
+    assert len(calls) == 1
+
+    with version_sessions() as db:
+        cache.bump(db)
+        # Not visible until the write commits
+        assert cache.get_or_load("courses", (0, 100, None), load) == [1]
+        db.commit()
+    assert cache.get_or_load("courses", (0, 100, None), load) == [2]
+    assert cache.stats()["version"] == 1
+
+
+def test_catalog_version_is_shared_between_workers(version_sessions):
+    """Test that a bump committed through one worker's cache reaches another's, ETags included."""
+    writer = CatalogCache(version_sessions, maxsize=10, ttl=60, check_interval=0)
+    reader = CatalogCache(version_sessions, maxsize=10, ttl=60, check_interval=0)
+    etag = reader.etag("/courses/", "", version=reader.current_version())
+    assert writer.etag("/courses/", "", version=writer.current_version()) == etag
+    assert reader.get_or_load("courses", None, lambda: "before") == "before"
+
+    with version_sessions() as db:
+        writer.bump(db)
+        db.commit()
+    assert reader.get_or_load("courses", None, lambda: "after") == "after"
+    assert (
+        reader.etag("/courses/", "", version=reader.current_version())
+        == writer.etag("/courses/", "", version=writer.current_version())
+        != etag
+    )
+
+
+def test_catalog_cache_does_not_cache_errors(version_sessions):
+    """Test that a loader raising (e.g. a 404) leaves nothing cached."""
+    cache = CatalogCache(version_sessions, maxsize=10, ttl=60, check_interval=60)
+
+    def load():
+        raise LookupError
+
+    with pytest.raises(LookupError):
+        cache.get_or_load("course_units", 1, load)
+    assert cache.stats()["size"] == 0
+
+
+def test_catalog_cache_fills_only_from_a_caught_up_replica(version_sessions, tmp_path):
+    """Test that a replica behind the current version is skipped for the fill."""
+    primary = version_sessions.kw["bind"]
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE server (name VARCHAR)"))
+            conn.execute(text("INSERT INTO server (name) VALUES (:name)"), {"name": name})
+    CatalogVersion.__table__.create(replica)
+    cache = CatalogCache(version_sessions, maxsize=10, ttl=60, check_interval=0)
+    with version_sessions() as db:
+        cache.bump(db)
+        db.commit()
+
+    def read(db):
+        return cache.get_or_load(
+            "courses", None, lambda: db.execute(text("SELECT name FROM server")).scalar_one(), db
+        )
+
+    router = ReplicaRouter([replica])
+    with RoutingSession(bind=primary, router=router) as db:
+        assert read(db) == "primary"
+
+    # Once the replica replays the bump, the next version's fill may use it
+    for engine in (replica, primary):
+        with engine.begin() as conn:
+            conn.execute(CatalogVersion.__table__.update().values(version=2))
+    with RoutingSession(bind=primary, router=router) as db:
+        assert read(db) == "replica"
+
+
+def test_catalog_cache_keys_sticky_reads_on_the_primary_version(version_sessions):
+    """Test that a client pinned after a write skips a poll that predates it."""
+    primary = version_sessions.kw["bind"]
+    cache = CatalogCache(version_sessions, maxsize=10, ttl=60, check_interval=60)
+    assert cache.get_or_load("courses", None, lambda: "before") == "before"
+    # Written through another worker, so this one's poll is still fresh
+    with primary.begin() as conn:
+        conn.execute(CatalogVersion.__table__.update().values(version=1))
+
+    with RoutingSession(bind=primary) as db:
+        assert cache.get_or_load("courses", None, lambda: "stale", db) == "before"
+    with RoutingSession(bind=primary, use_primary=True) as db:
+        assert cache.get_or_load("courses", None, lambda: "after", db) == "after"
+    assert cache.current_version() == 1
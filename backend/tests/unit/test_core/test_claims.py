@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.claims import TokenVersions, bump_token_version, revokes_tokens, user_claims
+
+
+def _versions(engine, full_refresh_every=10):
+    return TokenVersions(sessionmaker(bind=engine), refresh_interval=60, full_refresh_every=full_refresh_every)
+
+
+def test_token_is_current_until_version_bumped(db, engine, test_user):
+    """Test that a token stops validating once the user's token version is bumped."""
+    versions = _versions(engine)
+    claims = user_claims(test_user, 0)
+    assert versions.is_current(test_user.id, claims["ver"])
+
+    bump_token_version(db, test_user.id)
+    db.commit()
+    versions.refresh()
+    versions.refresh()  # incremental refresh picks up the change
+    assert not versions.is_current(test_user.id, claims["ver"])
+    assert versions.is_current(test_user.id, claims["ver"] + 1)
+
+
+def test_profile_changes_keep_tokens(db, engine, test_user):
+    """Test that updates outside the revoking fields leave tokens valid."""
+    versions = _versions(engine)
+    claims = user_claims(test_user, 0)
+    versions.refresh()
+
+    assert not revokes_tokens(test_user, {"full_name": "Renamed", "is_active": True})
+    assert revokes_tokens(test_user, {"hashed_password": "new hash"})
+    assert revokes_tokens(test_user, {"is_admin": True})
+
+    test_user.full_name = "Renamed"
+    test_user.updated_at = datetime.now() + timedelta(seconds=1)
+    db.commit()
+    versions.refresh()
+    assert versions.is_current(test_user.id, claims["ver"])
+
+
+def test_deactivated_user_is_revoked(db, engine, test_user):
+    """Test that deactivating a user revokes tokens carrying their current version."""
+    versions = _versions(engine)
+    claims = user_claims(test_user, 0)
+    versions.refresh()
+
+    test_user.is_active = False
+    db.commit()
+    versions.invalidate(test_user.id)
+    assert not versions.is_current(test_user.id, claims["ver"])
+
+
+def test_full_refresh_forgets_deleted_users(db, engine, test_user):
+    """Test that the periodic full reload drops users deleted since the last one."""
+    versions = _versions(engine, full_refresh_every=1)
+    versions.refresh()
+    user_id = test_user.id
+    assert versions.is_current(user_id, user_claims(test_user, 0)["ver"])
+
+    db.delete(test_user)
+    db.commit()
+    versions.refresh()
+    assert not versions.is_current(user_id, 0)
+
+
+def test_unknown_user_is_looked_up_once(db, engine, test_user, assert_max_queries):
+    """Test that tokens of a deleted user do not query the database on every request."""
+    versions = _versions(engine)
+    user_id = test_user.id
+    db.delete(test_user)
+    db.commit()
+
+    assert not versions.is_current(user_id, 0)
+    with assert_max_queries(0):
+        assert not versions.is_current(user_id, 0)
@@ -0,0 +1,55 @@
+import random
+
+from app.core.intervals import IntervalSet, as_packed
+
+
+def test_interval_set_merges_overlapping_and_touching_ranges():
+    """Test that added ranges merge with every range they overlap or touch."""
+    watched = IntervalSet()
+    assert watched.add(10, 20) == 10
+    assert watched.add(30, 40) == 10
+    assert watched.add(20, 25) == 5  # touches the end of [10, 20]
+    assert watched.add(35, 50) == 10  # overlaps [30, 40]
+    assert list(watched) == [(10, 25), (30, 50)]
+
+    assert watched.add(0, 60) == 25  # swallows both
+    assert list(watched) == [(0, 60)]
+    assert watched.add(5, 15) == 0
+    assert watched.add(15, 5) == 0
+    assert len(watched) == 1
+    assert watched.total == 60
+
+
+def test_interval_set_total_matches_naive_merge():
+    """Test that the maintained total equals the covered length of a sort-and-merge."""
+    rng = random.Random(7)
+    watched = IntervalSet()
+    segments = []
+    for _ in range(2000):
+        start = rng.randrange(0, 5000)
+        end = start + rng.randrange(1, 30)
+        segments.append((start, end))
+        watched.add(start, end)
+
+    merged = []
+    for start, end in sorted(segments):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    assert list(watched) == [tuple(r) for r in merged]
+    assert watched.total == sum(end - start for start, end in merged)
+
+
+def test_interval_set_pack_round_trip():
+    """Test that packing stores 8 bytes per range and reads back the same ranges."""
+    watched = IntervalSet()
+    watched.add(as_packed(0.5), as_packed(12.25))
+    watched.add(as_packed(100.1), as_packed(200.7))
+    data = watched.pack()
+    assert len(data) == 16
+
+    restored = IntervalSet.unpack(data)
+    assert list(restored) == list(watched)
+    assert restored.total == watched.total
+    assert list(IntervalSet.unpack(b"")) == []
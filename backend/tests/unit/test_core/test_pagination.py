@@ -0,0 +1,19 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes back to the sort key it was built from."""
+    cursor = encode_cursor([3, 1042])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == [3, 1042]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1]), encode_cursor({"id": 1})])
+def test_decode_cursor_rejects_bad_input(cursor):
+    """Test that malformed or mismatched cursors surface as 400s."""
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, 2)
+    assert error.value.status_code == 400
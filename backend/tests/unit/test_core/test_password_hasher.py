@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from app.core.security import PasswordHasher, PasswordHasherBusy
+
+
+def test_password_hasher_round_trip():
+    """Test that hashing and verification run on the pool and agree with each other."""
+    hasher = PasswordHasher(workers=2, max_queue=2)
+
+    async def scenario():
+        hashed = await hasher.hash("s3cret")
+        return await hasher.verify("s3cret", hashed), await hasher.verify("wrong", hashed)
+
+    assert asyncio.run(scenario()) == (True, False)
+    stats = hasher.stats()
+    assert stats["completed"] == 3
+    assert stats["in_flight"] == 0
+
+
+def test_password_hasher_rejects_beyond_queue():
+    """Test that calls beyond workers + queue fail fast instead of waiting."""
+    hasher = PasswordHasher(workers=1, max_queue=1)
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(hasher.hash("s3cret") for _ in range(4)), return_exceptions=True
+        )
+        return [isinstance(result, PasswordHasherBusy) for result in results]
+
+    rejected = asyncio.run(scenario())
+    assert rejected.count(True) == 2
+    assert hasher.stats()["rejected"] == 2
@@ -0,0 +1,32 @@
+import time
+
+from app.core.principal_cache import PrincipalCache
+
+
+def test_principal_cache_round_trip_without_select(db, test_user, assert_max_queries):
+    """Test that a cached principal is re-attached to the session without a query."""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set("token-a", test_user)
+    with assert_max_queries(0):
+        user = cache.get("token-a", db)
+        assert user.id == test_user.id
+        assert user.is_active == test_user.is_active
+    assert cache.stats()["hits"] == 1
+
+
+def test_principal_cache_respects_token_expiry(db, test_user):
+    """Test that an already expired token is never cached."""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set("expired", test_user, expires_at=time.time() - 1)
+    assert cache.get("expired", db) is None
+
+
+def test_principal_cache_invalidate_user(db, test_user):
+    """Test that invalidating a user drops every token cached for them."""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set("token-a", test_user)
+    cache.set("token-b", test_user)
+    cache.invalidate_user(test_user.id)
+    assert cache.get("token-a", db) is None
+    assert cache.get("token-b", db) is None
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.query_stats import QueryStats, capture_queries, statement_shape, track_queries
+
+
+def test_statement_shape_collapses_in_lists_and_whitespace():
+    """Test that statements differing only in IN lists share a shape."""
+    first = statement_shape("SELECT * FROM videos\n  WHERE id IN (?, ?, ?)")
+    second = statement_shape("SELECT * FROM videos WHERE id IN (?)")
+    assert first == second == "SELECT * FROM videos WHERE id IN (...)"
+
+
+def test_repeated_shapes_flag_n_plus_one():
+    """Test that identical statements above the threshold are reported."""
+    stats = QueryStats()
+    for _ in range(12):
+        stats.record("SELECT * FROM videos WHERE unit_id = ?", 0.001)
+    stats.record("SELECT * FROM units", 0.001)
+    assert stats.count == 13
+    assert stats.repeated(10) == [("SELECT * FROM videos WHERE unit_id = ?", 12)]
+    assert stats.repeated(20) == []
+
+
+def test_track_queries_counts_statements_and_time():
+    """Test that statements issued inside track_queries are counted."""
+    engine = create_engine("sqlite://")
+    with track_queries() as stats:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    assert stats.count == 2
+    assert stats.total_time > 0
+
+
+def test_capture_queries_outside_context_not_counted():
+    """Test that statements after the capture block ends are not counted."""
+    engine = create_engine("sqlite://")
+    with capture_queries() as stats:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert stats.count == 1
+
+
+def test_query_stats_headers(client):
+    """Test that responses carry the query count and DB time headers."""
+    response = client.get(f"{settings.API_V1_STR}/courses/")
+    assert "X-DB-Query-Count" in response.headers
+    assert "X-DB-Time-Ms" in response.headers
+
+
+@pytest.mark.max_queries(2)
+def test_get_course_query_budget(client, test_course):
+    """Test that reading a course stays within its query budget."""
+    response = client.get(f"{settings.API_V1_STR}/courses/{test_course.id}")
+    assert response.status_code == 200
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.rate_limit import LoginThrottle, LoginThrottled, MemoryBucketBackend
+
+
+def test_bucket_allows_burst_then_reports_retry_after():
+    """Test that a bucket serves its burst and then says how long until the next token."""
+    backend = MemoryBucketBackend(max_keys=10)
+    assert [backend.take("k", 3, 1.0) for _ in range(3)] == [0, 0, 0]
+    retry_after = backend.take("k", 3, 1.0)
+    assert 0 < retry_after <= 1.0
+
+
+def test_bucket_store_is_bounded():
+    """Test that the least recently used buckets are evicted past max_keys."""
+    backend = MemoryBucketBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        backend.take(key, 5, 1.0)
+    assert backend.stats() == {"keys": 2, "evictions": 1}
+
+
+def test_throttle_rejects_per_username_across_ips():
+    """Test that one account's budget holds no matter how many IPs try it."""
+    throttle = LoginThrottle(MemoryBucketBackend(100), 100, 60, user_burst=2, user_per_minute=1)
+    throttle.check("10.0.0.1", "Alice@example.com")
+    throttle.check("10.0.0.2", "alice@example.com ")
+    with pytest.raises(LoginThrottled):
+        throttle.check("10.0.0.3", "alice@example.com")
+    throttle.check("10.0.0.3", "bob@example.com")
+    stats = throttle.stats()
+    assert stats["allowed"] == 3
+    assert stats["rejected_user"] == 1
+
+
+def test_throttle_ip_rejection_spares_user_budget():
+    """Test that a throttled IP does not consume the targeted account's tokens."""
+    throttle = LoginThrottle(MemoryBucketBackend(100), 1, 1, user_burst=2, user_per_minute=1)
+    throttle.check("10.0.0.1", "alice@example.com")
+    for _ in range(5):
+        with pytest.raises(LoginThrottled):
+            throttle.check("10.0.0.1", "alice@example.com")
+    throttle.check("10.0.0.2", "alice@example.com")
+    assert throttle.stats()["rejected_ip"] == 5
+
+
+def test_throttle_fails_open_when_backend_is_down():
+    """Test that an unreachable shared backend lets logins through and is counted."""
+    class BrokenBackend(MemoryBucketBackend):
+        def take(self, key, capacity, refill_per_second):
+            raise ConnectionError("backend down")
+
+    throttle = LoginThrottle(BrokenBackend(10), 1, 1, 1, 1)
+    throttle.check("10.0.0.1", "alice@example.com")
+    assert throttle.stats()["backend_errors"] == 1
+
+
+def test_async_check_runs_blocking_backends_off_the_event_loop():
+    """Test that a network backend is called from a worker thread, the memory backend inline."""
+    threads = []
+
+    class NetworkBackend(MemoryBucketBackend):
+        blocking = True
+
+        def take(self, key, capacity, refill_per_second):
+            threads.append(threading.current_thread())
+            return super().take(key, capacity, refill_per_second)
+
+    async def login(throttle):
+        await throttle.acheck("10.0.0.1", "alice@example.com")
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(login(LoginThrottle(NetworkBackend(10), 5, 5, 5, 5)))
+    assert threads and loop_thread not in threads
+
+    throttle = LoginThrottle(MemoryBucketBackend(10), 1, 1, 1, 1)
+    asyncio.run(login(throttle))
+    with pytest.raises(LoginThrottled):
+        asyncio.run(login(throttle))
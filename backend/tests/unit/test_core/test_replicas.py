@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.replicas import (
+    LEAST_CONNECTIONS,
+    ReadYourWrites,
+    ReplicaRouter,
+    RoutingSession,
+)
+
+
+def make_stand_in(path, name):
+    """Create a SQLite stand-in database that reports which server it is."""
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE server (name VARCHAR)"))
+        conn.execute(text("INSERT INTO server (name) VALUES (:name)"), {"name": name})
+    return engine
+
+
+@pytest.fixture
+def primary(tmp_path):
+    return make_stand_in(tmp_path / "primary.db", "primary")
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    return [
+        make_stand_in(tmp_path / "replica_a.db", "replica_a"),
+        make_stand_in(tmp_path / "replica_b.db", "replica_b"),
+    ]
+
+
+@pytest.fixture
+def down_replica(tmp_path):
+    """A replica whose database cannot be opened, standing in for a dead server."""
+    return create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+
+
+def served_by(session_factory, **kwargs):
+    db = session_factory(**kwargs)
+    try:
+        return db.execute(text("SELECT name FROM server")).scalar_one()
+    finally:
+        db.close()
+
+
+def test_round_robin_across_replicas(primary, replicas):
+    """Test that reads alternate between replicas."""
+    factory = sessionmaker(class_=RoutingSession, bind=primary)
+    router = ReplicaRouter(replicas)
+    served = [served_by(factory, router=router) for _ in range(4)]
+    assert served == ["replica_a", "replica_b", "replica_a", "replica_b"]
+
+
+def test_least_connections_prefers_idle_replica(primary, replicas):
+    """Test that least-connections picks the replica with fewer checked-out connections."""
+    factory = sessionmaker(class_=RoutingSession, bind=primary)
+    router = ReplicaRouter(replicas, strategy=LEAST_CONNECTIONS)
+    busy = replicas[0].connect()
+    try:
+        assert served_by(factory, router=router) == "replica_b"
+    finally:
+        busy.close()
+
+
+def test_down_replica_is_skipped(primary, replicas, down_replica):
+    """Test that a replica that fails to connect is skipped and marked down."""
+    factory = sessionmaker(class_=RoutingSession, bind=primary)
+    router = ReplicaRouter([down_replica, replicas[0]], retry_after=60)
+    served = [served_by(factory, router=router) for _ in range(3)]
+    assert served == ["replica_a", "replica_a", "replica_a"]
+    assert router.candidates() == [replicas[0]]
+
+
+def test_fallback_to_primary_when_all_replicas_down(primary, down_replica):
+    """Test that reads fall back to the primary when no replica is reachable."""
+    factory = sessionmaker(class_=RoutingSession, bind=primary)
+    router = ReplicaRouter([down_replica])
+    assert served_by(factory, router=router) == "primary"
+
+
+def test_sticky_client_reads_from_primary(primary, replicas):
+    """Test that a client that just wrote is pinned to the primary."""
+    factory = sessionmaker(class_=RoutingSession, bind=primary)
+    router = ReplicaRouter(replicas)
+    read_your_writes = ReadYourWrites(window=60)
+    read_your_writes.mark_write("client-1")
+    assert served_by(
+        factory, router=router, use_primary=read_your_writes.is_sticky("client-1")
+    ) == "primary"
+    assert served_by(
+        factory, router=router, use_primary=read_your_writes.is_sticky("client-2")
+    ) in ("replica_a", "replica_b")
+
+
+def test_read_your_writes_window_expires():
+    """Test that the primary pin expires after the window."""
+    read_your_writes = ReadYourWrites(window=0.01)
+    read_your_writes.mark_write("client-1")
+    assert read_your_writes.is_sticky("client-1")
+    import time
+    time.sleep(0.02)
+    assert not read_your_writes.is_sticky("client-1")
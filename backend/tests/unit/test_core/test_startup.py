@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core.init_db import TEST_USERS, init_test_users
+from app.core.security import verify_password
+from app.core.startup import StartupTimer
+from app.models.user import User
+
+HEAVY_MODULES = ("torch", "transformers", "yt_dlp", "pytube")
+
+
+def test_startup_timer_records_phases():
+    """Test that each phase is recorded in order and counted in the total."""
+    timer = StartupTimer()
+    timer.mark("imports")
+    with timer.phase("seed_users"):
+        pass
+    timer.finish()
+    stats = timer.stats()
+    assert stats["ready"] is True
+    assert [phase["name"] for phase in stats["phases"]] == ["imports", "seed_users"]
+    assert stats["total_ms"] >= sum(phase["ms"] for phase in stats["phases"])
+
+
+def test_startup_timer_restarts_on_second_startup():
+    """Test that a second startup in the same process does not append to the first one."""
+    timer = StartupTimer()
+    timer.begin()
+    timer.mark("imports")
+    with timer.phase("create_all"):
+        pass
+    timer.finish()
+
+    timer.begin()
+    timer.mark("imports")
+    timer.finish()
+    stats = timer.stats()
+    assert [phase["name"] for phase in stats["phases"]] == ["imports"]
+    # Timed from the second begin(), not from the first run
+    assert stats["total_ms"] == pytest.approx(stats["phases"][0]["ms"])
+
+
+def test_seed_hashes_match_documented_passwords():
+    """Test that the precomputed seed hashes still match the documented passwords."""
+    passwords = {"admin@example.com": "admin123", "user@example.com": "user123"}
+    for seed in TEST_USERS:
+        assert verify_password(passwords[seed["email"]], seed["hashed_password"])
+
+
+def test_init_test_users_is_one_query_once_seeded(db, assert_max_queries):
+    """Test that seeding an already seeded database costs a single SELECT."""
+    init_test_users(db)
+    assert db.query(User).filter(User.email.in_([seed["email"] for seed in TEST_USERS])).count() == 2
+    with assert_max_queries(1):
+        init_test_users(db)
+
+
+def test_app_import_skips_heavy_modules():
+    """Test that importing the API does not pull in the ML and video download stacks."""
+    code = "import sys, app.main; print(','.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,)
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=os.environ.copy()
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
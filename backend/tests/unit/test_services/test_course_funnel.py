@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.models.learning import Course, CourseProgress, Unit, Video, VideoProgress
+from app.models.user import User
+from app.services.course_funnel import FunnelAccumulator, compute_course_funnel
+
+
+def test_compute_course_funnel(db, test_category):
+    """Test per-unit and per-video funnels, drop-off and time to complete, whatever the chunk size."""
+    course = Course(title="Funnel course", category_id=test_category.id, order=1)
+    db.add(course)
+    db.flush()
+    units = [Unit(title=f"Funnel unit {i}", course_id=course.id, order=i) for i in range(2)]
+    db.add_all(units)
+    db.flush()
+    videos = [
+        Video(title="v0", url="v0", unit_id=units[0].id, order=1),
+        Video(title="v1", url="v1", unit_id=units[0].id, order=2),
+        Video(title="v2", url="v2", unit_id=units[1].id, order=1),
+    ]
+    users = [User(username=f"funnel{i}_{course.id}", hashed_password="x", is_active=True) for i in range(4)]
+    db.add_all(videos + users)
+    db.flush()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # user -> progress per video; users 0 and 1 finish in 1h and 3h, user 2 stops after v0, user 3 barely starts
+    watched = {0: [100, 100, 100], 1: [100, 100, 95], 2: [100, 40], 3: [5]}
+    for index, progress in watched.items():
+        for position, value in enumerate(progress):
+            db.add(VideoProgress(
+                user_id=users[index].id, video_id=videos[position].id, progress=value, last_position=0,
+                completed=value >= 95,
+                created_at=start + timedelta(minutes=position),
+                updated_at=start + timedelta(hours=1 + 2 * index) if position == len(progress) - 1 else start,
+            ))
+    for index, percentage in enumerate([100, 100, 33, 0]):
+        db.add(CourseProgress(user_id=users[index].id, course_id=course.id, progress_percentage=percentage))
+    db.commit()
+
+    report = compute_course_funnel(db, course.id)
+    assert (report["learners"], report["completed"], report["video_learners"]) == (4, 2, 4)
+    assert report["progress_histogram"] == [1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 2]
+    assert [(v["started"], v["completed"], v["furthest"]) for v in report["videos"]] == [
+        (4, 3, 1), (3, 2, 0), (2, 2, 2),
+    ]
+    assert [(u["videos"], u["completed"], u["completed_through"]) for u in report["units"]] == [
+        (2, 2, 2), (1, 2, 2),
+    ]
+    assert report["drop_off_video_id"] == videos[0].id
+    assert report["median_seconds_to_complete"] == pytest.approx(2 * 3600, abs=1)
+    assert report["p90_seconds_to_complete"] == pytest.approx(2.8 * 3600, abs=1)
+
+    # Users straddling chunk boundaries are carried over whole
+    small = compute_course_funnel(db, course.id, batch_size=2)
+    assert {key: value for key, value in small.items() if key != "generated_at"} == {
+        key: value for key, value in report.items() if key != "generated_at"
+    }
+
+
+def test_funnel_accumulator_counts_units_in_order():
+    """Test that completed_through requires every earlier unit."""
+    funnel = FunnelAccumulator([10, 20, 30], [0, 1, 2], 3)
+    # user 1 completed units 1 and 3 only, user 2 all three
+    funnel.add(
+        np.array([1, 1, 2, 2, 2]), np.array([10, 30, 10, 20, 30]), np.array([100.0, 100, 100, 100, 100]),
+        np.ones(5, dtype=bool), np.zeros(5), np.ones(5),
+    )
+    assert funnel.units_completed.tolist() == [2, 1, 2]
+    assert funnel.units_completed_through.tolist() == [2, 1, 1]
+    assert funnel.furthest.tolist() == [0, 0, 0, 2]
+    assert funnel.durations().tolist() == [1.0]
+
+
+def test_funnel_accumulator_never_completes_empty_units():
+    """Test that an empty unit counts as completed by nobody, like unit_completions."""
+    funnel = FunnelAccumulator([10, 30], [0, 2], 3)
+    funnel.add(
+        np.array([1, 1, 2]), np.array([10, 30, 10]), np.array([100.0, 100, 100]),
+        np.ones(3, dtype=bool), np.zeros(3), np.ones(3),
+    )
+    assert funnel.unit_sizes.tolist() == [1, 0, 1]
+    assert funnel.units_completed.tolist() == [2, 0, 1]
+    assert funnel.units_completed_through.tolist() == [2, 0, 0]
+    # User 1 still finished every video of the course
+    assert funnel.durations().tolist() == [1.0]
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.learning import CourseProgress, Unit, Video, VideoProgress
+from app.services.course_progress import (
+    adjust_course_progress, recompute_course_progress, track_unit_completions,
+)
+from app.services.video_progress import upsert_video_progress, upsert_watch_progress
+
+
+@pytest.fixture
+def course_tree(db, test_course):
+    """Two units of one video each under test_course."""
+    units = [Unit(title=f"Rollup Unit {i}", course_id=test_course.id, order=i) for i in range(2)]
+    db.add_all(units)
+    db.flush()
+    videos = [
+        Video(title=f"Rollup Video {i}", url="https://example.com/v.mp4", unit_id=unit.id, order=1)
+        for i, unit in enumerate(units)
+    ]
+    db.add_all(videos)
+    db.commit()
+    return test_course, units, videos
+
+
+def _watch(db, user_id, video, progress, seconds_ago=0):
+    upsert_video_progress(db, [{
+        "user_id": user_id,
+        "video_id": video.id,
+        "progress": progress,
+        "last_position": 1.0,
+        "updated_at": datetime.now(timezone.utc) - timedelta(seconds=seconds_ago),
+    }])
+    db.commit()
+
+
+def _finish(db, user_id, video, completed=True):
+    upsert_watch_progress(db, [{
+        "user_id": user_id, "video_id": video.id, "watched_duration": 120, "completed": completed,
+    }])
+    db.commit()
+
+
+def _rollup(db, user_id, course_id):
+    db.expire_all()
+    return db.query(CourseProgress).filter(
+        CourseProgress.user_id == user_id, CourseProgress.course_id == course_id
+    ).one()
+
+
+def test_completing_videos_updates_rollup(db, test_user, course_tree):
+    """Test that the stored completed flag, not the reported progress, moves the course rollup both ways."""
+    course, units, videos = course_tree
+    user_id = test_user.id
+    # Reported progress alone never completes a video
+    _watch(db, user_id, videos[0], 100, seconds_ago=10)
+    assert db.query(CourseProgress).filter(CourseProgress.user_id == user_id).count() == 0
+
+    _finish(db, user_id, videos[0])
+    rollup = _rollup(db, user_id, course.id)
+    assert (rollup.completed_units, rollup.total_units, rollup.progress_percentage) == (1, 2, 50)
+    stored = db.query(VideoProgress).filter(
+        VideoProgress.user_id == user_id, VideoProgress.video_id == videos[0].id
+    ).one()
+    assert (stored.progress, stored.watched_duration, stored.completed) == (100, 120, True)
+
+    # Completion may be stored before the first progress report, which still applies
+    _finish(db, user_id, videos[1])
+    _watch(db, user_id, videos[1], 10)
+    assert _rollup(db, user_id, course.id).progress_percentage == 100
+    db.expire_all()
+    stored = db.query(VideoProgress).filter(
+        VideoProgress.user_id == user_id, VideoProgress.video_id == videos[1].id
+    ).one()
+    assert (stored.progress, stored.completed) == (10, True)
+
+    _finish(db, user_id, videos[1], completed=False)
+    assert _rollup(db, user_id, course.id).completed_units == 1
+
+
+def test_catalog_edits_adjust_rollup(db, test_user, course_tree):
+    """Test that adding and removing videos and units keeps the rollup equal to a recount."""
+    course, units, videos = course_tree
+    user_id = test_user.id
+    _finish(db, user_id, videos[0])
+
+    extra = Video(title="Rollup Extra", url="https://example.com/e.mp4", unit_id=units[0].id, order=2)
+    with track_unit_completions(db, [units[0].id]):
+        db.add(extra)
+    db.commit()
+    assert _rollup(db, user_id, course.id).completed_units == 0
+
+    with track_unit_completions(db, [units[0].id]):
+        db.delete(extra)
+    db.commit()
+    assert _rollup(db, user_id, course.id).completed_units == 1
+
+    db.add(Unit(title="Rollup Unit new", course_id=course.id, order=3))
+    db.flush()
+    adjust_course_progress(db, course.id, {}, total_delta=1)
+    db.commit()
+    rollup = _rollup(db, user_id, course.id)
+    assert (rollup.completed_units, rollup.total_units) == (1, 3)
+
+    with track_unit_completions(db, [units[0].id]):
+        db.delete(videos[0])
+        db.delete(units[0])
+    db.commit()
+    rollup = _rollup(db, user_id, course.id)
+    incremental = (rollup.completed_units, rollup.total_units, rollup.progress_percentage)
+    assert incremental == (0, 2, 0)
+
+    recounted = recompute_course_progress(db, user_id, course.id)
+    assert (recounted.completed_units, recounted.total_units, recounted.progress_percentage) == incremental
@@ -0,0 +1,66 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.daily_activity import DailyUserActivity
+from app.models.learning import LearningSession
+from app.services.daily_activity import rebuild_daily_activity, record_completed_sessions, split_by_day
+from app.services.study_events import StudyEventQueue
+
+
+def _rollup(db, user_id):
+    db.expire_all()
+    return {
+        (row.day, row.category_id): (row.seconds, row.sessions)
+        for row in db.query(DailyUserActivity).filter(DailyUserActivity.user_id == user_id)
+    }
+
+
+def test_split_by_day_cuts_at_utc_midnight():
+    """Test that a session over midnight is split between the two days."""
+    start = datetime(2026, 3, 1, 23, 50, tzinfo=timezone.utc)
+    assert list(split_by_day(start, start + timedelta(minutes=20))) == [
+        (date(2026, 3, 1), 600), (date(2026, 3, 2), 600),
+    ]
+    assert list(split_by_day(start, start)) == []
+
+
+def test_completed_sessions_roll_up_by_category(engine, db, test_user, test_video, test_category):
+    """Test that sessions are added to the rollup when they complete, and not while active."""
+    queue = StudyEventQueue(
+        sessionmaker(bind=engine), flush_interval=60, max_pending=100, min_interval=15, session_gap=1800,
+    )
+    start = datetime.now(timezone.utc) - timedelta(minutes=10)
+    queue.record(test_user.id, "video_progress", "video", test_video.id, at=start)
+    queue.record(test_user.id, "video_progress", "video", test_video.id, at=start + timedelta(minutes=5))
+    queue.flush()
+    assert _rollup(db, test_user.id) == {}
+
+    # A late event from two hours earlier is a completed session right away
+    late = start - timedelta(hours=2)
+    queue.record(test_user.id, "video_progress", "video", test_video.id, at=late)
+    queue.record(test_user.id, "video_progress", "video", test_video.id, at=late + timedelta(minutes=2))
+    queue.flush()
+    assert _rollup(db, test_user.id) == {(late.date(), test_category.id): (120, 1)}
+
+
+def test_rebuild_matches_incremental_rollup(engine, db, test_user, test_video, test_category):
+    """Test that the chunked backfill recomputes the same totals from completed sessions."""
+    day = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+    sessions = [
+        LearningSession(user_id=test_user.id, content_type="video", content_id=test_video.id,
+                        start_time=day + timedelta(hours=h), end_time=day + timedelta(hours=h, minutes=30),
+                        duration=1800, status="completed")
+        for h in range(3)
+    ] + [LearningSession(user_id=test_user.id, content_type="quiz", content_id=999999,
+                         start_time=day, end_time=day + timedelta(minutes=1), duration=60, status="completed")]
+    db.add_all(sessions)
+    db.flush()
+    record_completed_sessions(db, sessions)
+    db.commit()
+    incremental = _rollup(db, test_user.id)
+    assert incremental == {(day.date(), test_category.id): (5400, 3), (day.date(), 0): (60, 1)}
+
+    progress = list(rebuild_daily_activity(sessionmaker(bind=engine), batch=2, user_id=test_user.id))
+    assert [processed for processed, _ in progress] == [2, 4]
+    assert _rollup(db, test_user.id) == incremental
@@ -0,0 +1,40 @@
+from app.services.progress_channel import ProgressChannel, parse_update
+from app.services.video_progress import progress_buffer
+
+
+def test_only_meaningful_updates_are_persisted(test_user, test_video):
+    """Test that small moves stay in memory and the latest one is persisted on close."""
+    channel = ProgressChannel(min_delta=5, persist_interval=60)
+    connection = channel.connect(test_user.id)
+    assert connection.update(test_video.id, 10, 60.0)
+    assert not connection.update(test_video.id, 11, 66.0)
+    assert not connection.update(test_video.id, 12, 72.0)
+    assert connection.update(test_video.id, 16, 96.0)
+    assert not connection.update(test_video.id, 17, 102.0)
+    assert progress_buffer.pending(test_user.id, test_video.id)["last_position"] == 96.0
+
+    connection.close()
+    assert progress_buffer.pending(test_user.id, test_video.id)["last_position"] == 102.0
+    stats = channel.stats()
+    assert stats["connections"] == 0
+    assert stats["messages"] == 5
+    assert stats["persisted"] == 3
+    assert stats["skipped"] == 3
+
+
+def test_parse_update_rejects_malformed_messages():
+    """Test that only complete numeric updates are accepted."""
+    assert parse_update({"video_id": "3", "progress": 1, "last_position": 2.5}) == (3, 1.0, 2.5)
+    assert parse_update({"video_id": 3, "progress": "x", "last_position": 2.5}) is None
+    assert parse_update({"video_id": 3}) is None
+    assert parse_update([3, 1, 2]) is None
+
+
+def test_parse_update_rejects_out_of_range_values():
+    """Test that progress outside 0-100 and negative or non-finite positions are refused."""
+    assert parse_update({"video_id": 3, "progress": 100, "last_position": 0}) == (3, 100.0, 0.0)
+    assert parse_update({"video_id": 3, "progress": 101, "last_position": 2.5}) is None
+    assert parse_update({"video_id": 3, "progress": -1, "last_position": 2.5}) is None
+    assert parse_update({"video_id": 3, "progress": float("nan"), "last_position": 2.5}) is None
+    assert parse_update({"video_id": 3, "progress": 5, "last_position": -1}) is None
+    assert parse_update({"video_id": 3, "progress": 5, "last_position": float("inf")}) is None
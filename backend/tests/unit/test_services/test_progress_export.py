@@ -0,0 +1,37 @@
+import csv
+import io
+import json
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models.learning import VideoProgress
+from app.models.user import User
+from app.services.progress_export import stream_export
+
+
+def test_stream_export_fetches_in_batches(db, engine, test_unit, test_video):
+    """Test that an export is encoded one fetched batch per chunk, in id order."""
+    users = [User(username=f"export{i}_{test_video.id}", hashed_password="x", is_active=True) for i in range(250)]
+    db.add_all(users)
+    db.flush()
+    db.execute(insert(VideoProgress), [
+        {"user_id": user.id, "video_id": test_video.id, "progress": i, "last_position": i * 2.0}
+        for i, user in enumerate(users)
+    ])
+    db.commit()
+    session_factory = sessionmaker(bind=engine)
+
+    chunks = list(stream_export(session_factory, "video_progress", batch_size=100, course_id=test_unit.course_id))
+    assert len(chunks) == 3
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["user_id"] for row in rows] == [user.id for user in users]
+    assert rows[1]["progress"] == 1 and rows[1]["last_position"] == 2.0
+    assert rows[0]["course_id"] == test_unit.course_id
+    assert rows[0]["updated_at"] is not None
+
+    chunks = list(stream_export(session_factory, "video_progress", "csv", batch_size=100, user_id=users[7].id))
+    assert len(chunks) == 2  # header, then the single batch
+    header, row = csv.reader(io.StringIO("".join(chunks)))
+    assert header == ["id", "user_id", "video_id", "course_id", "progress", "last_position", "updated_at"]
+    assert row[1:3] == [str(users[7].id), str(test_video.id)]
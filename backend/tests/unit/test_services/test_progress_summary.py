@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.learning import Course, CourseProgress, Unit
+from app.models.progress_summary import CourseProgressSummary, UserProgressSummary
+from app.models.user import User
+from app.services.course_progress import adjust_course_progress, recompute_course_progress, record_course_access
+from app.services.progress_summary import forget_course_progress, rebuild_progress_summaries, user_progress_page
+
+
+def _user_summary(db, user_id):
+    db.expire_all()
+    return db.get(UserProgressSummary, user_id)
+
+
+def _summaries(db, user_ids, course_ids):
+    db.expire_all()
+    return (
+        [
+            (row.courses_started, row.courses_completed, row.progress_total, row.avg_progress, row.last_accessed)
+            for row in (db.get(UserProgressSummary, user_id) for user_id in user_ids)
+        ],
+        [
+            (row.learners, row.completed_learners, row.progress_total, row.avg_progress, row.last_accessed)
+            for row in (db.get(CourseProgressSummary, course_id) for course_id in course_ids)
+        ],
+    )
+
+
+def test_summaries_follow_course_progress(db, test_user, test_admin, test_course, test_unit, test_video):
+    """Test that per-user and per-course summaries move with course progress in the same transaction."""
+    recompute_course_progress(db, test_user.id, test_course.id)
+    recompute_course_progress(db, test_admin.id, test_course.id)
+    db.flush()
+
+    summary = _user_summary(db, test_user.id)
+    assert (summary.courses_started, summary.courses_completed, summary.avg_progress) == (1, 0, 0)
+    assert summary.last_accessed is not None
+    assert db.get(CourseProgressSummary, test_course.id).learners == 2
+
+    adjust_course_progress(db, test_course.id, {test_user.id: 1})
+    db.flush()
+    summary = _user_summary(db, test_user.id)
+    assert (summary.courses_completed, summary.avg_progress) == (1, 100)
+    course = db.get(CourseProgressSummary, test_course.id)
+    assert (course.completed_learners, course.avg_progress) == (1, 50)
+
+    # A unit added to the course moves every learner of it
+    db.add(Unit(title="Another unit", course_id=test_course.id, order=2))
+    adjust_course_progress(db, test_course.id, {}, total_delta=1)
+    db.flush()
+    assert _user_summary(db, test_user.id).avg_progress == 50
+    assert _user_summary(db, test_admin.id).avg_progress == 0
+    course = db.get(CourseProgressSummary, test_course.id)
+    assert (course.completed_learners, course.avg_progress) == (0, 25)
+
+    # Nothing survives a rollback
+    db.rollback()
+    assert _user_summary(db, test_user.id) is None
+
+
+def test_deltas_match_rebuild(db, engine, test_user, test_admin, test_course, test_unit, test_video):
+    """Test that the summaries kept by deltas equal a full recompute."""
+    recompute_course_progress(db, test_user.id, test_course.id)
+    recompute_course_progress(db, test_admin.id, test_course.id)
+    db.flush()
+    adjust_course_progress(db, test_course.id, {test_user.id: 1})
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    record_course_access(db, [(test_admin.id, "video", test_video.id, later)])
+    db.commit()
+
+    incremental = _summaries(db, [test_user.id, test_admin.id], [test_course.id])
+    assert incremental[1][0][4].replace(tzinfo=None) == later.replace(tzinfo=None)
+    for _ in rebuild_progress_summaries(sessionmaker(bind=engine)):
+        pass
+    assert _summaries(db, [test_user.id, test_admin.id], [test_course.id]) == incremental
+
+
+def test_summaries_are_dropped_with_the_last_progress_row(db, test_user, test_category):
+    """Test that deleting a course removes it from the summaries of its learners."""
+    course = Course(title="Short lived", category_id=test_category.id, order=9)
+    db.add(course)
+    db.flush()
+    recompute_course_progress(db, test_user.id, course.id)
+    db.commit()
+    assert _user_summary(db, test_user.id) is not None
+
+    forget_course_progress(db, course.id)
+    db.query(CourseProgress).filter(CourseProgress.course_id == course.id).delete()
+    db.delete(course)
+    db.commit()
+    assert _user_summary(db, test_user.id) is None
+    assert db.get(CourseProgressSummary, course.id) is None
+
+
+def test_username_search_is_a_literal_prefix(db, test_course):
+    """Test that % and _ in a search match themselves, case-insensitively."""
+    users = [User(username=name, hashed_password="x", is_active=True) for name in ("Lit_eral", "litxeral")]
+    db.add_all(users)
+    db.flush()
+    for user in users:
+        recompute_course_progress(db, user.id, test_course.id)
+    db.commit()
+
+    rows, _ = user_progress_page(db, search="lit_")
+    assert [row["username"] for row in rows] == ["Lit_eral"]
+    assert user_progress_page(db, search="%eral")[0] == []
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.quiz import Quiz
+from app.services.quiz_grading import AnswerKeyCache, compile_answer_key, grade, grade_questions, score
+
+QUESTIONS = [
+    {"id": 1, "question_type": "multiple_choice", "choices": [
+        {"id": 10, "is_correct": False}, {"id": 11, "is_correct": True},
+    ]},
+    {"id": 2, "question_type": "multiple_choice", "choices": [{"id": 20, "is_correct": False}]},
+    {"id": 3, "question_type": "short_answer"},
+    {"id": 4, "question_type": "short_answer"},
+]
+
+
+def test_grade_with_compiled_answer_key():
+    """Test that compiled keys grade like walking the questions did."""
+    key = compile_answer_key(QUESTIONS)
+    assert key.total == 4
+    assert key.choices == {"1": 11}
+    assert key.short_answers == {"3", "4"}
+    assert key.questions == ("1", "2", "3", "4")
+
+    assert grade(key, {"1": 11, "2": 20, "3": "an answer", "4": "   "}) == 50
+    assert grade(key, {"1": 10}) == 0
+    assert grade(key, {"1": 11, "3": "x", "4": "y"}) == 75
+    assert grade(compile_answer_key([]), {"1": 11}) == 0
+
+    graded = grade_questions(key, {"1": 11, "2": 20, "3": "an answer", "4": "   "})
+    assert graded == [("1", 11, True), ("2", 20, False), ("3", "an answer", True), ("4", "   ", False)]
+    assert score(graded) == 50
+    assert grade_questions(key, {"3": "x"})[0] == ("1", None, False)
+
+    # Non-text short answers (and null) are wrong rather than an error
+    odd = {"1": 11, "3": 42, "4": None}
+    assert grade(key, odd) == 25
+    assert score(grade_questions(key, odd)) == 25
+
+
+def test_answer_key_cache_follows_quiz_updates():
+    """Test that a cached key is reused until the quiz's updated_at changes."""
+    cache = AnswerKeyCache(10)
+    updated_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    quiz = Quiz(id=1, title="Quiz", questions=QUESTIONS, updated_at=updated_at)
+    key = cache.get(quiz)
+    assert cache.get(Quiz(id=1, title="Quiz", questions=None, updated_at=updated_at)) is key
+
+    edited = [dict(QUESTIONS[0], choices=[{"id": 10, "is_correct": True}])]
+    quiz = Quiz(id=1, title="Quiz", questions=edited, updated_at=updated_at + timedelta(seconds=1))
+    recompiled = cache.get(quiz)
+    assert recompiled.choices == {"1": 10}
+    assert cache.get(quiz) is recompiled
+
+    cache.invalidate(1)
+    assert cache.get(quiz) is not recompiled
@@ -0,0 +1,45 @@
+from sqlalchemy import select
+
+from app.models.quiz import Quiz, QuizAttempt, QuizQuestion, QuizQuestionResponse
+from app.services.quiz_grading import compile_answer_key, grade_questions
+from app.services.quiz_responses import question_stats, record_quiz_responses
+
+QUESTIONS = [
+    {"id": 901, "question_type": "multiple_choice", "choices": [
+        {"id": 1, "is_correct": True}, {"id": 2, "is_correct": False},
+    ]},
+    {"id": 902, "question_type": "short_answer"},
+    {"id": "intro", "question_type": "short_answer"},
+]
+
+
+def test_record_quiz_responses_counts_per_question(db, test_user, test_video):
+    """Test that graded answers are stored per question and added to the question counters."""
+    quiz = Quiz(title="Item stats", video_id=test_video.id, questions=QUESTIONS)
+    db.add(quiz)
+    db.flush()
+    # Only 901 is also a quiz_questions row; the other ids exist in the JSON alone
+    db.add(QuizQuestion(id=901, quiz_id=quiz.id, question_text="Pick one"))
+    db.flush()
+    key = compile_answer_key(QUESTIONS)
+    attempt_ids = []
+    for responses in ({"901": 1, "902": "yes"}, {"901": 2}, {"901": 1, "902": " "}):
+        attempt = QuizAttempt(user_id=test_user.id, quiz_id=quiz.id, responses=responses, score=0)
+        db.add(attempt)
+        db.flush()
+        record_quiz_responses(db, attempt.id, quiz.id, grade_questions(key, responses))
+        attempt_ids.append(attempt.id)
+    db.commit()
+
+    rows = db.execute(
+        select(QuizQuestionResponse.question_id, QuizQuestionResponse.user_answer, QuizQuestionResponse.is_correct)
+        .where(QuizQuestionResponse.attempt_id == attempt_ids[1])
+        .order_by(QuizQuestionResponse.question_id)
+    ).all()
+    assert [tuple(row) for row in rows] == [(901, "2", False)]
+
+    assert question_stats(db, quiz.id) == [
+        {"question_id": "901", "attempts": 3, "correct": 2, "correct_rate": 2 / 3},
+        {"question_id": "902", "attempts": 3, "correct": 1, "correct_rate": 1 / 3},
+        {"question_id": "intro", "attempts": 3, "correct": 0, "correct_rate": 0.0},
+    ]
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.learning import LearningSession
+from app.models.study_event import StudyEvent
+from app.services.study_events import SESSION_ACTIVE, SESSION_COMPLETED, StudyEventQueue, idle_sessions_query
+
+
+@pytest.fixture
+def queue(engine):
+    """A study event queue that flushes into the test database."""
+    return StudyEventQueue(
+        sessionmaker(bind=engine), flush_interval=60, max_pending=100,
+        min_interval=15, session_gap=1800,
+    )
+
+
+def _sessions(db, user_id):
+    db.expire_all()
+    return db.query(LearningSession).filter(
+        LearningSession.user_id == user_id
+    ).order_by(LearningSession.start_time).all()
+
+
+def test_repeated_events_are_dropped_within_min_interval(queue, db, test_user, test_video):
+    """Test that heartbeats closer than min_interval are recorded once, but other content is not affected."""
+    start = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert queue.record(test_user.id, "video_progress", "video", test_video.id, at=start)
+    assert not queue.record(test_user.id, "video_progress", "video", test_video.id, at=start + timedelta(seconds=5))
+    assert queue.record(test_user.id, "quiz_attempt", "quiz", 1, at=start + timedelta(seconds=5))
+    assert queue.record(test_user.id, "video_progress", "video", test_video.id, at=start + timedelta(seconds=20))
+
+    assert queue.flush() == 3
+    db.expire_all()
+    assert db.query(StudyEvent).filter(StudyEvent.user_id == test_user.id).count() == 3
+
+
+def test_flush_derives_sessions_from_gaps(queue, db, test_user, test_video):
+    """Test that events split into sessions at gaps and later flushes extend the open session."""
+    now = datetime.now(timezone.utc)
+    for minutes in (20, 15, 10):
+        queue.record(test_user.id, "video_progress", "video", test_video.id, at=now - timedelta(minutes=minutes))
+    queue.flush()
+    (session,) = _sessions(db, test_user.id)
+    assert (session.status, session.duration) == (SESSION_ACTIVE, 600)
+    assert session.content_type == "video" and session.content_id == test_video.id
+
+    # Within the gap of the open session: extends it, in a later flush
+    queue.record(test_user.id, "video_progress", "video", test_video.id, at=now - timedelta(minutes=5))
+    queue.flush()
+    (session,) = _sessions(db, test_user.id)
+    assert session.duration == 900
+
+    # A late event from an hour before: a session of its own, already completed
+    queue.record(test_user.id, "video_progress", "video", test_video.id, at=now - timedelta(minutes=80))
+    queue.flush()
+    late, current = _sessions(db, test_user.id)
+    assert (late.status, late.duration) == (SESSION_COMPLETED, 0)
+    assert (current.id, current.status, current.duration) == (session.id, SESSION_ACTIVE, 900)
+
+
+def test_idle_sessions_are_closed(queue, db, test_user, test_video):
+    """Test that a session whose last event is older than the gap is completed on the next flush."""
+    queue.record(test_user.id, "video_progress", "video", test_video.id,
+                 at=datetime.now(timezone.utc) - timedelta(hours=1))
+    queue.flush()
+    (session,) = _sessions(db, test_user.id)
+    assert session.status == SESSION_COMPLETED
+
+
+def test_empty_flush_closes_idle_sessions(queue, db, test_user, test_video):
+    """Test that the flush timer closes idle sessions even when no events are queued."""
+    now = datetime.now(timezone.utc)
+    db.add(LearningSession(
+        user_id=test_user.id, content_type="video", content_id=test_video.id, status=SESSION_ACTIVE,
+        start_time=now - timedelta(hours=2), end_time=now - timedelta(hours=1), duration=3600,
+    ))
+    db.commit()
+    assert queue.flush() == 0
+    (session,) = _sessions(db, test_user.id)
+    assert session.status == SESSION_COMPLETED
+
+
+def test_idle_session_lookup_uses_the_active_sessions_index(db):
+    """Test that closing idle sessions reads the partial index instead of scanning all sessions."""
+    query = idle_sessions_query(datetime.now(timezone.utc)).compile(
+        db.get_bind(), compile_kwargs={"literal_binds": True}
+    )
+    plan = " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+    assert "ix_learning_sessions_active_end_time" in plan
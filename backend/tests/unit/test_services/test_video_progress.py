@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.learning import VideoProgress
+from app.schemas.learning import VideoProgressBatchItem
+from app.services.video_progress import ProgressBuffer, apply_progress_batch
+
+
+@pytest.fixture
+def buffer(engine):
+    """A progress buffer that flushes into the test database."""
+    return ProgressBuffer(sessionmaker(bind=engine), flush_interval=60, max_pending=100)
+
+
+def _stored(db, user_id, video_id):
+    db.expire_all()
+    return db.query(VideoProgress).filter(
+        VideoProgress.user_id == user_id, VideoProgress.video_id == video_id
+    ).first()
+
+
+def test_heartbeats_coalesce_to_latest(buffer, db, test_user, test_video):
+    """Test that many heartbeats for one video become a single upserted row."""
+    for second in range(10):
+        buffer.record(test_user.id, test_video.id, second * 10, float(second))
+    assert buffer.pending(test_user.id, test_video.id)["last_position"] == 9.0
+
+    assert buffer.flush() == 1
+    stats = buffer.stats()
+    assert stats["received"] == 10
+    assert stats["coalesced"] == 9
+    assert stats["last_flush_size"] == 1
+    assert stats["pending"] == 0
+    assert buffer.pending(test_user.id, test_video.id) is None
+
+    stored = _stored(db, test_user.id, test_video.id)
+    assert stored.progress == 90
+    assert stored.last_position == 9.0
+
+
+def test_older_heartbeat_never_overwrites_newer(buffer, db, test_user, test_video):
+    """Test that out-of-order writes keep the newest progress, in memory and in the database."""
+    now = datetime.now(timezone.utc)
+    buffer.record(test_user.id, test_video.id, 50, 30.0, updated_at=now)
+    buffer.record(test_user.id, test_video.id, 10, 5.0, updated_at=now - timedelta(seconds=5))
+    assert buffer.pending(test_user.id, test_video.id)["progress"] == 50
+    buffer.flush()
+
+    # A replayed, older batch arriving after the flush is ignored by the upsert
+    buffer.record(test_user.id, test_video.id, 10, 5.0, updated_at=now - timedelta(seconds=5))
+    buffer.flush()
+    assert _stored(db, test_user.id, test_video.id).progress == 50
+
+
+def test_full_buffer_wakes_flush_loop_instead_of_flushing_inline(engine, db, test_user, test_video):
+    """Test that add() on a full buffer leaves the write to the running flush loop."""
+    buffer = ProgressBuffer(sessionmaker(bind=engine), flush_interval=60, max_pending=1)
+
+    async def scenario():
+        buffer.start()
+        buffer.record(test_user.id, test_video.id, 40, 4.0)
+        flushed_inline = buffer.stats()["flushes"]
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if buffer.stats()["flushes"]:
+                break
+        await buffer.stop()
+        return flushed_inline
+
+    assert asyncio.run(scenario()) == 0
+    assert buffer.stats()["flushes"] == 1
+    assert _stored(db, test_user.id, test_video.id).progress == 40
+
+
+def test_failed_flush_keeps_rows_for_retry(engine, db, test_user, test_video):
+    """Test that a flush that fails puts its rows back instead of losing them."""
+    class FlakyBuffer(ProgressBuffer):
+        fail = True
+
+        def write(self, db, rows):
+            if self.fail:
+                raise RuntimeError("database unavailable")
+            super().write(db, rows)
+
+    buffer = FlakyBuffer(sessionmaker(bind=engine), flush_interval=60, max_pending=100)
+    buffer.record(test_user.id, test_video.id, 40, 12.0)
+    assert buffer.flush() == 0
+    assert buffer.stats()["failures"] == 1
+    assert buffer.pending(test_user.id, test_video.id)["progress"] == 40
+
+    buffer.fail = False
+    assert buffer.flush() == 1
+    assert _stored(db, test_user.id, test_video.id).progress == 40
+
+
+def test_failed_flushes_bound_retries_and_backlog(engine, db, test_user, test_video):
+    """Test that rows are given up after max_retries and the backlog drops its oldest keys."""
+    class DownBuffer(ProgressBuffer):
+        def write(self, db, rows):
+            raise RuntimeError("database unavailable")
+
+    buffer = DownBuffer(
+        sessionmaker(bind=engine), flush_interval=60, max_pending=100, max_retries=2, max_backlog=2
+    )
+    buffer.record(test_user.id, test_video.id, 40, 12.0)
+    buffer.flush()
+    buffer.record(test_user.id, test_video.id + 1, 10, 1.0)
+    buffer.record(test_user.id, test_video.id + 2, 20, 2.0)
+    stats = buffer.stats()
+    assert (stats["pending"], stats["overflowed"]) == (2, 1)
+    assert buffer.pending(test_user.id, test_video.id) is None
+
+    for _ in range(3):
+        buffer.flush()
+    stats = buffer.stats()
+    assert (stats["pending"], stats["abandoned"], stats["failures"]) == (0, 2, 4)
+
+
+def test_progress_batch_keeps_newest_report_per_video(db, test_user, test_video, assert_max_queries):
+    """Test that a batch is one bulk write and only the newest report per video wins."""
+    now = datetime.now(timezone.utc)
+    user_id = test_user.id
+    items = [
+        VideoProgressBatchItem(video_id=test_video.id, progress=60, last_position=40.0, client_ts=now),
+        VideoProgressBatchItem(
+            video_id=test_video.id, progress=20, last_position=10.0, client_ts=now - timedelta(minutes=1)
+        ),
+        VideoProgressBatchItem(video_id=999999, progress=5, last_position=1.0, client_ts=now),
+    ]
+    with assert_max_queries(4):  # video check, completion pre-read, upsert, read back
+        results = apply_progress_batch(db, user_id, items)
+    assert [result["status"] for result in results] == ["applied", "stale", "not_found"]
+    assert results[1]["progress"] == 60
+    assert _stored(db, user_id, test_video.id).last_position == 40.0
+
+    # An offline client replaying older progress does not move it back
+    results = apply_progress_batch(db, user_id, items[1:2])
+    assert results[0]["status"] == "stale"
+    assert results[0]["progress"] == 60
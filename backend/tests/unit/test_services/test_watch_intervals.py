@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.intervals import IntervalSet
+from app.models.learning import VideoProgress
+from app.models.watch_interval import VideoWatchIntervals
+from app.services.watch_intervals import WatchTracker
+
+
+@pytest.fixture
+def tracker(engine):
+    """A watch tracker that flushes into the test database."""
+    return WatchTracker(
+        sessionmaker(bind=engine), flush_interval=60, max_pending=100,
+        max_entries=100, max_rate=2.0, max_gap=60, state_ttl=60,
+    )
+
+
+def _play(tracker, user_id, video_id, start, positions):
+    for second, position in enumerate(positions):
+        tracker.heartbeat(user_id, video_id, position, at=start + timedelta(seconds=second * 5))
+
+
+def test_seeks_and_pauses_are_not_counted(tracker, test_user, test_video):
+    """Test that only forward playback between close heartbeats is counted as watched."""
+    start = datetime.now(timezone.utc)
+    # 0 -> 20 played, seek to 300, play to 310, seek back to 10 and play to 15
+    _play(tracker, test_user.id, test_video.id, start, [0, 5, 10, 15, 20, 300, 305, 310, 10, 15])
+    state = tracker.heartbeat(test_user.id, test_video.id, 15, at=start + timedelta(minutes=10))
+    assert list(state.intervals) == [(0, 20), (300, 310)]
+    assert state.intervals.total == 30
+
+    # A gap longer than max_gap is a pause, even if the position moved plausibly
+    tracker.heartbeat(test_user.id, test_video.id, 100, at=start + timedelta(minutes=20))
+    assert state.intervals.total == 30
+
+
+def test_flush_persists_packed_ranges_and_reloads(tracker, engine, db, test_user, test_video):
+    """Test that flushed ranges are stored packed and picked up by a fresh tracker."""
+    start = datetime.now(timezone.utc)
+    _play(tracker, test_user.id, test_video.id, start, [0, 5, 10])
+    assert tracker.flush() == 1
+
+    stored = db.query(VideoWatchIntervals).filter(
+        VideoWatchIntervals.user_id == test_user.id, VideoWatchIntervals.video_id == test_video.id
+    ).one()
+    assert stored.watched_seconds == 10
+    assert list(IntervalSet.unpack(stored.intervals)) == [(0, 10)]
+
+    fresh = WatchTracker(
+        sessionmaker(bind=engine), flush_interval=60, max_pending=100,
+        max_entries=100, max_rate=2.0, max_gap=60, state_ttl=60,
+    )
+    state = fresh.heartbeat(test_user.id, test_video.id, 15, at=start + timedelta(seconds=15))
+    assert list(state.intervals) == [(0, 15)]
+    fresh.flush()
+    db.expire_all()
+    assert db.get(VideoWatchIntervals, stored.id).watched_seconds == 15
+
+
+def test_flush_stores_watched_time_and_completion(tracker, db, test_user, test_video):
+    """Test that a flush writes the watched seconds and completion onto the progress row."""
+    start = datetime.now(timezone.utc)
+    _play(tracker, test_user.id, test_video.id, start, range(0, 60, 5))
+    tracker.flush()
+
+    def stored():
+        db.expire_all()
+        return db.query(VideoProgress).filter(
+            VideoProgress.user_id == test_user.id, VideoProgress.video_id == test_video.id
+        ).one()
+
+    assert (stored().watched_duration, stored().completed) == (55, False)
+
+    # test_video is 120 seconds long
+    _play(tracker, test_user.id, test_video.id, start + timedelta(seconds=60), range(60, 125, 5))
+    tracker.flush()
+    assert (stored().watched_duration, stored().completed) == (120, True)
+
+
+def test_flush_keeps_ranges_stored_by_another_worker(tracker, engine, db, test_user, test_video):
+    """Test that a worker with a stale state adds to the stored ranges instead of replacing them."""
+    start = datetime.now(timezone.utc)
+    other = WatchTracker(
+        sessionmaker(bind=engine), flush_interval=60, max_pending=100,
+        max_entries=100, max_rate=2.0, max_gap=60, state_ttl=60,
+    )
+    _play(other, test_user.id, test_video.id, start, [100, 105, 110])
+    _play(tracker, test_user.id, test_video.id, start + timedelta(seconds=30), [0, 5, 10])
+    tracker.flush()
+    other.flush()
+
+    stored = db.query(VideoWatchIntervals).filter(
+        VideoWatchIntervals.user_id == test_user.id, VideoWatchIntervals.video_id == test_video.id
+    ).one()
+    assert list(IntervalSet.unpack(stored.intervals)) == [(0, 10), (100, 110)]
+    assert stored.watched_seconds == 20
+    # The newest heartbeat wins, whichever worker flushed last
+    assert stored.last_position == 10
+    progress = db.query(VideoProgress).filter(
+        VideoProgress.user_id == test_user.id, VideoProgress.video_id == test_video.id
+    ).one()
+    assert progress.watched_duration == 20